@@ -0,0 +1,78 @@
+import hashlib
+import math
+import re
+import threading
+
+from api_etl_pipeline.storage.db import SqliteStorage
+
+# URLs whose bytes never change once published; a stored one is not fetched
+# again. Everything else is revalidated (downloaded and deduplicated by hash).
+IMMUTABLE_URL_PATTERNS: dict[str, tuple[re.Pattern[str], ...]] = {
+    # Dossier Endpoint 1: filing documents live under the accession folder.
+    "sec_edgar": (re.compile(r"^https://www\.sec\.gov/Archives/edgar/data/\d+/\d{18}/[^/?#]+$"),),
+    # submissions.zip is reissued without warning (dossier Endpoint 2).
+    "sec_bulk": (),
+    # The dossier makes no immutability promise for APS document URLs.
+    "nrc_adams_aps": (),
+}
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(capacity, 1)
+        self.size_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def _positions(self, key: str) -> list[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + index * second) % self.size_bits for index in range(self.hash_count)]
+
+
+class SeenArtifactIndex:
+    """Pre-download check for artifacts already in the store.
+
+    Built once at startup from ``artifacts.source_url``; the Bloom filter
+    answers most misses in memory and a hit is confirmed with an indexed
+    lookup, so a false positive never skips a download. Only URLs matching the
+    provider's ``IMMUTABLE_URL_PATTERNS`` are ever skipped.
+    """
+
+    def __init__(
+        self,
+        storage: SqliteStorage,
+        *,
+        patterns: dict[str, tuple[re.Pattern[str], ...]] | None = None,
+        error_rate: float = 0.001,
+    ) -> None:
+        self.storage = storage
+        self.patterns = IMMUTABLE_URL_PATTERNS if patterns is None else patterns
+        # Headroom for the URLs this run adds before the error rate degrades.
+        self._filter = BloomFilter(max(2 * storage.artifact_count(), 1024), error_rate)
+        for url in storage.iter_artifact_urls():
+            self._filter.add(url)
+        # Runners of concurrent providers add to the same filter.
+        self._lock = threading.Lock()
+
+    def is_immutable(self, provider: str, url: str) -> bool:
+        return any(pattern.match(url) for pattern in self.patterns.get(provider, ()))
+
+    def is_stored(self, provider: str, url: str) -> bool:
+        if not self.is_immutable(provider, url) or url not in self._filter:
+            return False
+        return self.storage.artifact_url_exists(url)
+
+    def add(self, url: str) -> None:
+        with self._lock:
+            self._filter.add(url)
@@ -0,0 +1,494 @@
+import gzip
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from api_etl_pipeline.connectors.nrc_adams_aps import NrcAdamsApsConnector
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.downloads import sha256_bytes
+from api_etl_pipeline.http_client import CapturedResponse, HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.run_capture import AttemptRecord, RunCapture
+from api_etl_pipeline.settings import AppSettings
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is reported as null.
+    resource = None
+
+SEC_CIK10 = "0000320193"
+SEC_SUBMISSIONS_URL = f"https://data.sec.gov/submissions/CIK{SEC_CIK10}.json"
+APS_NEWEST = datetime(2024, 6, 1, tzinfo=UTC)
+MIB = 1024 * 1024
+
+
+@dataclass
+class Measurement:
+    """Raw numbers from one benchmark; ``latencies`` holds one entry per operation."""
+
+    operations: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+
+    def timed(self, operation: Callable[[], int]) -> None:
+        """Run ``operation`` (returning the bytes it handled) and record its latency."""
+        started = time.perf_counter()
+        handled = operation()
+        self.latencies.append(time.perf_counter() - started)
+        self.operations += 1
+        self.bytes += handled
+
+    def summary(self) -> dict:
+        seconds = self.seconds or sum(self.latencies)
+        return {
+            "operations": self.operations,
+            "bytes": self.bytes,
+            "seconds": round(seconds, 6),
+            "ops_per_second": round(self.operations / seconds, 3) if seconds else None,
+            "mib_per_second": round(self.bytes / MIB / seconds, 3) if seconds else None,
+            "latency_ms": {
+                "p50": _percentile_ms(self.latencies, 0.50),
+                "p99": _percentile_ms(self.latencies, 0.99),
+                "max": _percentile_ms(self.latencies, 1.0),
+            },
+        }
+
+
+def run_benchmarks(
+    names: list[str] | None = None,
+    *,
+    workdir: Path,
+    scale: float = 1.0,
+    isolate: bool = True,
+) -> dict:
+    """Run the named benchmarks (all by default) and return the JSON-ready report.
+
+    With ``isolate`` each benchmark runs in a fresh spawned process, so its
+    ``peak_rss_bytes`` is its own high-water mark rather than the whole run's.
+    """
+    selected = names or list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"unknown benchmarks: {', '.join(unknown)}")
+
+    report: dict = {
+        "started_at": datetime.now(UTC).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "scale": scale,
+        "isolated": isolate,
+        "benchmarks": {},
+    }
+    for name in selected:
+        bench_dir = workdir / name
+        if isolate:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_benchmark, name, bench_dir, scale).result()
+        else:
+            result = run_benchmark(name, bench_dir, scale)
+        shutil.rmtree(bench_dir, ignore_errors=True)
+        report["benchmarks"][name] = result
+    report["finished_at"] = datetime.now(UTC).isoformat()
+    return report
+
+
+def write_report(report: dict, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True), encoding="utf-8")
+    return path
+
+
+def run_benchmark(name: str, workdir: Path, scale: float) -> dict:
+    workdir.mkdir(parents=True, exist_ok=True)
+    baseline = _peak_rss_bytes()
+    measurement = BENCHMARKS[name](workdir, scale)
+    return {
+        **measurement.summary(),
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def synthetic_submissions(filings: int, *, seed: int = 0) -> bytes:
+    """A ``CIK##########.json`` body whose ``filings.recent`` holds ``filings`` rows."""
+    rng = random.Random(seed)
+    forms = ["10-K", "10-Q", "8-K", "4", "S-8", "DEF 14A", "SC 13G/A"]
+    day = datetime(2024, 6, 1, tzinfo=UTC)
+    recent: dict[str, list] = {
+        key: []
+        for key in (
+            "accessionNumber",
+            "filingDate",
+            "reportDate",
+            "acceptanceDateTime",
+            "act",
+            "form",
+            "fileNumber",
+            "filmNumber",
+            "items",
+            "size",
+            "isXBRL",
+            "isInlineXBRL",
+            "primaryDocument",
+            "primaryDocDescription",
+        )
+    }
+    for index in range(filings):
+        filed = day - timedelta(hours=6 * index)
+        form = forms[rng.randrange(len(forms))]
+        recent["accessionNumber"].append(f"{SEC_CIK10}-{filed:%y}-{index:06d}")
+        recent["filingDate"].append(f"{filed:%Y-%m-%d}")
+        recent["reportDate"].append(f"{filed - timedelta(days=30):%Y-%m-%d}")
+        recent["acceptanceDateTime"].append(f"{filed:%Y-%m-%dT%H:%M:%S}.000Z")
+        recent["act"].append("34")
+        recent["form"].append(form)
+        recent["fileNumber"].append(f"001-{rng.randrange(10_000, 99_999)}")
+        recent["filmNumber"].append(str(rng.randrange(10**10, 10**11)))
+        recent["items"].append("2.02,9.01" if form == "8-K" else "")
+        recent["size"].append(rng.randrange(2_000, 20_000_000))
+        recent["isXBRL"].append(rng.randrange(2))
+        recent["isInlineXBRL"].append(rng.randrange(2))
+        recent["primaryDocument"].append(f"doc-{index:06d}.htm")
+        recent["primaryDocDescription"].append(form)
+    payload = {
+        "cik": SEC_CIK10.lstrip("0"),
+        "name": "SYNTHETIC ISSUER INC",
+        "filings": {"recent": recent, "files": []},
+    }
+    return json.dumps(payload).encode("utf-8")
+
+
+def synthetic_pdf(size: int, *, seed: int = 0) -> bytes:
+    """``size`` bytes of incompressible content behind a PDF header."""
+    header = f"%PDF-1.7\n% synthetic {seed}\n".encode()
+    return header + random.Random(seed).randbytes(max(size - len(header), 0))
+
+
+def synthetic_aps_page(skip: int, hits: int) -> bytes:
+    """One APS search page of ``hits`` results, newest first from offset ``skip``."""
+    results = []
+    for index in range(skip, skip + hits):
+        added = APS_NEWEST - timedelta(minutes=index)
+        accession = f"ML24{index:07d}"
+        results.append(
+            {
+                "document": {
+                    "AccessionNumber": accession,
+                    "DocumentTitle": f"Synthetic reactor inspection report {index}",
+                    "DocumentType": ["Inspection Report"],
+                    "DateAddedTimestamp": f"{added:%Y-%m-%dT%H:%M:%SZ}",
+                    "Url": f"https://www.nrc.gov/docs/{accession}.pdf",
+                }
+            }
+        )
+    return json.dumps({"count": skip + hits, "results": results}).encode("utf-8")
+
+
+def _bench_http_get_json(workdir: Path, scale: float) -> Measurement:
+    # EDGAR serves submissions gzip-encoded; the client pays for the inflate.
+    body = gzip.compress(synthetic_submissions(_scaled(20_000, scale)), compresslevel=6)
+    handler = _static_handler(body, "application/json", encoding="gzip")
+    measurement = Measurement()
+    with _mock_client(workdir, handler) as client:
+        for _ in range(_scaled(40, scale)):
+            measurement.timed(
+                lambda: len(client.get(SEC_SUBMISSIONS_URL, provider="sec_edgar").body)
+            )
+    return measurement
+
+
+def _bench_http_stream_pdf(workdir: Path, scale: float) -> Measurement:
+    body = synthetic_pdf(_scaled(4 * MIB, scale))
+    handler = _static_handler(body, "application/pdf")
+    measurement = Measurement()
+    with _mock_client(workdir, handler) as client:
+        for index in range(_scaled(24, scale)):
+            url = f"https://www.nrc.gov/docs/ML24{index:07d}.pdf"
+
+            def download(url: str = url) -> int:
+                captured = client.stream_get(url, provider="nrc_adams_aps")
+                assert captured.body_path is not None
+                captured.body_path.unlink()
+                return captured.size
+
+            measurement.timed(download)
+    return measurement
+
+
+def _bench_run_capture(workdir: Path, scale: float) -> Measurement:
+    page = synthetic_aps_page(0, _scaled(1_000, scale))
+    pdf = synthetic_pdf(_scaled(2 * MIB, scale))
+    spool = workdir / "spool"
+    spool.mkdir()
+    attempts = []
+    for index in range(_scaled(200, scale)):
+        if index % 2:
+            path = spool / f"{index}.pdf"
+            path.write_bytes(pdf)
+            attempts.append(_attempt(index, b"", path, sha256_bytes(pdf), len(pdf)))
+        else:
+            attempts.append(_attempt(index, page, None, None, None))
+
+    defaults = AppSettings.model_fields
+    capture = RunCapture(
+        workdir / "run",
+        provider="benchmark",
+        live=True,
+        limit=len(attempts),
+        pretty_max_bytes=defaults["app_capture_pretty_max_bytes"].default,
+        gzip_min_bytes=defaults["app_capture_gzip_min_bytes"].default,
+        queue_max_bytes=defaults["app_capture_queue_max_bytes"].default,
+    )
+    measurement = Measurement()
+    started = time.perf_counter()
+    for attempt in attempts:
+
+        def record(attempt: AttemptRecord = attempt) -> int:
+            size = attempt.body_size
+            capture.capture_attempt(attempt)
+            return size
+
+        measurement.timed(record)
+    capture.drain()
+    measurement.seconds = time.perf_counter() - started
+    capture.finalize(status="succeeded", counts={"responses": len(attempts), "artifacts": 0})
+    return measurement
+
+
+def _bench_sqlite_insert(workdir: Path, scale: float) -> Measurement:
+    blobs = BlobStore(workdir / "blobs")
+    storage = SqliteStorage(
+        workdir / "db.sqlite3",
+        batch_size=AppSettings.model_fields["app_db_write_batch_size"].default,
+        body_store=blobs,
+    )
+    rng = random.Random(0)
+    measurement = Measurement()
+    try:
+        started = time.perf_counter()
+        for index in range(_scaled(20_000, scale)):
+            body = json.dumps({"index": index, "pad": rng.randbytes(600).hex()}).encode()
+            captured = _captured(f"https://data.sec.gov/submissions/CIK{index:010d}.json", body)
+
+            def insert(captured: CapturedResponse = captured, index: int = index) -> int:
+                response_id = storage.submit_response("sec_edgar", captured)
+                digest = sha256_bytes(captured.body)
+                storage.submit_artifact(
+                    provider="sec_edgar",
+                    source_url=f"{captured.url}#{index}",
+                    sha256=digest,
+                    byte_count=len(captured.body),
+                    blob_path=str(blobs.path_for(digest)),
+                    response_id=response_id,
+                )
+                return len(captured.body)
+
+            measurement.timed(insert)
+        storage.flush()
+        storage.checkpoint()
+        measurement.seconds = time.perf_counter() - started
+    finally:
+        storage.close()
+    return measurement
+
+
+def _bench_blob_store_put(workdir: Path, scale: float) -> Measurement:
+    blobs = BlobStore(workdir / "blobs")
+    payload = synthetic_pdf(_scaled(MIB, scale))
+    measurement = Measurement()
+    for index in range(_scaled(200, scale)):
+        content = index.to_bytes(8, "big") + payload
+        digest = sha256_bytes(content)
+        measurement.timed(lambda content=content, digest=digest: _put(blobs, digest, content))
+    return measurement
+
+
+def _bench_pipeline_sec(workdir: Path, scale: float) -> Measurement:
+    submissions = synthetic_submissions(_scaled(20_000, scale))
+    document = synthetic_pdf(_scaled(MIB, scale))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "data.sec.gov":
+            return httpx.Response(200, content=submissions)
+        # Distinct bytes per filing, so every artifact is a new blob.
+        return httpx.Response(200, content=request.url.path.encode() + document)
+
+    def run(run_dir: Path) -> dict:
+        storage = SqliteStorage(run_dir / "db.sqlite3", batch_size=500)
+        try:
+            with _mock_client(run_dir, handler) as client:
+                connector = SecEdgarConnector(
+                    client, forms=["10-K"], max_filings=_scaled(64, scale)
+                )
+                runner = PipelineRunner(
+                    storage=storage, blob_store=BlobStore(run_dir / "blobs"), concurrency=4
+                )
+                return runner.run(connector, limit=1)
+        finally:
+            storage.close()
+
+    return _repeat_runs(workdir, run, repeats=3)
+
+
+def _bench_pipeline_nrc(workdir: Path, scale: float) -> Measurement:
+    total = _scaled(2_500, scale)
+    document = synthetic_pdf(_scaled(32 * 1024, scale))
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            search = json.loads(request.content)
+            skip, take = search["skip"], search.get("take") or 20
+            return httpx.Response(200, content=synthetic_aps_page(skip, min(take, total - skip)))
+        return httpx.Response(200, content=request.url.path.encode() + document)
+
+    def run(run_dir: Path) -> dict:
+        storage = SqliteStorage(run_dir / "db.sqlite3", batch_size=500)
+        try:
+            with _mock_client(run_dir, handler) as client:
+                runner = PipelineRunner(
+                    storage=storage, blob_store=BlobStore(run_dir / "blobs"), concurrency=8
+                )
+                return runner.run(NrcAdamsApsConnector(client), limit=0)
+        finally:
+            storage.close()
+
+    return _repeat_runs(workdir, run, repeats=3)
+
+
+BENCHMARKS: dict[str, Callable[[Path, float], Measurement]] = {
+    "http_get_json": _bench_http_get_json,
+    "http_stream_pdf": _bench_http_stream_pdf,
+    "run_capture": _bench_run_capture,
+    "sqlite_insert": _bench_sqlite_insert,
+    "blob_store_put": _bench_blob_store_put,
+    "pipeline_sec": _bench_pipeline_sec,
+    "pipeline_nrc": _bench_pipeline_nrc,
+}
+
+
+def _repeat_runs(workdir: Path, run: Callable[[Path], dict], *, repeats: int) -> Measurement:
+    # End-to-end: one operation per run, each against a fresh database and blob store.
+    measurement = Measurement()
+    for repeat in range(repeats):
+        run_dir = workdir / f"run-{repeat}"
+
+        def timed_run(run_dir: Path = run_dir) -> int:
+            result = run(run_dir)
+            if result["parse_errors"] or not result["artifacts"]:
+                raise RuntimeError(f"benchmark run stored nothing: {result['parse_errors']}")
+            return _tree_bytes(run_dir / "blobs")
+
+        measurement.timed(timed_run)
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return measurement
+
+
+def _mock_client(workdir: Path, handler: Callable[[httpx.Request], httpx.Response]) -> HttpClient:
+    unlimited = 1_000_000.0
+    client = HttpClient(
+        live=True,
+        fixture_root=workdir / "fixtures",
+        rate_limiter=GlobalRateLimiter(
+            sec_max_rps=unlimited, nrc_max_rps=unlimited, default_max_rps=unlimited
+        ),
+        sec_user_agent="api-etl-pipeline benchmark bench@example.com",
+        nrc_subscription_key="benchmark",
+        spool_dir=workdir / "spool",
+    )
+    # Same seam the live-mode tests use: the real client stack over an in-process server.
+    client._client.close()
+    client._client = httpx.Client(transport=httpx.MockTransport(handler), follow_redirects=True)
+    return client
+
+
+def _static_handler(
+    body: bytes, content_type: str, *, encoding: str | None = None
+) -> Callable[[httpx.Request], httpx.Response]:
+    headers = {"content-type": content_type}
+    if encoding is not None:
+        headers["content-encoding"] = encoding
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        del request
+        return httpx.Response(200, content=body, headers=headers)
+
+    return handler
+
+
+def _attempt(
+    index: int, body: bytes, body_path: Path | None, sha256: str | None, byte_count: int | None
+) -> AttemptRecord:
+    return AttemptRecord(
+        method="GET",
+        url=f"https://www.nrc.gov/docs/ML24{index:07d}.pdf",
+        request_payload_json=None,
+        request_headers={"User-Agent": "api-etl-pipeline/0.1"},
+        status_code=200,
+        response_headers={"content-type": "application/json"},
+        body=body,
+        attempt_number=1,
+        body_path=body_path,
+        sha256=sha256,
+        elapsed_seconds=0.01,
+        byte_count=byte_count,
+    )
+
+
+def _captured(url: str, body: bytes) -> CapturedResponse:
+    return CapturedResponse(
+        method="GET",
+        url=url,
+        params_json=None,
+        status_code=200,
+        headers_json='{"content-type": "application/json"}',
+        body=body,
+    )
+
+
+def _put(blobs: BlobStore, digest: str, content: bytes) -> int:
+    blobs.put(digest, content)
+    return len(content)
+
+
+def _tree_bytes(root: Path) -> int:
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+def _scaled(value: int, scale: float) -> int:
+    return max(1, round(value * scale))
+
+
+def _percentile_ms(latencies: list[float], quantile: float) -> float | None:
+    # Nearest-rank percentile.
+    if not latencies:
+        return None
+    ordered = sorted(latencies)
+    rank = min(len(ordered), max(1, math.ceil(quantile * len(ordered))))
+    return round(ordered[rank - 1] * 1000, 3)
+
+
+def _peak_rss_bytes() -> int | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
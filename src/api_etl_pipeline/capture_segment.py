@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO
+
+from api_etl_pipeline.downloads import iter_file_chunks
+
+MAGIC = b"ACR1"
+RECORD_HEADER = struct.Struct(">4sBBQQ")
+INDEX_ENTRY = struct.Struct(">QBBHQQQ")
+
+KIND_REQUEST = 1
+KIND_META = 2
+KIND_BODY = 3
+
+FLAG_ZLIB = 0x01
+
+INDEX_NAME = "index.bin"
+CHUNK_BYTES = 256 * 1024
+
+
+def segment_name(number: int) -> str:
+    return f"segment-{number:06d}.pack"
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    attempt_id: int
+    kind: int
+    flags: int
+    segment: int
+    offset: int
+    length: int
+    raw_length: int
+
+    @property
+    def compressed(self) -> bool:
+        return bool(self.flags & FLAG_ZLIB)
+
+
+class SegmentWriter:
+    """Appends length-prefixed records to ``segment-NNNNNN.pack`` files.
+
+    Each record is ``magic "ACR1" | kind u8 | flags u8 | attempt_id u64 |
+    length u64`` followed by the (optionally zlib-compressed) payload.
+    ``index.bin`` gets one fixed-width entry per record so readers can seek
+    straight to it; segments stay readable without the index by scanning
+    headers. A new segment starts once the current one passes
+    ``max_segment_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        max_segment_bytes: int,
+        compress_min_bytes: int,
+    ) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.compress_min_bytes = compress_min_bytes
+        self._index = (directory / INDEX_NAME).open("ab")
+        self._segment_number = 0
+        self._segment: BinaryIO | None = None
+        self._open_next_segment()
+
+    def append(self, attempt_id: int, kind: int, payload: bytes) -> IndexEntry:
+        flags = 0
+        stored = payload
+        if len(payload) >= self.compress_min_bytes:
+            stored = zlib.compress(payload)
+            flags |= FLAG_ZLIB
+        segment = self._segment_for_write()
+        segment.write(RECORD_HEADER.pack(MAGIC, kind, flags, attempt_id, len(stored)))
+        offset = segment.tell()
+        segment.write(stored)
+        return self._record(attempt_id, kind, flags, offset, len(stored), len(payload))
+
+    def append_file(self, attempt_id: int, kind: int, path: Path) -> tuple[IndexEntry, str]:
+        """Stream ``path`` into a record; returns the entry and the raw sha256."""
+        raw_length = path.stat().st_size
+        flags = FLAG_ZLIB if raw_length >= self.compress_min_bytes else 0
+        segment = self._segment_for_write()
+        header_at = segment.tell()
+        segment.write(RECORD_HEADER.pack(MAGIC, kind, flags, attempt_id, 0))
+        offset = segment.tell()
+        digest = hashlib.sha256()
+        compressor = zlib.compressobj() if flags & FLAG_ZLIB else None
+        for chunk in iter_file_chunks(path, CHUNK_BYTES):
+            digest.update(chunk)
+            segment.write(compressor.compress(chunk) if compressor else chunk)
+        if compressor is not None:
+            segment.write(compressor.flush())
+        end = segment.tell()
+        # Length is only known once the payload is written; patch the header.
+        segment.seek(header_at)
+        segment.write(RECORD_HEADER.pack(MAGIC, kind, flags, attempt_id, end - offset))
+        segment.seek(end)
+        entry = self._record(attempt_id, kind, flags, offset, end - offset, raw_length)
+        return entry, digest.hexdigest()
+
+    def append_compressed(
+        self, attempt_id: int, kind: int, path: Path, *, raw_length: int
+    ) -> IndexEntry:
+        """Copy an already gzip- or zlib-framed ``path`` in as a compressed record.
+
+        Wire-encoded bodies go in as received; readers inflate either framing.
+        """
+        segment = self._segment_for_write()
+        length = path.stat().st_size
+        segment.write(RECORD_HEADER.pack(MAGIC, kind, FLAG_ZLIB, attempt_id, length))
+        offset = segment.tell()
+        for chunk in iter_file_chunks(path, CHUNK_BYTES):
+            segment.write(chunk)
+        return self._record(attempt_id, kind, FLAG_ZLIB, offset, length, raw_length)
+
+    def flush(self) -> None:
+        if self._segment is not None:
+            self._segment.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+        self._index.close()
+
+    @property
+    def current_segment(self) -> str:
+        return segment_name(self._segment_number)
+
+    def _segment_for_write(self) -> BinaryIO:
+        assert self._segment is not None
+        if self._segment.tell() >= self.max_segment_bytes:
+            self._segment.close()
+            self._open_next_segment()
+            assert self._segment is not None
+        return self._segment
+
+    def _open_next_segment(self) -> None:
+        self._segment_number += 1
+        self._segment = (self.directory / segment_name(self._segment_number)).open("wb")
+
+    def _record(
+        self, attempt_id: int, kind: int, flags: int, offset: int, length: int, raw_length: int
+    ) -> IndexEntry:
+        entry = IndexEntry(
+            attempt_id, kind, flags, self._segment_number, offset, length, raw_length
+        )
+        self._index.write(
+            INDEX_ENTRY.pack(
+                entry.attempt_id,
+                entry.kind,
+                entry.flags,
+                entry.segment,
+                entry.offset,
+                entry.length,
+                entry.raw_length,
+            )
+        )
+        return entry
+
+
+class SegmentReader:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        index_path = directory / INDEX_NAME
+        if index_path.exists():
+            self.entries = list(_read_index(index_path))
+        else:
+            self.entries = list(self._scan())
+        # Grouped once so per-attempt lookups stay O(1) however large the run.
+        self._by_attempt: dict[int, dict[int, IndexEntry]] = {}
+        for entry in self.entries:
+            self._by_attempt.setdefault(entry.attempt_id, {})[entry.kind] = entry
+
+    def records_for(self, attempt_id: int) -> dict[int, IndexEntry]:
+        return dict(self._by_attempt.get(attempt_id, {}))
+
+    def attempt_ids(self) -> list[int]:
+        return sorted(self._by_attempt)
+
+    def read(self, entry: IndexEntry) -> bytes:
+        return b"".join(self.iter_chunks(entry))
+
+    def iter_chunks(self, entry: IndexEntry) -> Iterator[bytes]:
+        # 32 + MAX_WBITS accepts zlib and gzip framing (see append_compressed).
+        decompressor = zlib.decompressobj(32 + zlib.MAX_WBITS) if entry.compressed else None
+        with (self.directory / segment_name(entry.segment)).open("rb") as handle:
+            handle.seek(entry.offset)
+            remaining = entry.length
+            while remaining:
+                chunk = handle.read(min(CHUNK_BYTES, remaining))
+                if not chunk:
+                    raise ValueError(f"truncated record attempt={entry.attempt_id}")
+                remaining -= len(chunk)
+                yield decompressor.decompress(chunk) if decompressor else chunk
+        if decompressor is not None:
+            yield decompressor.flush()
+
+    def _scan(self) -> Iterator[IndexEntry]:
+        for path in sorted(self.directory.glob("segment-*.pack")):
+            number = int(path.stem.split("-")[1])
+            with path.open("rb") as handle:
+                while header := handle.read(RECORD_HEADER.size):
+                    if len(header) < RECORD_HEADER.size:
+                        break
+                    magic, kind, flags, attempt_id, length = RECORD_HEADER.unpack(header)
+                    if magic != MAGIC:
+                        raise ValueError(f"bad record magic in {path.name}")
+                    offset = handle.tell()
+                    handle.seek(length, 1)
+                    # raw_length is not in the header; 0 means "unknown" here.
+                    yield IndexEntry(attempt_id, kind, flags, number, offset, length, 0)
+
+
+def _read_index(path: Path) -> Iterator[IndexEntry]:
+    with path.open("rb") as handle:
+        while raw := handle.read(INDEX_ENTRY.size):
+            if len(raw) < INDEX_ENTRY.size:
+                break  # torn final entry from a crash
+            yield IndexEntry(*INDEX_ENTRY.unpack(raw))
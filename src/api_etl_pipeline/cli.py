@@ -1,21 +1,59 @@
 import contextlib
+import json
+import os
+import socket
+import tempfile
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
 from typing import Annotated
 
 import typer
 
+from api_etl_pipeline.artifact_index import SeenArtifactIndex
+from api_etl_pipeline.benchmarks import BENCHMARKS, run_benchmarks, write_report
+from api_etl_pipeline.capture_segment import KIND_META, KIND_REQUEST, SegmentReader
+from api_etl_pipeline.connectors.base import BaseConnector
 from api_etl_pipeline.connectors.nrc_adams_aps import NrcAdamsApsConnector
+from api_etl_pipeline.connectors.sec_bulk import SecBulkSubmissionsConnector
 from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
 from api_etl_pipeline.http_client import HttpAttempt, HttpClient
+from api_etl_pipeline.metrics import Metrics
+from api_etl_pipeline.parse_stage import ParseStage
 from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.planning import CikUniverse
 from api_etl_pipeline.rate_limiter import GlobalRateLimiter
-from api_etl_pipeline.run_capture import AttemptRecord, RunCapture, Tee, build_run_dir
+from api_etl_pipeline.retry_policy import RetryBudget
+from api_etl_pipeline.run_capture import (
+    CAPTURE_MODES,
+    AttemptRecord,
+    RunCapture,
+    Tee,
+    build_run_dir,
+    extract_packed,
+    write_run_summary,
+)
 from api_etl_pipeline.settings import AppSettings
 from api_etl_pipeline.storage.blob_store import BlobStore
 from api_etl_pipeline.storage.db import SqliteStorage
+from api_etl_pipeline.transport import TransportProfiles
+from api_etl_pipeline.work_queue import QueueWorker, WorkQueue
+
+PROVIDERS = ("sec_edgar", "sec_bulk", "nrc_adams_aps")
+FIXTURE_ROOT = Path("tests/fixtures")
+LIMIT_HELP = (
+    "plan items per provider, 0 for all"
+    " (default: 1, or every CIK when SEC_CIK_FILE or SEC_CIK_DB is set)"
+)
 
 app = typer.Typer()
+capture_app = typer.Typer(help="Inspect packed run captures (APP_CAPTURE_FORMAT=packed).")
+app.add_typer(capture_app, name="capture")
+queue_app = typer.Typer(help="Persistent work queue for resumable, multi-worker backfills.")
+app.add_typer(queue_app, name="queue")
 
 
 @app.callback()
@@ -25,22 +63,258 @@ def main() -> None:
 
 @app.command("run")
 def run(
-    provider: Annotated[str, typer.Option("--provider")],
+    provider: Annotated[
+        list[str] | None,
+        typer.Option("--provider", help="repeat to run several providers concurrently"),
+    ] = None,
+    all_providers: Annotated[bool, typer.Option("--all", help="run every provider")] = False,
     live: Annotated[bool, typer.Option("--live")] = False,
-    limit: Annotated[int, typer.Option("--limit")] = 1,
+    limit: Annotated[
+        int | None,
+        typer.Option(
+            "--limit",
+            help=LIMIT_HELP,
+        ),
+    ] = None,
+    concurrency: Annotated[int | None, typer.Option("--concurrency", min=1)] = None,
+    capture_mode: Annotated[
+        str | None,
+        typer.Option("--capture-mode", help="full, metadata-only, errors-only or sampled"),
+    ] = None,
 ) -> None:
     settings = AppSettings()
-    fixture_root = Path("tests/fixtures")
-
-    run_dir = build_run_dir(settings.resolved_run_dir, provider)
-    capture = RunCapture(
-        run_dir,
-        provider=provider,
+    if capture_mode is not None and capture_mode not in CAPTURE_MODES:
+        raise typer.BadParameter(f"capture mode must be one of: {', '.join(CAPTURE_MODES)}")
+    providers = list(PROVIDERS) if all_providers else list(dict.fromkeys(provider or []))
+    if not providers:
+        raise typer.BadParameter("pass --provider (repeatable) or --all")
+    unknown = [name for name in providers if name not in PROVIDERS]
+    if unknown:
+        raise typer.BadParameter(f"provider must be one of: {', '.join(PROVIDERS)}")
+    _run_providers(
+        providers,
         live=live,
         limit=limit,
+        concurrency=concurrency,
+        capture_mode=capture_mode,
+        settings=settings,
+    )
+
+
+@app.command("bench")
+def bench(
+    only: Annotated[list[str] | None, typer.Option("--only", help="benchmark name")] = None,
+    scale: Annotated[float, typer.Option("--scale", min=0.001)] = 1.0,
+    out: Annotated[Path | None, typer.Option("--out")] = None,
+) -> None:
+    """Run the offline benchmark suite and write the results as JSON."""
+    settings = AppSettings()
+    stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%SZ")
+    out = out or settings.app_db_path.parent / "benchmarks" / f"{stamp}.json"
+    with tempfile.TemporaryDirectory(prefix="api-etl-bench-") as workdir:
+        try:
+            report = run_benchmarks(only, workdir=Path(workdir), scale=scale)
+        except ValueError as exc:
+            raise typer.BadParameter(f"{exc}; choose from: {', '.join(BENCHMARKS)}") from exc
+    for name, result in report["benchmarks"].items():
+        latency = result["latency_ms"]
+        typer.echo(
+            f"{name}\tops/s={result['ops_per_second']}\tMiB/s={result['mib_per_second']}\t"
+            f"p50={latency['p50']}ms\tp99={latency['p99']}ms\tpeak_rss={result['peak_rss_bytes']}"
+        )
+    typer.echo(f"results={write_report(report, out)}")
+
+
+@capture_app.command("show")
+def capture_show(
+    run_dir: Annotated[Path, typer.Argument(exists=True, file_okay=False)],
+    attempt_id: Annotated[int | None, typer.Option("--id")] = None,
+) -> None:
+    """List attempts in a packed capture, or print one attempt's request and meta."""
+    reader = SegmentReader(run_dir / "capture")
+    if attempt_id is None:
+        for current in reader.attempt_ids():
+            meta = json.loads(reader.read(reader.records_for(current)[KIND_META]))
+            typer.echo(
+                f"{current}\t{meta['status_code']}\t{meta['method']}\t"
+                f"{meta['byte_count']}\t{meta['url']}"
+            )
+        return
+    records = reader.records_for(attempt_id)
+    if KIND_META not in records:
+        raise typer.BadParameter(f"attempt {attempt_id} not found")
+    typer.echo(
+        json.dumps(
+            {
+                "request": json.loads(reader.read(records[KIND_REQUEST])),
+                "meta": json.loads(reader.read(records[KIND_META])),
+            },
+            indent=2,
+            sort_keys=True,
+        )
+    )
+
+
+@capture_app.command("extract")
+def capture_extract(
+    run_dir: Annotated[Path, typer.Argument(exists=True, file_okay=False)],
+    out_dir: Annotated[Path | None, typer.Option("--out")] = None,
+    attempt_id: Annotated[list[int] | None, typer.Option("--id")] = None,
+) -> None:
+    """Regenerate requests/ and responses/ files (with pretty JSON) from a packed capture."""
+    settings = AppSettings()
+    written = extract_packed(
+        run_dir,
+        out_dir or run_dir,
+        attempt_ids=attempt_id or None,
         pretty_max_bytes=settings.app_capture_pretty_max_bytes,
-        gzip_min_bytes=settings.app_capture_gzip_min_bytes,
     )
+    typer.echo(f"extracted files={len(written)} out_dir={out_dir or run_dir}")
+
+
+@queue_app.command("enqueue")
+def queue_enqueue(
+    provider: Annotated[str, typer.Option("--provider")],
+    queue: Annotated[str | None, typer.Option("--queue", help="default: the provider")] = None,
+    live: Annotated[bool, typer.Option("--live")] = False,
+    limit: Annotated[
+        int | None,
+        typer.Option(
+            "--limit",
+            help=LIMIT_HELP,
+        ),
+    ] = None,
+) -> None:
+    """Plan ``provider`` once and store its items; re-running adds only new items."""
+    settings = AppSettings()
+    _check_provider(provider)
+    blobs = BlobStore(settings.app_blob_dir)
+    storage = SqliteStorage(settings.app_db_path, body_store=blobs)
+    limiter = GlobalRateLimiter.from_settings(settings)
+    work_queue = WorkQueue(settings.app_db_path)
+    try:
+        with HttpClient(
+            live=live,
+            fixture_root=FIXTURE_ROOT,
+            rate_limiter=limiter,
+            sec_user_agent=settings.sec_user_agent,
+            nrc_subscription_key=settings.resolved_nrc_subscription_key,
+            spool_dir=blobs.spool_dir,
+        ) as client:
+            shared = _SharedStages(
+                blobs=blobs,
+                storage=storage,
+                limiter=limiter,
+                parse_stage=ParseStage(),
+                artifact_index=None,
+            )
+            connector = _build_connector(provider, client, shared, settings)
+            added = work_queue.enqueue(
+                queue or provider, connector.queue_plan(_limit_for(provider, limit, settings))
+            )
+        counts = work_queue.counts(queue or provider)
+    finally:
+        limiter.close()
+        work_queue.close()
+        storage.close()
+    typer.echo(f"queue={queue or provider} added={added} {_format_counts(counts)}")
+
+
+@queue_app.command("work")
+def queue_work(
+    provider: Annotated[str, typer.Option("--provider")],
+    queue: Annotated[str | None, typer.Option("--queue", help="default: the provider")] = None,
+    live: Annotated[bool, typer.Option("--live")] = False,
+    batch_size: Annotated[int, typer.Option("--batch-size", min=1)] = 50,
+    max_batches: Annotated[int | None, typer.Option("--max-batches", min=1)] = None,
+    concurrency: Annotated[int | None, typer.Option("--concurrency", min=1)] = None,
+    worker_id: Annotated[str | None, typer.Option("--worker-id")] = None,
+) -> None:
+    """Claim batches from the queue and run them until it is empty; start one per process."""
+    settings = AppSettings()
+    _check_provider(provider)
+    work_queue = WorkQueue(
+        settings.app_db_path,
+        lease_seconds=settings.app_queue_lease_seconds,
+        max_attempts=settings.app_queue_max_attempts,
+    )
+    try:
+        _run_providers(
+            [provider],
+            live=live,
+            limit=0,
+            concurrency=concurrency,
+            capture_mode=None,
+            settings=settings,
+            worker=QueueWorker(
+                work_queue,
+                queue or provider,
+                worker_id or f"{socket.gethostname()}:{os.getpid()}",
+                batch_size=batch_size,
+                max_batches=max_batches,
+            ),
+        )
+    finally:
+        typer.echo(
+            f"queue={queue or provider} {_format_counts(work_queue.counts(queue or provider))}"
+        )
+        work_queue.close()
+
+
+@queue_app.command("status")
+def queue_status(
+    queue: Annotated[str, typer.Argument(help="queue name (default: provider)")],
+) -> None:
+    """Print item counts per status."""
+    work_queue = WorkQueue(AppSettings().app_db_path)
+    try:
+        typer.echo(f"queue={queue} {_format_counts(work_queue.counts(queue))}")
+    finally:
+        work_queue.close()
+
+
+def _check_provider(provider: str) -> None:
+    if provider not in PROVIDERS:
+        raise typer.BadParameter(f"provider must be one of: {', '.join(PROVIDERS)}")
+
+
+def _format_counts(counts: dict[str, int]) -> str:
+    return " ".join(f"{status}={count}" for status, count in counts.items())
+
+
+def _run_providers(
+    providers: list[str],
+    *,
+    live: bool,
+    limit: int | None,
+    concurrency: int | None,
+    capture_mode: str | None,
+    settings: AppSettings,
+    worker: QueueWorker | None = None,
+) -> None:
+    # One provider keeps the flat layout; several get one section directory each.
+    run_dir = build_run_dir(settings.resolved_run_dir, "+".join(providers))
+    # Shared stages (storage, blobs, limiter) record into ``metrics``; each
+    # provider's client, pipeline and capture into its own instance, so its
+    # section run.json holds only its own series.
+    metrics = Metrics(enabled=settings.app_metrics_enabled)
+    captures = {
+        name: RunCapture(
+            run_dir / name if len(providers) > 1 else run_dir,
+            provider=name,
+            live=live,
+            limit=_limit_for(name, limit, settings),
+            pretty_max_bytes=settings.app_capture_pretty_max_bytes,
+            gzip_min_bytes=settings.app_capture_gzip_min_bytes,
+            queue_max_bytes=settings.app_capture_queue_max_bytes,
+            mode=capture_mode or settings.app_capture_mode,
+            sample_rate=settings.app_capture_sample_rate,
+            format=settings.app_capture_format,
+            segment_max_bytes=settings.app_capture_segment_max_bytes,
+            metrics=metrics if len(providers) == 1 else Metrics(enabled=metrics.enabled),
+        )
+        for name in providers
+    }
 
     log_path = run_dir / "run.log"
     with log_path.open("w", encoding="utf-8") as log_file:
@@ -49,53 +323,174 @@ def run(
 
         with contextlib.redirect_stdout(stdout_tee), contextlib.redirect_stderr(stderr_tee):
             _run_with_capture(
-                capture=capture,
-                provider=provider,
+                run_dir=run_dir,
+                captures=captures,
+                metrics=metrics,
                 live=live,
                 limit=limit,
-                fixture_root=fixture_root,
+                concurrency=concurrency,
+                fixture_root=FIXTURE_ROOT,
                 settings=settings,
+                worker=worker,
             )
 
 
 def _run_with_capture(
     *,
-    capture: RunCapture,
-    provider: str,
+    run_dir: Path,
+    captures: dict[str, RunCapture],
+    metrics: Metrics,
     live: bool,
-    limit: int,
+    limit: int | None,
+    concurrency: int | None,
     fixture_root: Path,
     settings: AppSettings,
+    worker: QueueWorker | None = None,
 ) -> None:
-    storage = SqliteStorage(settings.app_db_path)
-    blobs = BlobStore(settings.app_blob_dir)
-    limiter = GlobalRateLimiter()
+    """Run every captured provider against one storage writer and rate limiter.
+
+    Providers run on their own threads, each with its own ``HttpClient`` pool
+    and retry budget, so wall-clock time is the slowest provider's. The
+    limiter is host-scoped: providers on different hosts never wait on each
+    other, and providers on the same host share that host's budget.
+    """
+    blobs = BlobStore(settings.app_blob_dir, metrics=metrics)
+    storage = SqliteStorage(
+        settings.app_db_path,
+        batch_size=settings.app_db_write_batch_size,
+        flush_interval=settings.app_db_flush_interval_seconds,
+        write_queue_max=settings.app_db_write_queue_max,
+        body_store=blobs,
+        inline_max_bytes=settings.app_db_inline_body_max_bytes,
+        metrics=metrics,
+    )
+    limiter = GlobalRateLimiter.from_settings(settings, metrics=metrics)
+    parse_stage = ParseStage(
+        settings.app_parse_workers,
+        inline_max_bytes=settings.app_parse_inline_max_bytes,
+    )
+    shared = _SharedStages(
+        blobs=blobs,
+        storage=storage,
+        limiter=limiter,
+        parse_stage=parse_stage,
+        artifact_index=SeenArtifactIndex(storage) if settings.app_artifact_dedupe else None,
+    )
+
+    started_at = datetime.now(UTC)
+    try:
+        run_one = partial(
+            _run_provider,
+            shared=shared,
+            live=live,
+            limit=limit,
+            concurrency=concurrency,
+            fixture_root=fixture_root,
+            settings=settings,
+            worker=worker,
+        )
+        if len(captures) == 1:
+            succeeded = [run_one(*next(iter(captures.items())))]
+        else:
+            with ThreadPoolExecutor(
+                max_workers=len(captures), thread_name_prefix="provider"
+            ) as pool:
+                succeeded = list(pool.map(run_one, captures, captures.values()))
+    finally:
+        parse_stage.close()
+        limiter.close()
+        storage.close()
+
+    labels: dict[str, str] | None = None
+    if len(captures) > 1:
+        for provider, capture in captures.items():
+            metrics.merge(capture.metrics, {"provider": provider})
+        summary = write_run_summary(run_dir, captures, started_at=started_at, metrics=metrics)
+        typer.echo(f"providers={','.join(captures)} status={summary['status']} run_dir={run_dir}")
+    else:
+        labels = {"provider": next(iter(captures))}
+    if settings.app_metrics_prom_file is not None and metrics.enabled:
+        metrics.write_prometheus(settings.app_metrics_prom_file, labels=labels)
+    if not all(succeeded):
+        raise typer.Exit(code=1)
+
 
+@dataclass
+class _SharedStages:
+    blobs: BlobStore
+    storage: SqliteStorage
+    limiter: GlobalRateLimiter
+    parse_stage: ParseStage
+    artifact_index: SeenArtifactIndex | None
+
+
+def _run_provider(
+    provider: str,
+    capture: RunCapture,
+    *,
+    shared: _SharedStages,
+    live: bool,
+    limit: int | None,
+    concurrency: int | None,
+    fixture_root: Path,
+    settings: AppSettings,
+    worker: QueueWorker | None = None,
+) -> bool:
+    retry_budget = RetryBudget(max_retries=settings.app_retry_budget)
     try:
         with HttpClient(
             live=live,
             fixture_root=fixture_root,
-            rate_limiter=limiter,
+            rate_limiter=shared.limiter,
             sec_user_agent=settings.sec_user_agent,
             nrc_subscription_key=settings.resolved_nrc_subscription_key,
             attempt_observer=lambda a: _capture_attempt(capture, a),
+            spool_dir=shared.blobs.spool_dir,
+            validator_store=shared.storage,
+            retry_budget=retry_budget,
+            metrics=capture.metrics,
+            transport_profiles=TransportProfiles(settings.app_http_profiles),
         ) as client:
-            connectors = {
-                "sec_edgar": SecEdgarConnector(client),
-                "nrc_adams_aps": NrcAdamsApsConnector(client),
-            }
-            if provider not in connectors:
-                raise typer.BadParameter("provider must be one of: sec_edgar, nrc_adams_aps")
-
-            runner = PipelineRunner(storage=storage, blob_store=blobs)
-            result = runner.run(connectors[provider], limit=limit)
+            runner = PipelineRunner(
+                storage=shared.storage,
+                blob_store=shared.blobs,
+                concurrency=concurrency or settings.concurrency_for(provider),
+                artifact_index=shared.artifact_index,
+                metrics=capture.metrics,
+            )
+            connector = _build_connector(provider, client, shared, settings)
+            if worker is not None:
+                result = worker.run(runner, connector)
+            else:
+                result = runner.run(connector, limit=_limit_for(provider, limit, settings))
 
         for parse_error in result.get("parse_errors", []):
             capture.add_parse_error(parse_error)
         capture.set_artifacts(result.get("artifacts_manifest", []))
+        failed_batches = result.get("failed_batches", [])
+        for batch in failed_batches:
+            typer.echo(f"provider={provider} failed batch items={batch['item_ids']}", err=True)
+            typer.echo(f"  {batch['error']}", err=True)
         capture.finalize(
-            status="succeeded",
-            counts={"responses": result["responses"], "artifacts": result["artifacts"]},
+            # Some queued batches failed; their items are retried by later workers.
+            status="partial" if failed_batches else "succeeded",
+            counts={
+                "responses": result["responses"],
+                "artifacts": result["artifacts"],
+                "artifacts_skipped": result["artifacts_skipped"],
+                **(
+                    {
+                        "queue_items": result["items_done"],
+                        "queue_items_failed": sum(
+                            len(batch["item_ids"]) for batch in failed_batches
+                        ),
+                    }
+                    if worker is not None
+                    else {}
+                ),
+            },
+            retries=retry_budget.snapshot(),
+            failed_batches=failed_batches if worker is not None else None,
         )
 
         typer.echo(
@@ -103,6 +498,7 @@ def _run_with_capture(
             f"{provider} live={live} responses={result['responses']} "
             f"artifacts={result['artifacts']} run_dir={capture.run_dir}"
         )
+        return not failed_batches
     except Exception as exc:  # noqa: BLE001
         error_message = f"{type(exc).__name__}: {exc}"
         capture.write_error(error_message)
@@ -110,11 +506,62 @@ def _run_with_capture(
             status="failed",
             counts={"responses": 0, "artifacts": 0},
             exception=error_message,
+            retries=retry_budget.snapshot(),
         )
         traceback.print_exc()
-        raise typer.Exit(code=1) from exc
-    finally:
-        storage.close()
+        return False
+
+
+def _build_connector(
+    provider: str, client: HttpClient, shared: _SharedStages, settings: AppSettings
+) -> BaseConnector:
+    if provider == "sec_edgar":
+        return SecEdgarConnector(
+            client,
+            storage=shared.storage,
+            forms=settings.resolved_sec_forms,
+            date_from=settings.sec_filed_from,
+            date_to=settings.sec_filed_to,
+            max_filings=settings.sec_max_filings_per_cik,
+            overlap_seconds=int(settings.sec_watermark_overlap_hours * 3600),
+            parse_stage=shared.parse_stage,
+            ciks=_sec_universe(shared.storage, settings),
+        )
+    if provider == "sec_bulk":
+        return SecBulkSubmissionsConnector(
+            client,
+            shared.storage,
+            parse_workers=settings.sec_bulk_parse_workers,
+            max_bytes=settings.sec_bulk_max_bytes,
+        )
+    return NrcAdamsApsConnector(
+        client,
+        storage=shared.storage,
+        take=settings.nrc_aps_take,
+        overlap_seconds=int(settings.nrc_watermark_overlap_hours * 3600),
+        parse_stage=shared.parse_stage,
+    )
+
+
+def _limit_for(provider: str, limit: int | None, settings: AppSettings) -> int:
+    # A configured CIK universe is planned whole unless --limit says otherwise.
+    if limit is not None:
+        return limit
+    if provider == "sec_edgar" and (settings.sec_cik_file or settings.sec_cik_db):
+        return 0
+    return 1
+
+
+def _sec_universe(storage: SqliteStorage, settings: AppSettings) -> CikUniverse | None:
+    if settings.sec_cik_file is None and settings.sec_cik_db is None:
+        return None
+    return CikUniverse(
+        cik_file=settings.sec_cik_file,
+        cik_db=settings.sec_cik_db,
+        order=settings.sec_plan_order,
+        shard=settings.resolved_sec_plan_shard,
+        last_synced=partial(storage.last_synced, SecEdgarConnector.provider),
+    )
 
 
 def _capture_attempt(capture: RunCapture, attempt: HttpAttempt) -> None:
@@ -130,6 +577,11 @@ def _capture_attempt(capture: RunCapture, attempt: HttpAttempt) -> None:
             attempt_number=attempt.attempt_number,
             error_type=attempt.error_type,
             error_message=attempt.error_message,
+            body_path=attempt.body_path,
+            sha256=attempt.sha256,
+            elapsed_seconds=attempt.elapsed_seconds,
+            byte_count=attempt.byte_count,
+            body_encoding=attempt.body_encoding,
         )
     )
 
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
 
 from api_etl_pipeline.http_client import CapturedResponse
+from api_etl_pipeline.parse_stage import INLINE_PARSE_STAGE, ParseStage
 
 
 @dataclass
@@ -12,15 +14,57 @@ class ArtifactTarget:
     fixture_name: str
 
 
+@dataclass
+class FetchedItem:
+    item_index: int
+    metadata_item: dict
+    metadata_response: CapturedResponse | None
+    artifacts: list[tuple[ArtifactTarget, CapturedResponse]] = field(default_factory=list)
+
+
 class BaseConnector(ABC):
     provider: str
+    parse_stage: ParseStage = INLINE_PARSE_STAGE
+
+    def __init_subclass__(cls, **kwargs: object) -> None:
+        # Either metadata path is enough, but a connector must provide one.
+        super().__init_subclass__(**kwargs)
+        split = all(
+            getattr(cls, name) is not getattr(BaseConnector, name)
+            for name in ("fetch_metadata", "parse_metadata")
+        )
+        if cls.fetch_metadata_item is BaseConnector.fetch_metadata_item and not split:
+            raise TypeError(
+                f"{cls.__name__} must override fetch_metadata_item,"
+                " or both fetch_metadata and parse_metadata"
+            )
 
     @abstractmethod
-    def plan(self, limit: int) -> list[dict]:
+    def plan(self, limit: int) -> Iterable[dict]:
         raise NotImplementedError
 
-    @abstractmethod
-    def fetch_metadata_item(self, item: dict, item_index: int) -> tuple[dict, CapturedResponse]:
+    def queue_plan(self, limit: int) -> Iterable[dict]:
+        """Plan items for the work queue, which must be JSON; the default is ``plan``."""
+        return self.plan(limit)
+
+    def fetch_metadata_item(
+        self, item: dict, item_index: int
+    ) -> tuple[dict, CapturedResponse | None]:
+        """Return the metadata item and its response (``None`` if no request was needed).
+
+        The default runs ``fetch_metadata`` (network only) and then
+        ``parse_metadata``; connectors override either both halves or this.
+        """
+        response = self.fetch_metadata(item, item_index)
+        return self.parse_metadata(item, item_index, response), response
+
+    def fetch_metadata(self, item: dict, item_index: int) -> CapturedResponse | None:
+        raise NotImplementedError
+
+    def parse_metadata(
+        self, item: dict, item_index: int, response: CapturedResponse | None
+    ) -> dict:
+        """Build the metadata item; heavy body decoding goes through ``parse_stage``."""
         raise NotImplementedError
 
     @abstractmethod
@@ -29,6 +73,64 @@ class BaseConnector(ABC):
     ) -> tuple[ArtifactTarget, CapturedResponse] | None:
         raise NotImplementedError
 
+    def download_artifacts(
+        self, metadata_item: dict, item_index: int
+    ) -> list[tuple[ArtifactTarget, CapturedResponse]]:
+        """Every artifact of one item; the default is ``download_artifact``'s single one."""
+        artifact = self.download_artifact(metadata_item, item_index)
+        return [artifact] if artifact is not None else []
+
+    def artifact_skipped(self, metadata_item: dict, target: ArtifactTarget) -> None:
+        """``target`` was dropped before download because it is already stored."""
+        del metadata_item, target
+
     @abstractmethod
     def checkpoint(self) -> None:
         raise NotImplementedError
+
+    def discard_pending(self) -> None:
+        """Forget what was recorded since the last ``checkpoint``; its items were not stored."""
+        return None
+
+    def fetch_item(
+        self,
+        item: dict,
+        item_index: int,
+        *,
+        is_stored: Callable[[str], bool] | None = None,
+    ) -> FetchedItem:
+        """Network half of one plan item; safe to run on a worker thread.
+
+        Connectors only hold the shared ``HttpClient`` (which serializes rate
+        limiting internally), so the default is pool-friendly as long as
+        ``fetch_metadata_item``/``download_artifacts`` keep no per-item state.
+        Targets whose URL ``is_stored`` accepts are dropped before any
+        download and reported through ``artifact_skipped``.
+        """
+        metadata_item, metadata_response = self.fetch_metadata_item(item, item_index)
+        if is_stored is not None:
+            self._drop_stored_targets(metadata_item, is_stored)
+        return FetchedItem(
+            item_index=item_index,
+            metadata_item=metadata_item,
+            metadata_response=metadata_response,
+            artifacts=self.download_artifacts(metadata_item, item_index),
+        )
+
+    def _drop_stored_targets(self, metadata_item: dict, is_stored: Callable[[str], bool]) -> None:
+        # Connectors put one target under "artifact" or several under "artifacts".
+        skipped: list[ArtifactTarget] = []
+        target = metadata_item.get("artifact")
+        if isinstance(target, ArtifactTarget) and is_stored(target.url):
+            del metadata_item["artifact"]
+            skipped.append(target)
+        targets = metadata_item.get("artifacts")
+        if isinstance(targets, list):
+            kept: list[ArtifactTarget] = []
+            for target in targets:
+                (skipped if is_stored(target.url) else kept).append(target)
+            metadata_item["artifacts"] = kept
+        for target in skipped:
+            self.artifact_skipped(metadata_item, target)
+        if skipped:
+            metadata_item["artifacts_skipped"] = len(skipped)
@@ -1,68 +1,185 @@
 import json
+import threading
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime
+from typing import NamedTuple
+
+import httpx
 
 from api_etl_pipeline.connectors.base import ArtifactTarget, BaseConnector
 from api_etl_pipeline.http_client import CapturedResponse, HttpClient
+from api_etl_pipeline.parse_stage import INLINE_PARSE_STAGE, ParseStage
+from api_etl_pipeline.storage.db import SqliteStorage
+
+APS_SEARCH_URL = "https://adams-api.nrc.gov/aps/api/search"
+# Dossier APS-V8 probe sizes, largest first; a 400 steps down to the next one.
+TAKE_CANDIDATES = (1000, 500, 100)
+WATERMARK_OVERLAP_SECONDS = 3 * 24 * 3600
+
+
+class ApsDocument(NamedTuple):
+    url: str | None
+    accession_number: str | None
+    date_added: int | None
+
+
+class _Page(NamedTuple):
+    response: CapturedResponse
+    documents: list[ApsDocument] | None
+    error: dict | None
 
 
 class NrcAdamsApsConnector(BaseConnector):
+    """APS full-text search, paged with ``skip`` (dossier Endpoint 2, §4.1-4.2).
+
+    ``plan`` is a generator: each search page is turned into one plan item per
+    new document, and the next page is requested on a background thread while
+    the pipeline downloads the current page's documents. Paging stops at an
+    empty page, a page shorter than the largest one seen, or (incremental runs)
+    a page entirely older than the watermark window. The largest ``take`` the
+    service accepts is discovered by stepping down ``TAKE_CANDIDATES`` on 400.
+    ``queue_plan`` stores one JSON page descriptor per search page instead.
+
+    With ``storage`` set, the query keeps a ``DateAddedTimestamp`` watermark:
+    searches filter on ``watermark - overlap_seconds`` and accession numbers
+    already stored inside that window are skipped. The watermark only advances
+    after a sync that paged to the end.
+    """
+
     provider = "nrc_adams_aps"
 
-    def __init__(self, http: HttpClient) -> None:
+    def __init__(
+        self,
+        http: HttpClient,
+        *,
+        storage: SqliteStorage | None = None,
+        query: str = "reactor",
+        take: int | None = None,
+        overlap_seconds: int = WATERMARK_OVERLAP_SECONDS,
+        parse_stage: ParseStage = INLINE_PARSE_STAGE,
+    ) -> None:
         self.http = http
+        self.parse_stage = parse_stage
+        self.storage = storage
+        self.query = query
+        self.overlap_seconds = overlap_seconds
+        self._take_pinned = take is not None
+        self._take: int | None = take if take is not None else TAKE_CANDIDATES[0]
+        self._sync_watermark: int | None = None
+        self._pending: dict[str, int] = {}
+        self._pending_lock = threading.Lock()
 
-    def plan(self, limit: int) -> list[dict]:
-        return [{"query": "reactor"}][: max(limit, 1)]
-
-    def fetch_metadata_item(self, item: dict, item_index: int) -> tuple[dict, CapturedResponse]:
-        url = "https://adams-api.nrc.gov/aps/api/search"
-        body = {
-            "q": item.get("query", "reactor"),
-            "filters": [],
-            "anyFilters": [],
-            "legacyLibFilter": True,
-            "mainLibFilter": True,
-            "sort": "",
-            "sortDirection": 1,
-            "skip": 0,
-        }
+    @property
+    def take(self) -> int | None:
+        """Page size in use; ``None`` once every candidate was rejected."""
+        return self._take
 
-        captured = self.http.post(
-            url,
-            provider=self.provider,
-            fixture_name="search.json",
-            json_body=body,
-        )
+    def plan(self, limit: int) -> Iterator[dict]:
+        """One item per new document; ``limit`` caps documents per run, ``0`` pages to the end."""
+        return self._paginate(limit)
+
+    def queue_plan(self, limit: int) -> Iterator[dict]:
+        """One ``{"query", "skip", "take", "page", "floor"}`` item per search page.
+
+        Paging stops where ``plan`` would, except that ``limit`` is rounded up
+        to whole pages; workers repeat each search and take its new documents.
+        """
+        floor, _ = self._window()
+        largest_page = 0
+        listed = 0
+        skip = 0
+        page_number = 1
+        while True:
+            documents = self._search(skip, page_number, floor).documents
+            if documents == []:
+                return
+            yield {
+                "query": self.query,
+                "skip": skip,
+                "take": self._take,
+                "page": page_number,
+                "floor": floor,
+            }
+            if documents is None:
+                return
+            largest_page = max(largest_page, len(documents))
+            listed += len(documents)
+            stale = floor is not None and all(
+                doc.date_added is not None and doc.date_added < floor for doc in documents
+            )
+            if len(documents) < largest_page or stale or 0 < limit <= listed:
+                return
+            skip += len(documents)
+            page_number += 1
 
+    def fetch_metadata_item(
+        self, item: dict, item_index: int
+    ) -> tuple[dict, CapturedResponse | None]:
+        if "skip" in item:
+            return self._fetch_queued_page(item, item_index)
+        # The search already ran in ``plan``; the page's response rides on its
+        # first item so it is stored exactly once.
+        response: CapturedResponse | None = item.get("page_response")
         metadata_item: dict = {}
-        if captured.status_code != 200:
-            preview = captured.body[:400].decode("utf-8", errors="replace")
+        error = item.get("parse_error")
+        if isinstance(error, dict):
             metadata_item["parse_error"] = {
                 "provider": self.provider,
-                "stage": "fetch_metadata",
-                "message": f"APS search non-200 ({captured.status_code}): {preview}",
-                "url": captured.url,
+                **error,
+                "url": response.url if response is not None else APS_SEARCH_URL,
                 "item_index": item_index,
                 "response_id": None,
             }
-            return metadata_item, captured
-
-        payload = self._safe_json(captured.body)
-        artifact_url = self._extract_first_pdf_url(payload)
-        if artifact_url:
+        document: ApsDocument | None = item.get("document")
+        if document is not None and document.url:
             metadata_item["artifact"] = ArtifactTarget(
-                url=artifact_url,
-                fixture_name="document.pdf",
+                url=document.url, fixture_name="document.pdf"
             )
-        else:
-            metadata_item["parse_error"] = {
-                "provider": self.provider,
-                "stage": "parse_metadata",
-                "message": "Could not locate PDF URL in APS payload",
-                "url": captured.url,
-                "item_index": item_index,
-                "response_id": None,
-            }
-        return metadata_item, captured
+            metadata_item["document"] = document
+        return metadata_item, response
+
+    def _fetch_queued_page(
+        self, descriptor: dict, item_index: int
+    ) -> tuple[dict, CapturedResponse | None]:
+        if descriptor["query"] != self.query:
+            raise ValueError(f"queued page belongs to query {descriptor['query']!r}")
+        page = self._search_page(descriptor)
+        metadata_item, _ = self.fetch_metadata_item(
+            {"page_response": page.response, "parse_error": page.error}, item_index
+        )
+        floor = descriptor["floor"]
+        _, seen = self._window()
+        documents: dict[str, ApsDocument] = {}
+        for document in page.documents or []:
+            if not document.url or document.accession_number in seen:
+                continue
+            if floor is not None and (document.date_added or floor) < floor:
+                continue
+            if document.accession_number:
+                seen.add(document.accession_number)
+            documents.setdefault(document.url, document)
+        metadata_item["documents"] = documents
+        metadata_item["artifacts"] = [
+            ArtifactTarget(url=url, fixture_name="document.pdf") for url in documents
+        ]
+        return metadata_item, page.response
+
+    def download_artifacts(
+        self, metadata_item: dict, item_index: int
+    ) -> list[tuple[ArtifactTarget, CapturedResponse]]:
+        # Queued pages carry every document of the page under "artifacts".
+        if "artifacts" not in metadata_item:
+            return super().download_artifacts(metadata_item, item_index)
+        downloaded = []
+        for target in metadata_item["artifacts"]:
+            document = metadata_item["documents"][target.url]
+            artifact = self.download_artifact(
+                {"artifact": target, "document": document}, item_index
+            )
+            if artifact is not None:
+                downloaded.append(artifact)
+        return downloaded
 
     def download_artifact(
         self, metadata_item: dict, item_index: int
@@ -71,41 +188,266 @@ class NrcAdamsApsConnector(BaseConnector):
         target = metadata_item.get("artifact")
         if not isinstance(target, ArtifactTarget):
             return None
-        captured = self.http.get(
+        captured = self.http.stream_get(
             target.url,
             provider=self.provider,
             fixture_name=target.fixture_name,
         )
+        self._remember(metadata_item)
         return target, captured
 
+    def artifact_skipped(self, metadata_item: dict, target: ArtifactTarget) -> None:
+        documents = metadata_item.get("documents", {})
+        self._remember({"document": documents.get(target.url, metadata_item.get("document"))})
+
     def checkpoint(self) -> None:
-        return None
+        # Runs after the pipeline committed the artifacts, like the SEC watermark.
+        if self.storage is None:
+            return
+        with self._pending_lock:
+            seen, self._pending = self._pending, {}
+        watermark, self._sync_watermark = self._sync_watermark, None
+        if seen or watermark is not None:
+            self.storage.put_watermark(
+                self.provider,
+                self.query,
+                watermark=watermark,
+                seen=seen,
+                retain_seconds=self.overlap_seconds,
+            )
 
-    @staticmethod
-    def _safe_json(body: bytes) -> dict:
-        try:
-            payload = json.loads(body)
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            return {}
-        return payload if isinstance(payload, dict) else {}
-
-    @staticmethod
-    def _extract_first_pdf_url(payload: dict) -> str | None:
-        results = payload.get("results") or payload.get("Results")
-        if not isinstance(results, list) or not results:
-            return None
-        first = results[0]
-        if not isinstance(first, dict):
-            return None
-        pdf_url = first.get("pdfUrl") or first.get("PdfUrl")
-        if isinstance(pdf_url, str) and pdf_url:
-            return pdf_url
-        doc = first.get("document") or first.get("Document")
-        if isinstance(doc, dict):
-            doc_url = doc.get("Url") or doc.get("url")
-            if isinstance(doc_url, str) and doc_url:
-                return doc_url
-        direct_url = first.get("Url") or first.get("url")
-        if isinstance(direct_url, str) and direct_url:
-            return direct_url
+    def discard_pending(self) -> None:
+        with self._pending_lock:
+            self._pending = {}
+        self._sync_watermark = None
+
+    def _remember(self, metadata_item: dict) -> None:
+        document: ApsDocument | None = metadata_item.get("document")
+        if self.storage is not None and document is not None and document.accession_number:
+            with self._pending_lock:
+                self._pending[document.accession_number] = document.date_added or 0
+
+    def _paginate(self, limit: int) -> Iterator[dict]:
+        floor, seen = self._window()
+        emitted = 0
+        largest_page = 0
+        newest: int | None = None
+        skip = 0
+        page_number = 1
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="aps-page") as pool:
+            pending: Future[_Page] | None = pool.submit(self._search, skip, page_number, floor)
+            try:
+                while pending is not None:
+                    page = pending.result()
+                    pending = None
+                    documents = page.documents
+                    if documents is None:
+                        yield {"page_response": page.response, "parse_error": page.error}
+                        return
+
+                    largest_page = max(largest_page, len(documents))
+                    stale = floor is not None and all(
+                        doc.date_added is not None and doc.date_added < floor for doc in documents
+                    )
+                    last = not documents or len(documents) < largest_page or stale
+
+                    items: list[dict] = []
+                    for document in documents:
+                        if document.date_added is not None:
+                            newest = max(newest or 0, document.date_added)
+                        if not document.url or document.accession_number in seen:
+                            continue
+                        if floor is not None and (document.date_added or floor) < floor:
+                            continue
+                        if limit > 0 and emitted + len(items) >= limit:
+                            break
+                        if document.accession_number:
+                            seen.add(document.accession_number)
+                        items.append({"document": document})
+                    emitted += len(items)
+                    capped = limit > 0 and emitted >= limit
+
+                    if not last and not capped:
+                        # Prefetch: the next search runs while the pipeline
+                        # downloads this page's documents.
+                        skip += len(documents)
+                        page_number += 1
+                        pending = pool.submit(self._search, skip, page_number, floor)
+
+                    if documents and not any(doc.url for doc in documents):
+                        items.insert(
+                            0,
+                            {
+                                "parse_error": {
+                                    "stage": "parse_metadata",
+                                    "message": "Could not locate PDF URL in APS payload",
+                                }
+                            },
+                        )
+                    if not items:
+                        items.append({})
+                    items[0]["page_response"] = page.response
+                    yield from items
+
+                    if last and not capped:
+                        # Only a sync that paged to the end may move the watermark.
+                        self._sync_watermark = newest
+            finally:
+                if pending is not None:
+                    pending.cancel()
+
+    def _search(self, skip: int, page_number: int, floor: int | None) -> _Page:
+        fixture_name = "search.json" if page_number == 1 else f"search-{page_number:03d}.json"
+        while True:
+            try:
+                captured = self.http.post(
+                    APS_SEARCH_URL,
+                    provider=self.provider,
+                    fixture_name=fixture_name,
+                    json_body=self._search_body(skip, floor, self._take),
+                )
+            except httpx.HTTPStatusError as exc:
+                rejected_take = exc.response.status_code == 400 and self._take is not None
+                if not rejected_take or self._take_pinned:
+                    raise
+                self._take = _next_take(self._take)
+                continue
+            break
+        return self._page(captured)
+
+    def _search_page(self, descriptor: dict) -> _Page:
+        # A queued page repeats the search it was planned with, ``take`` included,
+        # so its ``skip`` still lines up.
+        page_number = descriptor["page"]
+        body = self._search_body(descriptor["skip"], descriptor["floor"], descriptor["take"])
+        captured = self.http.post(
+            APS_SEARCH_URL,
+            provider=self.provider,
+            fixture_name="search.json" if page_number == 1 else f"search-{page_number:03d}.json",
+            json_body=body,
+        )
+        return self._page(captured)
+
+    def _page(self, captured: CapturedResponse) -> _Page:
+        if captured.status_code != 200:
+            preview = captured.body[:400].decode("utf-8", errors="replace")
+            return _Page(
+                captured,
+                None,
+                {
+                    "stage": "fetch_metadata",
+                    "message": f"APS search non-200 ({captured.status_code}): {preview}",
+                },
+            )
+        documents = self.parse_stage.parse(parse_search_page, captured)
+        if documents is None:
+            return _Page(
+                captured,
+                None,
+                {
+                    "stage": "parse_metadata",
+                    "message": "APS payload has neither results[] nor documents[]",
+                },
+            )
+        return _Page(captured, documents, None)
+
+    def _search_body(self, skip: int, floor: int | None, take: int | None) -> dict:
+        # Authoritative searchCriteria shape (dossier §3.2), newest first so
+        # documents added mid-sync shift offsets into duplicates, not gaps.
+        properties: list[dict] = []
+        if floor is not None:
+            # APS-V5: ``ge`` on DateAddedTimestamp is unconfirmed, so results are
+            # also filtered client-side.
+            properties.append(
+                {
+                    "name": "DateAddedTimestamp",
+                    "operator": "ge",
+                    "value": datetime.fromtimestamp(floor, UTC).date().isoformat(),
+                }
+            )
+        body: dict = {
+            "skip": skip,
+            "sort": "DateAddedTimestamp",
+            "sortDirection": 1,
+            "searchCriteria": {
+                "q": self.query,
+                "mainLibFilter": True,
+                "legacyLibFilter": True,
+                "properties": properties,
+            },
+        }
+        if take is not None:
+            body["take"] = take
+        return body
+
+    def _window(self) -> tuple[int | None, set[str]]:
+        if self.storage is None:
+            return None, set()
+        watermark, seen = self.storage.get_watermark(self.provider, self.query)
+        floor = watermark - self.overlap_seconds if watermark is not None else None
+        return floor, seen
+
+
+def _next_take(take: int) -> int | None:
+    smaller = [candidate for candidate in TAKE_CANDIDATES if candidate < take]
+    return smaller[0] if smaller else None
+
+
+def parse_search_page(body: bytes) -> list[ApsDocument] | None:
+    """Parse step for a search page body; ``None`` when it has no result list."""
+    try:
+        payload = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        payload = None
+    return _documents(payload if isinstance(payload, dict) else {})
+
+
+def _documents(payload: dict) -> list[ApsDocument] | None:
+    # Dossier §3.5: ``results`` (primary) or ``documents`` (alternate) at the root.
+    for key in ("results", "Results", "documents", "Documents"):
+        entries = payload.get(key)
+        if isinstance(entries, list):
+            return [_document(entry) for entry in entries if isinstance(entry, dict)]
+    return None
+
+
+def _document(entry: dict) -> ApsDocument:
+    nested = entry.get("document") or entry.get("Document")
+    nested = nested if isinstance(nested, dict) else {}
+    return ApsDocument(
+        url=_first_str(
+            entry.get("pdfUrl"),
+            entry.get("PdfUrl"),
+            nested.get("Url"),
+            nested.get("url"),
+            entry.get("Url"),
+            entry.get("url"),
+        ),
+        accession_number=_first_str(
+            nested.get("AccessionNumber"),
+            entry.get("AccessionNumber"),
+            entry.get("accessionNumber"),
+        ),
+        date_added=_epoch_seconds(
+            _first_str(nested.get("DateAddedTimestamp"), entry.get("DateAddedTimestamp"))
+        ),
+    )
+
+
+def _first_str(*values: object) -> str | None:
+    for value in values:
+        if isinstance(value, str) and value:
+            return value
+    return None
+
+
+def _epoch_seconds(value: str | None) -> int | None:
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
         return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return int(parsed.timestamp())
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import zipfile
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import replace
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+
+import httpx
+
+from api_etl_pipeline.connectors.base import ArtifactTarget, BaseConnector
+from api_etl_pipeline.downloads import inflate_file
+from api_etl_pipeline.http_client import CapturedResponse, HttpClient
+from api_etl_pipeline.storage.db import SqliteStorage
+
+BULK_SUBMISSIONS_URL = "https://www.sec.gov/Archives/edgar/daily-index/bulkdata/submissions.zip"
+MEMBER_BATCH_SIZE = 500
+CIK_PATTERN = re.compile(r"CIK(\d{10})")
+
+
+class SecBulkSubmissionsConnector(BaseConnector):
+    """Backfill from the nightly ``submissions.zip`` snapshot (dossier Endpoint 2).
+
+    The ZIP is streamed to the spool like any artifact and its members are read
+    in place with ``zipfile``, parsed in batches on a process pool. Snapshots
+    are keyed by ``(url, fetch_date_utc)``: the same sha256 for a key is a
+    no-op, a different one is a reissue and the members are ingested again,
+    deduplicated by ``(source_url, sha256)``.
+    """
+
+    provider = "sec_bulk"
+
+    def __init__(
+        self,
+        http: HttpClient,
+        storage: SqliteStorage,
+        *,
+        parse_workers: int | None = None,
+        max_bytes: int = 8 * 1024 * 1024 * 1024,
+        batch_size: int = MEMBER_BATCH_SIZE,
+        today: Callable[[], str] | None = None,
+    ) -> None:
+        self.http = http
+        self.storage = storage
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.max_bytes = max_bytes
+        self.batch_size = batch_size
+        self._today = today or (lambda: datetime.now(UTC).date().isoformat())
+        self._snapshots: list[dict] = []
+
+    def plan(self, limit: int) -> list[dict]:
+        # One snapshot per run; ``limit`` does not apply to a bulk download.
+        del limit
+        return [{"url": BULK_SUBMISSIONS_URL}]
+
+    def fetch_metadata_item(
+        self, item: dict, item_index: int
+    ) -> tuple[dict, CapturedResponse | None]:
+        del item_index
+        target = ArtifactTarget(url=str(item["url"]), fixture_name="submissions.zip")
+        return {"artifact": target, "fetch_date_utc": self._today()}, None
+
+    def download_artifact(
+        self, metadata_item: dict, item_index: int
+    ) -> tuple[ArtifactTarget, CapturedResponse] | None:
+        target: ArtifactTarget = metadata_item["artifact"]
+        fetch_date_utc: str = metadata_item["fetch_date_utc"]
+        try:
+            captured = self.http.stream_get(
+                target.url,
+                provider=self.provider,
+                fixture_name=target.fixture_name,
+                max_bytes=self.max_bytes,
+            )
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 404:
+                raise
+            metadata_item["parse_error"] = self._error(
+                "bulk_snapshot_missing",
+                f"submissions.zip unavailable for fetch_date_utc={fetch_date_utc}; "
+                "fall back to per-CIK polling (provider sec_edgar) for this window",
+                target.url,
+                item_index,
+            )
+            return None
+
+        assert captured.body_path is not None and captured.sha256 is not None
+        if captured.body_encoding is not None:
+            # Members are read in place by offset, so the ZIP itself must be decoded.
+            inflate_file(captured.body_path, captured.body_encoding)
+            captured = replace(captured, body_encoding=None)
+        stored = self.storage.get_bulk_snapshot(target.url, fetch_date_utc)
+        with zipfile.ZipFile(captured.body_path) as archive:
+            names = [name for name in archive.namelist() if name.endswith(".json")]
+
+        if stored == captured.sha256 or (
+            stored is None and self.storage.bulk_snapshot_ingested(target.url, captured.sha256)
+        ):
+            # Same bytes as an ingested snapshot: every member row already exists.
+            metadata_item["not_modified"] = True
+        else:
+            metadata_item["reissue"] = stored is not None
+            failed = self._ingest(captured, names)
+            if failed:
+                metadata_item["parse_error"] = self._error(
+                    "parse_bulk_member",
+                    f"{len(failed)} member(s) were not valid JSON, first={failed[0]}",
+                    target.url,
+                    item_index,
+                )
+
+        self._snapshots.append(
+            {
+                "url": target.url,
+                "fetch_date_utc": fetch_date_utc,
+                "sha256": captured.sha256,
+                "byte_count": captured.size,
+                "members": len(names),
+            }
+        )
+        return target, captured
+
+    def checkpoint(self) -> None:
+        # Runs after the pipeline has stored the ZIP and flushed member rows, so a
+        # snapshot is only recorded once its ingestion is durable.
+        for snapshot in self._snapshots:
+            self.storage.put_bulk_snapshot(**snapshot)
+        self._snapshots.clear()
+
+    def _ingest(self, captured: CapturedResponse, names: list[str]) -> list[str]:
+        parse = partial(
+            parse_member_batch,
+            str(captured.body_path),
+            url=captured.url,
+            snapshot_sha256=captured.sha256,
+        )
+        batches = [
+            names[start : start + self.batch_size]
+            for start in range(0, len(names), self.batch_size)
+        ]
+        inserts: list[Future[int]] = []
+        failed: list[str] = []
+
+        def submit(rows: list[dict], bad: list[str]) -> None:
+            inserts.append(self.storage.submit_submission_members(rows))
+            failed.extend(bad)
+
+        if self.parse_workers <= 1 or len(batches) <= 1:
+            for batch in batches:
+                submit(*parse(batch))
+        else:
+            # spawn: the parent runs writer and fetch threads, which fork would copy mid-lock.
+            with ProcessPoolExecutor(
+                max_workers=min(self.parse_workers, len(batches)),
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                for rows, bad in pool.map(parse, batches):
+                    submit(rows, bad)
+        for insert in inserts:
+            insert.result()
+        return failed
+
+    def _error(self, stage: str, message: str, url: str, item_index: int) -> dict:
+        return {
+            "provider": self.provider,
+            "stage": stage,
+            "message": message,
+            "url": url,
+            "item_index": item_index,
+            "response_id": None,
+        }
+
+
+def parse_member_batch(
+    zip_path: str, names: list[str], *, url: str, snapshot_sha256: str
+) -> tuple[list[dict], list[str]]:
+    """Parse ``names`` from the ZIP at ``zip_path``; runs in a worker process."""
+    rows: list[dict] = []
+    failed: list[str] = []
+    with zipfile.ZipFile(zip_path) as archive:
+        for name in names:
+            raw = archive.read(name)
+            try:
+                payload = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                failed.append(name)
+                continue
+            if not isinstance(payload, dict):
+                failed.append(name)
+                continue
+            rows.append(_member_row(name, raw, payload, url=url, snapshot_sha256=snapshot_sha256))
+    return rows, failed
+
+
+def _member_row(name: str, raw: bytes, payload: dict, *, url: str, snapshot_sha256: str) -> dict:
+    # Primary members carry filings.recent; shard members (CIK...-submissions-NNN.json)
+    # are the column arrays themselves.
+    filings = payload.get("filings")
+    recent = filings.get("recent") if isinstance(filings, dict) else payload
+    recent = recent if isinstance(recent, dict) else {}
+    accessions = recent.get("accessionNumber")
+    accessions = accessions if isinstance(accessions, list) else []
+    dates = recent.get("filingDate")
+    dates = dates if isinstance(dates, list) else []
+
+    cik = payload.get("cik")
+    if cik is None:
+        match = CIK_PATTERN.search(Path(name).name)
+        cik = match.group(1) if match else None
+    return {
+        "source_url": f"{url}#{name}",
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "snapshot_sha256": snapshot_sha256,
+        "cik": str(cik).zfill(10) if cik is not None else None,
+        "entity_name": payload.get("name") if isinstance(payload.get("name"), str) else None,
+        "filing_count": len(accessions),
+        "latest_accession": accessions[0] if accessions else None,
+        "latest_filing_date": dates[0] if dates else None,
+    }
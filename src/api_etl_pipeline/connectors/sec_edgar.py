@@ -1,49 +1,138 @@
-import json
+import threading
+from collections.abc import Collection, Iterable, Iterator
+from datetime import UTC, date, datetime
+from itertools import islice
+from typing import NamedTuple
+
+import httpx
 
 from api_etl_pipeline.connectors.base import ArtifactTarget, BaseConnector
+from api_etl_pipeline.connectors.sec_filings import (
+    FilingColumns,
+    FilingShard,
+    decode_shard,
+    decode_submissions,
+    iter_shards,
+    pack_date,
+)
 from api_etl_pipeline.http_client import CapturedResponse, HttpClient
+from api_etl_pipeline.parse_stage import INLINE_PARSE_STAGE, ParseStage
+from api_etl_pipeline.storage.db import SqliteStorage
+
+WATERMARK_OVERLAP_SECONDS = 48 * 3600
+DEFAULT_CIK = "0000320193"
+
+
+class _SyncWindow(NamedTuple):
+    floor: int | None
+    seen: frozenset[str]
+
+
+class _Selected(NamedTuple):
+    target: ArtifactTarget
+    accession_number: str
+    accepted_at: int
 
 
 class SecEdgarConnector(BaseConnector):
+    """Per-CIK ``submissions`` polling (dossier Endpoint 1).
+
+    With ``storage`` set, each CIK keeps an ``acceptanceDateTime`` watermark
+    (dossier §4.1 Strategy A): only filings accepted after ``watermark -
+    overlap_seconds`` are considered and accessions already seen inside that
+    overlap are dropped before any artifact request. The watermark advances in
+    ``checkpoint()``, after the pipeline has committed the artifacts.
+    """
+
     provider = "sec_edgar"
 
-    def __init__(self, http: HttpClient) -> None:
+    def __init__(
+        self,
+        http: HttpClient,
+        *,
+        storage: SqliteStorage | None = None,
+        forms: Collection[str] | None = None,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        max_filings: int = 1,
+        overlap_seconds: int = WATERMARK_OVERLAP_SECONDS,
+        parse_stage: ParseStage = INLINE_PARSE_STAGE,
+        ciks: Iterable[str] | None = None,
+    ) -> None:
+        """``max_filings`` caps artifacts per CIK per run; ``0`` means no cap.
+
+        Without a watermark the newest filings win; once a CIK has one, the
+        oldest unseen filings go first so the watermark never skips past any.
+        ``files[]`` shards are only fetched when ``filings.recent`` alone cannot
+        satisfy the cap, the filters and the watermark window. ``ciks`` is
+        re-iterated by every ``plan`` call (e.g. a ``CikUniverse``); without
+        it the plan is the single fixture CIK.
+        """
         self.http = http
+        self.storage = storage
+        self.forms = frozenset(forms) if forms else None
+        self.date_from = date_from
+        self.date_to = date_to
+        self.max_filings = max(max_filings, 0)
+        self.overlap_seconds = overlap_seconds
+        self.parse_stage = parse_stage
+        self.ciks = ciks if ciks is not None else (DEFAULT_CIK,)
+        self._pending: dict[str, dict[str, int]] = {}
+        self._pending_lock = threading.Lock()
 
-    def plan(self, limit: int) -> list[dict]:
-        return [{"cik10": "0000320193"}][: max(limit, 1)]
+    def plan(self, limit: int) -> Iterator[dict]:
+        """One ``{"cik10"}`` item per CIK, read lazily; ``limit`` caps items, ``0`` means all."""
+        return ({"cik10": cik10} for cik10 in islice(self.ciks, limit or None))
 
-    def fetch_metadata_item(self, item: dict, item_index: int) -> tuple[dict, CapturedResponse]:
-        cik10 = str(item.get("cik10", "0000320193"))
-        url = f"https://data.sec.gov/submissions/CIK{cik10}.json"
-        captured = self.http.get(url, provider=self.provider, fixture_name="submissions.json")
+    def fetch_metadata(self, item: dict, item_index: int) -> CapturedResponse:
+        del item_index
+        cik10 = str(item.get("cik10", DEFAULT_CIK))
+        return self.http.get(
+            f"https://data.sec.gov/submissions/CIK{cik10}.json",
+            provider=self.provider,
+            fixture_name="submissions.json",
+            conditional=True,
+        )
 
+    def parse_metadata(
+        self, item: dict, item_index: int, response: CapturedResponse | None
+    ) -> dict:
+        assert response is not None
+        cik10 = str(item.get("cik10", DEFAULT_CIK))
         metadata_item: dict = {}
-        payload = self._safe_json(captured.body)
-        accession = self._first_list_value(payload, ["filings", "recent", "accessionNumber"])
-        document = self._first_list_value(payload, ["filings", "recent", "primaryDocument"])
-
-        if isinstance(accession, str) and isinstance(document, str):
-            accession_nodash = accession.replace("-", "")
-            artifact_url = (
-                f"https://www.sec.gov/Archives/edgar/data/{int(cik10)}/"
-                f"{accession_nodash}/{document}"
-            )
-            metadata_item["artifact"] = ArtifactTarget(
-                url=artifact_url,
-                fixture_name="artifact.htm",
-            )
-        else:
+        if response.status_code == 304:
+            metadata_item["not_modified"] = True
+            return metadata_item
+
+        columns, shards = self.parse_stage.parse(decode_submissions, response)
+        if not any(columns.primary_document[row] for row in columns.select()):
             metadata_item["parse_error"] = {
                 "provider": self.provider,
                 "stage": "parse_metadata",
                 "message": "SEC payload missing filings.recent accession/document",
-                "url": captured.url,
+                "url": response.url,
                 "item_index": item_index,
                 "response_id": None,
             }
+            return metadata_item
 
-        return metadata_item, captured
+        window = self._window(cik10)
+        selected = self._select(cik10, columns, window, [])
+        if self._wants_more(selected, window) and not self._past_window(columns, window):
+            self._follow_shards(cik10, shards, window, selected, metadata_item, item_index)
+        if window.floor is not None and self.max_filings:
+            # Capped out filings are picked up by the next run only if it
+            # re-reads the submissions instead of getting a 304.
+            if len(selected) > self.max_filings:
+                metadata_item["incomplete"] = True
+            selected = selected[-self.max_filings :]
+
+        metadata_item["cik10"] = cik10
+        metadata_item["artifacts"] = [filing.target for filing in selected]
+        metadata_item["filings"] = {
+            filing.target.url: (filing.accession_number, filing.accepted_at) for filing in selected
+        }
+        return metadata_item
 
     def download_artifact(
         self, metadata_item: dict, item_index: int
@@ -52,32 +141,170 @@ class SecEdgarConnector(BaseConnector):
         target = metadata_item.get("artifact")
         if not isinstance(target, ArtifactTarget):
             return None
-        captured = self.http.get(
+        captured = self.http.stream_get(
             target.url,
             provider=self.provider,
             fixture_name=target.fixture_name,
         )
         return target, captured
 
+    def download_artifacts(
+        self, metadata_item: dict, item_index: int
+    ) -> list[tuple[ArtifactTarget, CapturedResponse]]:
+        downloaded = []
+        for target in metadata_item.get("artifacts", []):
+            artifact = self.download_artifact({"artifact": target}, item_index)
+            if artifact is None:
+                continue
+            downloaded.append(artifact)
+            self._remember(metadata_item, target)
+        return downloaded
+
+    def artifact_skipped(self, metadata_item: dict, target: ArtifactTarget) -> None:
+        # Already stored counts as seen, or a capped incremental run would keep
+        # selecting the same filings and the watermark would never move.
+        self._remember(metadata_item, target)
+
     def checkpoint(self) -> None:
-        return None
+        # Runs after the pipeline flushed the artifacts, so the watermark never
+        # covers a filing whose artifact was not stored.
+        if self.storage is None:
+            return
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for cik10, seen in pending.items():
+            watermark = max(seen.values())
+            self.storage.put_watermark(
+                self.provider,
+                cik10,
+                watermark=watermark or None,
+                seen=seen,
+                retain_seconds=self.overlap_seconds,
+            )
 
-    @staticmethod
-    def _safe_json(body: bytes) -> dict:
-        try:
-            payload = json.loads(body)
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            return {}
-        return payload if isinstance(payload, dict) else {}
-
-    @staticmethod
-    def _first_list_value(payload: dict, path: list[str]) -> str | None:
-        current: object = payload
-        for part in path:
-            if not isinstance(current, dict):
+    def discard_pending(self) -> None:
+        with self._pending_lock:
+            self._pending = {}
+
+    def _remember(self, metadata_item: dict, target: ArtifactTarget) -> None:
+        filings: dict[str, tuple[str, int]] = metadata_item.get("filings", {})
+        if self.storage is None or target.url not in filings:
+            return
+        accession_number, accepted_at = filings[target.url]
+        with self._pending_lock:
+            seen = self._pending.setdefault(metadata_item["cik10"], {})
+            seen[accession_number] = accepted_at
+
+    def _window(self, cik10: str) -> _SyncWindow:
+        if self.storage is None:
+            return _SyncWindow(None, frozenset())
+        watermark, seen = self.storage.get_watermark(self.provider, cik10)
+        floor = watermark - self.overlap_seconds if watermark is not None else None
+        return _SyncWindow(floor, frozenset(seen))
+
+    def _wants_more(self, selected: list[_Selected], window: _SyncWindow) -> bool:
+        # Incremental runs keep the oldest unseen filings, so they need every
+        # candidate inside the window before the cap is applied.
+        if window.floor is not None:
+            return True
+        return not self.max_filings or len(selected) < self.max_filings
+
+    def _past_window(self, columns: FilingColumns, window: _SyncWindow) -> bool:
+        # Everything after ``columns`` is older than its oldest filing.
+        oldest = columns.oldest_filing_date()
+        if not oldest:
+            return False
+        lower = pack_date(self.date_from)
+        if lower and oldest < lower:
+            return True
+        if window.floor is not None:
+            return oldest < pack_date(datetime.fromtimestamp(window.floor, UTC).date())
+        return False
+
+    def _select(
+        self,
+        cik10: str,
+        columns: FilingColumns,
+        window: _SyncWindow,
+        selected: list[_Selected],
+    ) -> list[_Selected]:
+        rows = columns.select(
+            forms=self.forms,
+            date_from=self.date_from,
+            date_to=self.date_to,
+            accepted_from=window.floor,
+            exclude_accessions=window.seen,
+        )
+        for row in rows:
+            if not self._wants_more(selected, window):
+                break
+            filing = columns.filing(row)
+            if not filing.primary_document:
+                continue
+            target = ArtifactTarget(
+                url=(
+                    f"https://www.sec.gov/Archives/edgar/data/{int(cik10)}/"
+                    f"{filing.accession_number.replace('-', '')}/"
+                    f"{filing.primary_document}"
+                ),
+                fixture_name="artifact.htm",
+            )
+            selected.append(_Selected(target, filing.accession_number, columns.accepted_at(row)))
+        return selected
+
+    def _follow_shards(
+        self,
+        cik10: str,
+        shards: list[FilingShard],
+        window: _SyncWindow,
+        selected: list[_Selected],
+        metadata_item: dict,
+        item_index: int,
+    ) -> None:
+        # Shards are listed newest first and hold strictly older filings than
+        # filings.recent, so date bounds skip whole shards and the walk stops
+        # once max_filings is reached or the watermark window is passed.
+        lower = pack_date(self.date_from)
+        upper = pack_date(self.date_to)
+        shards = [
+            shard
+            for shard in shards
+            if not (lower and shard.filing_to and shard.filing_to < lower)
+            and not (upper and shard.filing_from and shard.filing_from > upper)
+        ]
+        supplemental: list[CapturedResponse] = []
+        failed: list[str] = []
+
+        def fetch(shard: FilingShard) -> FilingColumns | None:
+            try:
+                captured = self.http.get(shard.url, provider=self.provider, fixture_name=shard.name)
+            except httpx.HTTPStatusError as exc:
+                # A missing shard is reported on the item; the rest of the walk goes on.
+                failed.append(f"{shard.name} ({exc.response.status_code})")
                 return None
-            current = current.get(part)
-        if not isinstance(current, list) or not current:
-            return None
-        first = current[0]
-        return first if isinstance(first, str) else None
+            supplemental.append(captured)
+            return self.parse_stage.parse(decode_shard, captured)
+
+        walk = iter_shards(shards, fetch)
+        try:
+            for _, columns in walk:
+                if columns is None:
+                    continue
+                self._select(cik10, columns, window, selected)
+                if not self._wants_more(selected, window) or self._past_window(columns, window):
+                    break
+        finally:
+            walk.close()
+
+        metadata_item["supplemental_responses"] = supplemental
+        if failed:
+            # Without validators the next run re-reads submissions and retries the shard.
+            metadata_item["incomplete"] = True
+            metadata_item["parse_error"] = {
+                "provider": self.provider,
+                "stage": "fetch_shard",
+                "message": f"SEC filings.files[] shard(s) not fetched: {', '.join(failed)}",
+                "url": shards[0].url,
+                "item_index": item_index,
+                "response_id": None,
+            }
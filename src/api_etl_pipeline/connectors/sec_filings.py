@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import json
+from array import array
+from collections.abc import Callable, Collection, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, date, datetime
+from typing import NamedTuple
+
+SUBMISSIONS_BASE_URL = "https://data.sec.gov/submissions/"
+
+
+class Filing(NamedTuple):
+    accession_number: str
+    form: str
+    filing_date: str | None
+    acceptance_timestamp: int | None
+    primary_document: str
+
+
+class FilingShard(NamedTuple):
+    name: str
+    filing_count: int | None
+    filing_from: int | None
+    filing_to: int | None
+
+    @property
+    def url(self) -> str:
+        return f"{SUBMISSIONS_BASE_URL}{self.name}"
+
+
+class FilingColumns:
+    """Typed columns decoded from an EDGAR ``filings.recent`` block or a ``files[]`` shard.
+
+    Accession numbers are packed into int64s, filing dates into ``YYYYMMDD``
+    int32s, acceptance times into epoch seconds and form types into codes
+    against a small vocabulary. ``select`` scans those flat arrays and returns
+    row numbers; strings are only rebuilt for the rows a caller asks for.
+    Rows whose accession number does not parse are kept as ``-1`` and never
+    selected.
+    """
+
+    __slots__ = (
+        "accession",
+        "form_code",
+        "filing_date",
+        "acceptance",
+        "primary_document",
+        "forms",
+        "_form_index",
+    )
+
+    def __init__(self) -> None:
+        self.accession = array("q")
+        self.form_code = array("H")
+        self.filing_date = array("i")
+        self.acceptance = array("q")
+        self.primary_document: list[str] = []
+        self.forms: list[str] = []
+        self._form_index: dict[str, int] = {}
+
+    @classmethod
+    def from_block(cls, block: object) -> FilingColumns:
+        """Decode the parallel arrays of ``block``; ``accessionNumber`` sets the row count."""
+        columns = cls()
+        if not isinstance(block, dict):
+            return columns
+        accessions = _list(block.get("accessionNumber"))
+        count = len(accessions)
+        forms = _padded(block.get("form"), count)
+        dates = _padded(block.get("filingDate"), count)
+        accepted = _padded(block.get("acceptanceDateTime"), count)
+        documents = _padded(block.get("primaryDocument"), count)
+
+        columns.accession.extend(pack_accession(value) for value in accessions)
+        columns.form_code.extend(columns._code_for(value) for value in forms)
+        columns.filing_date.extend(pack_date(value) or 0 for value in dates)
+        columns.acceptance.extend(_epoch_seconds(value) or 0 for value in accepted)
+        columns.primary_document.extend(
+            value if isinstance(value, str) else "" for value in documents
+        )
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.accession)
+
+    def select(
+        self,
+        *,
+        forms: Collection[str] | None = None,
+        date_from: date | str | None = None,
+        date_to: date | str | None = None,
+        accepted_from: int | None = None,
+        accessions: Collection[str] | None = None,
+        exclude_accessions: Collection[str] | None = None,
+    ) -> list[int]:
+        """Row numbers matching every given filter, in source (newest-first) order.
+
+        ``accepted_from`` is epoch seconds; rows without ``acceptanceDateTime``
+        fall back to their filing date and rows with neither are kept.
+        """
+        accession = self.accession
+        rows = [row for row in range(len(accession)) if accession[row] >= 0]
+        if forms is not None:
+            codes = {self._form_index[form] for form in forms if form in self._form_index}
+            form_code = self.form_code
+            rows = [row for row in rows if form_code[row] in codes]
+        lower = pack_date(date_from)
+        upper = pack_date(date_to)
+        if lower is not None or upper is not None:
+            filing_date = self.filing_date
+            lower = lower if lower is not None else 1
+            upper = upper if upper is not None else 99991231
+            rows = [row for row in rows if lower <= filing_date[row] <= upper]
+        if accepted_from is not None:
+            acceptance = self.acceptance
+            filing_date = self.filing_date
+            floor_date = pack_date(datetime.fromtimestamp(accepted_from, UTC).date())
+            rows = [
+                row
+                for row in rows
+                if acceptance[row] >= accepted_from
+                or (
+                    not acceptance[row] and (not filing_date[row] or filing_date[row] >= floor_date)
+                )
+            ]
+        if accessions is not None:
+            wanted = {pack_accession(value) for value in accessions}
+            rows = [row for row in rows if accession[row] in wanted]
+        if exclude_accessions:
+            unwanted = {pack_accession(value) for value in exclude_accessions}
+            rows = [row for row in rows if accession[row] not in unwanted]
+        return rows
+
+    def filing(self, row: int) -> Filing:
+        filing_date = self.filing_date[row]
+        acceptance = self.acceptance[row]
+        return Filing(
+            accession_number=unpack_accession(self.accession[row]),
+            form=self.forms[self.form_code[row]],
+            filing_date=unpack_date(filing_date) if filing_date else None,
+            acceptance_timestamp=acceptance or None,
+            primary_document=self.primary_document[row],
+        )
+
+    def accepted_at(self, row: int) -> int:
+        """Acceptance time in epoch seconds, else midnight UTC of the filing date, else 0."""
+        if self.acceptance[row]:
+            return self.acceptance[row]
+        filing_date = self.filing_date[row]
+        if not filing_date:
+            return 0
+        midnight = datetime(
+            filing_date // 10000, filing_date // 100 % 100, filing_date % 100, tzinfo=UTC
+        )
+        return int(midnight.timestamp())
+
+    def oldest_filing_date(self) -> int | None:
+        dates = [value for value in self.filing_date if value]
+        return min(dates) if dates else None
+
+    def _code_for(self, form: object) -> int:
+        key = form if isinstance(form, str) else ""
+        code = self._form_index.get(key)
+        if code is None:
+            code = self._form_index[key] = len(self.forms)
+            self.forms.append(key)
+        return code
+
+
+def decode_submissions(body: bytes) -> tuple[FilingColumns, list[FilingShard]]:
+    """Parse step for a ``CIK##########.json`` body; runs on a ``ParseStage``."""
+    payload = _json_object(body)
+    filings = payload.get("filings")
+    recent = filings.get("recent") if isinstance(filings, dict) else None
+    return FilingColumns.from_block(recent), shards_for(payload)
+
+
+def decode_shard(body: bytes) -> FilingColumns:
+    """Parse step for a ``filings.files[]`` shard body."""
+    return FilingColumns.from_block(_json_object(body))
+
+
+def shards_for(payload: dict) -> list[FilingShard]:
+    """``filings.files[]`` entries, oldest-last as EDGAR lists them.
+
+    Dossier SEC-V1: the ``name``/``filingCount``/``filingFrom``/``filingTo``
+    field names are unconfirmed, so entries without a usable ``name`` are
+    dropped and the date bounds are optional.
+    """
+    filings = payload.get("filings")
+    entries = filings.get("files") if isinstance(filings, dict) else None
+    shards: list[FilingShard] = []
+    for entry in _list(entries):
+        if not isinstance(entry, dict):
+            continue
+        name = entry.get("name")
+        if not isinstance(name, str) or not name or "/" in name:
+            continue
+        count = entry.get("filingCount")
+        shards.append(
+            FilingShard(
+                name=name,
+                filing_count=count if isinstance(count, int) else None,
+                filing_from=pack_date(entry.get("filingFrom")),
+                filing_to=pack_date(entry.get("filingTo")),
+            )
+        )
+    return shards
+
+
+def iter_shards(
+    shards: Sequence[FilingShard],
+    fetch: Callable[[FilingShard], FilingColumns | None],
+) -> Iterator[tuple[FilingShard, FilingColumns | None]]:
+    """Yield ``(shard, columns)`` in order, fetching the next shard while the caller works.
+
+    ``fetch`` runs on one background thread, so at most two shards are held at
+    a time. Closing the generator early cancels the prefetch if it has not
+    started yet.
+    """
+    if not shards:
+        return
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="sec-shard") as pool:
+        pending = pool.submit(fetch, shards[0])
+        try:
+            for position, shard in enumerate(shards):
+                columns = pending.result()
+                if position + 1 < len(shards):
+                    pending = pool.submit(fetch, shards[position + 1])
+                yield shard, columns
+        finally:
+            pending.cancel()
+
+
+def pack_accession(value: object) -> int:
+    # 0000320193-24-000123 -> 320193240000123; 18 digits always fit in an int64.
+    if not isinstance(value, str):
+        return -1
+    digits = value.replace("-", "")
+    if len(digits) != 18 or not digits.isdigit():
+        return -1
+    return int(digits)
+
+
+def unpack_accession(packed: int) -> str:
+    digits = f"{packed:018d}"
+    return f"{digits[:10]}-{digits[10:12]}-{digits[12:]}"
+
+
+def pack_date(value: object) -> int | None:
+    if isinstance(value, date):
+        return value.year * 10000 + value.month * 100 + value.day
+    if not isinstance(value, str) or len(value) < 10:
+        return None
+    digits = value[:4] + value[5:7] + value[8:10]
+    return int(digits) if digits.isdigit() else None
+
+
+def unpack_date(packed: int) -> str:
+    return f"{packed // 10000:04d}-{packed // 100 % 100:02d}-{packed % 100:02d}"
+
+
+def _epoch_seconds(value: object) -> int | None:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value).timestamp())
+    except ValueError:
+        return None
+
+
+def _json_object(body: bytes) -> dict:
+    try:
+        payload = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def _list(value: object) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _padded(value: object, count: int) -> list:
+    values = _list(value)[:count]
+    return values + [None] * (count - len(values))
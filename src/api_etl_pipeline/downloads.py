@@ -1,24 +1,207 @@
 import hashlib
+import os
+import tempfile
+import zlib
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
-import httpx
+# Content-Encodings kept as received by ``APP_KEEP_WIRE_ENCODING``, and the
+# suffix files holding such bytes carry.
+WIRE_ENCODINGS = ("gzip", "deflate")
+ENCODING_SUFFIXES = {"gzip": ".gz", "deflate": ".zz"}
+DECODE_CHUNK_BYTES = 1024 * 1024
 
 
-def stream_download_with_sha256(client: httpx.Client, url: str, target: Path) -> tuple[str, int]:
-    target.parent.mkdir(parents=True, exist_ok=True)
-    digest = hashlib.sha256()
-    total = 0
-    with client.stream("GET", url) as response:
-        response.raise_for_status()
-        with target.open("wb") as handle:
-            for chunk in response.iter_bytes():
+class ArtifactTooLargeError(RuntimeError):
+    pass
+
+
+@dataclass
+class SpooledBody:
+    path: Path
+    sha256: str
+    byte_count: int
+
+
+class SpoolWriter:
+    """Temp file in ``spool_dir`` that hashes bytes as they are appended.
+
+    Survives across retry attempts so an interrupted download can resume at
+    ``written``; ``open_region`` fills ranges fetched out of order, and
+    ``hash_through`` folds them into the digest in file order.
+    """
+
+    def __init__(self, spool_dir: Path, *, max_bytes: int, url: str) -> None:
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=spool_dir, suffix=".part")
+        self.path = Path(name)
+        self.max_bytes = max_bytes
+        self.url = url
+        self._handle = os.fdopen(fd, "w+b")
+        self._digest = hashlib.sha256()
+        self.written = 0
+        self.hashed = 0
+
+    def check_size(self, size: int) -> None:
+        if size > self.max_bytes:
+            raise ArtifactTooLargeError(
+                f"artifact too large bytes>={size} cap={self.max_bytes} url={self.url}"
+            )
+
+    def write(self, chunk: bytes) -> None:
+        self.check_size(self.written + len(chunk))
+        self._handle.write(chunk)
+        self._digest.update(chunk)
+        self.written += len(chunk)
+        self.hashed = self.written
+
+    def reset(self) -> None:
+        self._handle.seek(0)
+        self._handle.truncate()
+        self._digest = hashlib.sha256()
+        self.written = 0
+        self.hashed = 0
+
+    def open_region(self, offset: int) -> BinaryIO:
+        """Separate handle positioned at ``offset`` for an out-of-order range."""
+        handle = self.path.open("r+b")
+        handle.seek(offset)
+        return handle
+
+    def hash_through(self, end: int, chunk_size: int = 1024 * 1024) -> None:
+        self._handle.flush()
+        with self.path.open("rb") as handle:
+            handle.seek(self.hashed)
+            while self.hashed < end:
+                chunk = handle.read(min(chunk_size, end - self.hashed))
                 if not chunk:
-                    continue
-                handle.write(chunk)
-                digest.update(chunk)
-                total += len(chunk)
-    return digest.hexdigest(), total
+                    raise OSError(f"spool file short at {self.hashed} of {end}: {self.path}")
+                self._digest.update(chunk)
+                self.hashed += len(chunk)
+        self.written = max(self.written, end)
+
+    def finish(self) -> "SpooledBody":
+        self._handle.close()
+        return SpooledBody(path=self.path, sha256=self._digest.hexdigest(), byte_count=self.hashed)
+
+    def discard(self) -> None:
+        self._handle.close()
+        self.path.unlink(missing_ok=True)
+
+
+def spool_chunks(
+    chunks: Iterable[bytes],
+    spool_dir: Path,
+    *,
+    max_bytes: int,
+    url: str,
+) -> SpooledBody:
+    """Write ``chunks`` to a temp file in ``spool_dir``, hashing as they arrive.
+
+    Aborts as soon as more than ``max_bytes`` have been received; the partial
+    spool file is removed on any error.
+    """
+    writer = SpoolWriter(spool_dir, max_bytes=max_bytes, url=url)
+    try:
+        for chunk in chunks:
+            if chunk:
+                writer.write(chunk)
+    except BaseException:
+        writer.discard()
+        raise
+    return writer.finish()
+
+
+def parse_content_range(value: str | None) -> tuple[int, int, int | None] | None:
+    """Parse ``bytes START-END/TOTAL`` (TOTAL may be ``*``)."""
+    if not value or not value.strip().lower().startswith("bytes "):
+        return None
+    span, _, total = value.strip()[6:].partition("/")
+    start, _, end = span.partition("-")
+    try:
+        return int(start), int(end), (None if total.strip() == "*" else int(total))
+    except ValueError:
+        return None
+
+
+def iter_file_chunks(path: Path, chunk_size: int) -> Iterable[bytes]:
+    with path.open("rb") as handle:
+        while chunk := handle.read(chunk_size):
+            yield chunk
 
 
 def sha256_bytes(content: bytes) -> str:
     return hashlib.sha256(content).hexdigest()
+
+
+def sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter_file_chunks(path, chunk_size):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_decoded(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    """Inflate a gzip or deflate stream, yielding at most ``DECODE_CHUNK_BYTES`` at a time."""
+    if encoding not in WIRE_ENCODINGS:
+        raise ValueError(f"unsupported content-encoding {encoding!r}")
+    wbits = 16 + zlib.MAX_WBITS if encoding == "gzip" else zlib.MAX_WBITS
+    decoder = zlib.decompressobj(wbits)
+    received = False
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if not received and encoding == "deflate" and not is_zlib_header(chunk):
+            # RFC 9110 deflate is zlib-wrapped, but some servers send raw deflate.
+            decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        received = True
+        data = chunk
+        while data:
+            piece = decoder.decompress(data, DECODE_CHUNK_BYTES)
+            if piece:
+                yield piece
+            data = decoder.unconsumed_tail
+    tail = decoder.flush()
+    if tail:
+        yield tail
+    if received and not decoder.eof:
+        raise zlib.error(f"truncated {encoding} stream")
+
+
+def decoded_digest(path: Path, encoding: str, *, max_bytes: int, url: str) -> tuple[str, int]:
+    """sha256 and size of the decoded content of a wire-encoded file, capped at ``max_bytes``."""
+    digest = hashlib.sha256()
+    size = 0
+    for piece in iter_decoded(iter_file_chunks(path, DECODE_CHUNK_BYTES), encoding):
+        size += len(piece)
+        if size > max_bytes:
+            raise ArtifactTooLargeError(
+                f"artifact too large decoded bytes>={size} cap={max_bytes} url={url}"
+            )
+        digest.update(piece)
+    return digest.hexdigest(), size
+
+
+def inflate_file(path: Path, encoding: str) -> None:
+    """Replace a wire-encoded file with its decoded content."""
+    staging = path.with_name(f"{path.name}.inflating")
+    try:
+        with staging.open("wb") as handle:
+            for piece in iter_decoded(iter_file_chunks(path, DECODE_CHUNK_BYTES), encoding):
+                handle.write(piece)
+        os.replace(staging, path)
+    finally:
+        staging.unlink(missing_ok=True)
+
+
+def read_decoded(path: Path, encoding: str | None) -> bytes:
+    if encoding is None:
+        return path.read_bytes()
+    return b"".join(iter_decoded(iter_file_chunks(path, DECODE_CHUNK_BYTES), encoding))
+
+
+def is_zlib_header(chunk: bytes) -> bool:
+    """True if ``chunk`` starts with a zlib (RFC 1950) header rather than raw deflate."""
+    return len(chunk) >= 2 and chunk[0] & 0x0F == 8 and (chunk[0] << 8 | chunk[1]) % 31 == 0
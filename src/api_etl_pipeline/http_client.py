@@ -1,14 +1,30 @@
+import contextlib
 import json
 import os
-from collections.abc import Callable
-from dataclasses import dataclass
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Protocol, TypeVar
 from urllib.parse import urlparse
 
 import httpx
 
+from .downloads import (
+    WIRE_ENCODINGS,
+    ArtifactTooLargeError,
+    SpoolWriter,
+    decoded_digest,
+    iter_file_chunks,
+    parse_content_range,
+    spool_chunks,
+)
+from .metrics import DISABLED_METRICS, Metrics
 from .rate_limiter import GlobalRateLimiter
-from .retry_policy import RetryableHttpError
+from .retry_policy import RetryableHttpError, RetryBudget, RetryPolicy, retry_policy_for
+from .transport import PoolRouter, TransportProfiles
 
 
 @dataclass
@@ -19,6 +35,17 @@ class CapturedResponse:
     status_code: int
     headers_json: str
     body: bytes
+    body_path: Path | None = None
+    sha256: str | None = None
+    byte_count: int | None = None
+    validators: tuple[str | None, str | None] | None = None
+    # "gzip"/"deflate" when ``body_path`` holds the body as received; ``sha256``
+    # and ``byte_count`` still describe the decoded content.
+    body_encoding: str | None = None
+
+    @property
+    def size(self) -> int:
+        return self.byte_count if self.byte_count is not None else len(self.body)
 
 
 @dataclass
@@ -33,6 +60,35 @@ class HttpAttempt:
     attempt_number: int
     error_type: str | None = None
     error_message: str | None = None
+    body_path: Path | None = None
+    sha256: str | None = None
+    elapsed_seconds: float | None = None
+    body_encoding: str | None = None
+    byte_count: int | None = None
+
+
+@dataclass
+class _RangedDownload:
+    """Progress of one ``stream_get`` across retries and parallel parts."""
+
+    writer: SpoolWriter
+    status_code: int | None = None
+    url: str = ""
+    response_headers: dict[str, str] = field(default_factory=dict)
+    attempt_number: int = 1
+    head_stop: int | None = None
+    validator: str | None = None
+    encoding: str | None = None
+    # Set when the server's ranges do not reveal a total size.
+    whole_body: bool = False
+    parts: list[tuple[int, int, Future[None]]] = field(default_factory=list)
+
+
+T = TypeVar("T")
+
+
+class ValidatorStore(Protocol):
+    def get_validators(self, url: str) -> tuple[str | None, str | None] | None: ...
 
 
 class HttpClient:
@@ -45,6 +101,12 @@ class HttpClient:
         sec_user_agent: str | None,
         nrc_subscription_key: str | None,
         attempt_observer: Callable[[HttpAttempt], None] | None = None,
+        spool_dir: Path | None = None,
+        validator_store: ValidatorStore | None = None,
+        retry_budget: RetryBudget | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+        metrics: Metrics = DISABLED_METRICS,
+        transport_profiles: TransportProfiles | None = None,
     ) -> None:
         self.live = live
         self.fixture_root = fixture_root
@@ -52,16 +114,29 @@ class HttpClient:
         self.sec_user_agent = sec_user_agent
         self.nrc_subscription_key = nrc_subscription_key
         self.attempt_observer = attempt_observer
+        self.spool_dir = spool_dir or Path(tempfile.gettempdir()) / "api_etl_pipeline_spool"
+        self.chunk_size = 256 * 1024
+        range_parts = os.getenv("APP_RANGE_PARTS", "").strip()
+        self.range_parts = max(int(range_parts), 1) if range_parts else 4
+        part_bytes = os.getenv("APP_RANGE_PART_BYTES", "").strip()
+        self.range_part_bytes = int(part_bytes) if part_bytes else 8 * 1024 * 1024
+        self.validator_store = validator_store
+        self.retry_budget = retry_budget or RetryBudget(max_retries=50)
+        self._sleep = sleep
+        self.metrics = metrics
 
         self.debug = os.getenv("APP_HTTP_DEBUG", "").strip() not in {"", "0", "false", "False"}
         cap = os.getenv("APP_MAX_ARTIFACT_BYTES", "").strip()
         self.max_artifact_bytes = int(cap) if cap else 50 * 1024 * 1024
+        keep_wire = os.getenv("APP_KEEP_WIRE_ENCODING", "").strip()
+        self.keep_wire_encoding = keep_wire not in {"", "0", "false", "False"}
 
         pdf_read = os.getenv("APP_PDF_READ_TIMEOUT_SECONDS", "").strip()
         pdf_read_s = float(pdf_read) if pdf_read else 180.0
         self._timeout_default = httpx.Timeout(connect=10.0, read=60.0, write=30.0, pool=30.0)
         self._timeout_pdf = httpx.Timeout(connect=10.0, read=pdf_read_s, write=30.0, pool=30.0)
-        self._client = httpx.Client(follow_redirects=True, trust_env=False)
+        # One pool per (host, api|bulk); tests swap in a plain ``httpx.Client``.
+        self._client: PoolRouter | httpx.Client = PoolRouter(transport_profiles, metrics=metrics)
 
     def close(self) -> None:
         self._client.close()
@@ -93,31 +168,186 @@ class HttpClient:
             if not self.nrc_subscription_key:
                 raise ValueError("NRC_SUBSCRIPTION_KEY or NRC_APS_SUBSCRIPTION_KEY must be set")
             headers["Ocp-Apim-Subscription-Key"] = self.nrc_subscription_key
-            self.rate_limiter.acquire_aps(
-                subscription_key=self.nrc_subscription_key,
-                host=host,
-                rps=3,
-            )
         if is_json:
             headers["Accept"] = "application/json"
             if method.upper() == "POST":
                 headers["Content-Type"] = "application/json"
         return headers
 
+    def _conditional_headers(self, url: str) -> dict[str, str]:
+        stored = self.validator_store.get_validators(url) if self.validator_store else None
+        if stored is None:
+            return {}
+        etag, last_modified = stored
+        headers: dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    @staticmethod
+    def _validators_from(response: httpx.Response) -> tuple[str | None, str | None] | None:
+        if response.status_code != 200:
+            return None
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            return None
+        return etag, last_modified
+
+    def _aps_key_for(self, host: str) -> str | None:
+        return self.nrc_subscription_key if host == "adams-api.nrc.gov" else None
+
+    def _acquire(self, host: str) -> None:
+        self.rate_limiter.acquire_host(host=host)
+        aps_key = self._aps_key_for(host)
+        if aps_key:
+            self.rate_limiter.acquire_aps(subscription_key=aps_key, host=host)
+
+    def _observe(self, host: str, response: httpx.Response) -> None:
+        self.rate_limiter.observe(
+            host,
+            response.status_code,
+            retry_after=response.headers.get("retry-after"),
+            subscription_key=self._aps_key_for(host),
+        )
+
     def _emit_attempt(self, attempt: HttpAttempt) -> None:
+        if self.metrics.enabled:
+            self._record_metrics(attempt)
         if self.attempt_observer:
             self.attempt_observer(attempt)
 
-    def _is_retryable_status(self, status_code: int) -> bool:
-        return status_code in {429, 403} or status_code >= 500
+    def _record_metrics(self, attempt: HttpAttempt) -> None:
+        labels = {"host": urlparse(attempt.url).hostname or "", "method": attempt.method}
+        self.metrics.add("http_requests_total", 1, {**labels, "status": str(attempt.status_code)})
+        if attempt.elapsed_seconds is not None:
+            self.metrics.observe("http_request_seconds", attempt.elapsed_seconds, labels)
+        size = len(attempt.body)
+        if attempt.body_path is not None:
+            with contextlib.suppress(OSError):
+                size = attempt.body_path.stat().st_size
+        self.metrics.add("http_response_bytes_total", size, labels)
+
+    def _check_status(
+        self,
+        response: httpx.Response,
+        policy: RetryPolicy,
+        *,
+        allow_not_modified: bool = False,
+    ) -> None:
+        if response.is_success:
+            return
+        if policy.is_retryable(response.status_code):
+            raise RetryableHttpError(
+                f"retryable status={response.status_code}",
+                status_code=response.status_code,
+            )
+        if response.status_code == 304 and allow_not_modified:
+            return
+        response.raise_for_status()
+
+    def _emit_response(
+        self,
+        *,
+        method: str,
+        response: httpx.Response,
+        payload_json: str | None,
+        headers: dict[str, str],
+        body: bytes,
+        attempt_number: int,
+        body_path: Path | None = None,
+    ) -> None:
+        self._emit_attempt(
+            HttpAttempt(
+                method=method,
+                url=str(response.request.url),
+                request_payload_json=payload_json,
+                request_headers=headers,
+                status_code=response.status_code,
+                response_headers=dict(response.headers),
+                body=body,
+                attempt_number=attempt_number,
+                body_path=body_path,
+                elapsed_seconds=_elapsed_seconds(response),
+            )
+        )
+
+    def _with_retries(
+        self,
+        *,
+        method: str,
+        url: str,
+        provider: str,
+        payload_json: str | None,
+        headers: dict[str, str],
+        perform: Callable[[int, RetryPolicy], T],
+    ) -> T:
+        """Run ``perform`` until it succeeds or the provider policy gives up.
+
+        ``perform`` raises ``RetryableHttpError`` for statuses the policy retries;
+        transport errors are captured here. Every retry spends from the run-wide
+        ``retry_budget`` and sleeps an exponential, jittered backoff.
+        """
+        host = urlparse(url).netloc
+        policy = retry_policy_for(provider)
+        attempt = 0
+        while True:
+            attempt += 1
+            self._acquire(host)
+            started = time.perf_counter()
+            try:
+                return perform(attempt, policy)
+            except RetryableHttpError as exc:
+                error = exc
+            except (httpx.TimeoutException, httpx.TransportError) as exc:
+                self._emit_attempt(
+                    HttpAttempt(
+                        method=method,
+                        url=url,
+                        request_payload_json=payload_json,
+                        request_headers=headers,
+                        status_code=0,
+                        response_headers={},
+                        body=b"",
+                        attempt_number=attempt,
+                        error_type=type(exc).__name__,
+                        error_message=str(exc),
+                        elapsed_seconds=time.perf_counter() - started,
+                    )
+                )
+                error = RetryableHttpError(f"retryable transport error: {exc}")
+                error.__cause__ = exc
+
+            rule = policy.rule_for(error.status_code)
+            if (
+                rule is None
+                or attempt >= rule.max_attempts
+                or not self.retry_budget.try_spend(error.status_code)
+            ):
+                raise error
+            delay = policy.backoff(error.status_code, attempt)
+            self.retry_budget.record_backoff(delay)
+            self._sleep(delay)
 
     def _enforce_cap(self, body: bytes, url: str) -> None:
         if len(body) > self.max_artifact_bytes:
-            raise RuntimeError(
+            raise ArtifactTooLargeError(
                 "artifact too large "
                 f"bytes={len(body)} cap={self.max_artifact_bytes} url={url}"
             )
 
+    def _enforce_declared_cap(
+        self, headers: httpx.Headers, url: str, cap: int | None = None
+    ) -> None:
+        cap = self.max_artifact_bytes if cap is None else cap
+        declared = headers.get("content-length", "").strip()
+        if declared.isdigit() and int(declared) > cap:
+            raise ArtifactTooLargeError(
+                f"artifact too large content-length={declared} cap={cap} url={url}"
+            )
+
     def get(
         self,
         url: str,
@@ -125,7 +355,14 @@ class HttpClient:
         provider: str,
         fixture_name: str | None = None,
         params: dict | None = None,
+        conditional: bool = False,
     ) -> CapturedResponse:
+        """GET ``url``; with ``conditional`` revalidate against stored validators.
+
+        A 304 comes back as a ``CapturedResponse`` with ``status_code == 304`` and
+        an empty body. On a 200 the new ETag/Last-Modified are returned in
+        ``validators`` for the caller to persist once the item is fully stored.
+        """
         payload_json = json.dumps(params, sort_keys=True) if params else None
         if not self.live:
             if not fixture_name:
@@ -153,67 +390,44 @@ class HttpClient:
                 body=body,
             )
 
-        parsed = urlparse(url)
-        host = parsed.netloc
-        self.rate_limiter.acquire_host(host=host, rps=10 if "sec.gov" in host else 5)
+        host = urlparse(url).netloc
         headers = self._build_headers(host=host, method="GET", is_json=False)
+        if conditional:
+            headers.update(self._conditional_headers(url))
         timeout = self._timeout_for(url)
 
-        last_error: Exception | None = None
-        for attempt in range(1, 4):
-            try:
-                response = self._client.get(url, params=params, headers=headers, timeout=timeout)
-                body = response.content
-                self._enforce_cap(body, url)
-                response_headers = dict(response.headers)
-                self._emit_attempt(
-                    HttpAttempt(
-                        method="GET",
-                        url=str(response.request.url),
-                        request_payload_json=payload_json,
-                        request_headers=headers,
-                        status_code=response.status_code,
-                        response_headers=response_headers,
-                        body=body,
-                        attempt_number=attempt,
-                    )
-                )
-                if self._is_retryable_status(response.status_code):
-                    last_error = RetryableHttpError(f"retryable status={response.status_code}")
-                    if attempt < 3:
-                        continue
-                    raise last_error
-                response.raise_for_status()
-                return CapturedResponse(
-                    method="GET",
-                    url=str(response.request.url),
-                    params_json=payload_json,
-                    status_code=response.status_code,
-                    headers_json=json.dumps(response_headers, sort_keys=True),
-                    body=body,
-                )
-            except (httpx.TimeoutException, httpx.TransportError) as exc:
-                self._emit_attempt(
-                    HttpAttempt(
-                        method="GET",
-                        url=url,
-                        request_payload_json=payload_json,
-                        request_headers=headers,
-                        status_code=0,
-                        response_headers={},
-                        body=b"",
-                        attempt_number=attempt,
-                        error_type=type(exc).__name__,
-                        error_message=str(exc),
-                    )
-                )
-                last_error = RetryableHttpError(f"retryable transport error: {exc}")
-                if attempt < 3:
-                    continue
-                raise last_error from exc
+        def perform(attempt: int, policy: RetryPolicy) -> CapturedResponse:
+            response = self._client.get(url, params=params, headers=headers, timeout=timeout)
+            self._observe(host, response)
+            body = response.content
+            self._enforce_cap(body, url)
+            self._emit_response(
+                method="GET",
+                response=response,
+                payload_json=payload_json,
+                headers=headers,
+                body=body,
+                attempt_number=attempt,
+            )
+            self._check_status(response, policy, allow_not_modified=conditional)
+            return CapturedResponse(
+                method="GET",
+                url=str(response.request.url),
+                params_json=payload_json,
+                status_code=response.status_code,
+                headers_json=json.dumps(dict(response.headers), sort_keys=True),
+                body=body,
+                validators=self._validators_from(response) if conditional else None,
+            )
 
-        assert last_error is not None
-        raise last_error
+        return self._with_retries(
+            method="GET",
+            url=url,
+            provider=provider,
+            payload_json=payload_json,
+            headers=headers,
+            perform=perform,
+        )
 
     def post(
         self,
@@ -250,64 +464,362 @@ class HttpClient:
                 body=body,
             )
 
-        parsed = urlparse(url)
-        host = parsed.netloc
-        self.rate_limiter.acquire_host(host=host, rps=10 if "sec.gov" in host else 5)
+        host = urlparse(url).netloc
         headers = self._build_headers(host=host, method="POST", is_json=True)
         timeout = self._timeout_for(url)
 
-        last_error: Exception | None = None
-        for attempt in range(1, 4):
+        def perform(attempt: int, policy: RetryPolicy) -> CapturedResponse:
+            response = self._client.post(url, json=json_body, headers=headers, timeout=timeout)
+            self._observe(host, response)
+            body = response.content
+            self._enforce_cap(body, url)
+            self._emit_response(
+                method="POST",
+                response=response,
+                payload_json=payload_json,
+                headers=headers,
+                body=body,
+                attempt_number=attempt,
+            )
+            self._check_status(response, policy)
+            return CapturedResponse(
+                method="POST",
+                url=str(response.request.url),
+                params_json=payload_json,
+                status_code=response.status_code,
+                headers_json=json.dumps(dict(response.headers), sort_keys=True),
+                body=body,
+            )
+
+        return self._with_retries(
+            method="POST",
+            url=url,
+            provider=provider,
+            payload_json=payload_json,
+            headers=headers,
+            perform=perform,
+        )
+
+    def stream_get(
+        self,
+        url: str,
+        *,
+        provider: str,
+        fixture_name: str | None = None,
+        max_bytes: int | None = None,
+    ) -> CapturedResponse:
+        """GET ``url`` straight to a spool file, hashing chunks as they arrive.
+
+        The returned response has an empty ``body``; the bytes live at
+        ``body_path`` (inside ``spool_dir``) with ``sha256``/``byte_count`` set.
+        Memory use is bounded by ``chunk_size`` regardless of artifact size.
+        ``max_bytes`` overrides ``max_artifact_bytes`` for known-large objects.
+        """
+        cap = self.max_artifact_bytes if max_bytes is None else max_bytes
+        if not self.live:
+            if not fixture_name:
+                raise ValueError("fixture_name is required in offline mode")
+            spooled = spool_chunks(
+                iter_file_chunks(self.fixture_root / provider / fixture_name, self.chunk_size),
+                self.spool_dir,
+                max_bytes=cap,
+                url=url,
+            )
+            headers = {"content-type": "application/octet-stream", "x-fixture": fixture_name}
+            self._emit_attempt(
+                HttpAttempt(
+                    method="GET",
+                    url=url,
+                    request_payload_json=None,
+                    request_headers={},
+                    status_code=200,
+                    response_headers=headers,
+                    body=b"",
+                    attempt_number=1,
+                    body_path=spooled.path,
+                    sha256=spooled.sha256,
+                )
+            )
+            return CapturedResponse(
+                method="GET",
+                url=url,
+                params_json=None,
+                status_code=200,
+                headers_json=json.dumps(headers, sort_keys=True),
+                body=b"",
+                body_path=spooled.path,
+                sha256=spooled.sha256,
+                byte_count=spooled.byte_count,
+            )
+
+        started = time.perf_counter()
+        host = urlparse(url).netloc
+        headers = self._build_headers(host=host, method="GET", is_json=False)
+        timeout = self._timeout_for(url)
+        state = _RangedDownload(SpoolWriter(self.spool_dir, max_bytes=cap, url=url))
+        pool = ThreadPoolExecutor(
+            max_workers=max(self.range_parts - 1, 1),
+            thread_name_prefix="range-part",
+        )
+        try:
+            self._with_retries(
+                method="GET",
+                url=url,
+                provider=provider,
+                payload_json=None,
+                headers=headers,
+                perform=lambda attempt, policy: self._stream_head(
+                    url, host, provider, headers, timeout, state, pool, attempt, policy
+                ),
+            )
+            # Parts finish in any order; fold them into the digest in file order.
+            for _, end, future in state.parts:
+                future.result()
+                state.writer.hash_through(end + 1)
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            state.writer.discard()
+            raise
+        pool.shutdown(wait=True)
+        spooled = state.writer.finish()
+        sha256, byte_count = spooled.sha256, spooled.byte_count
+        if state.encoding is not None:
             try:
-                response = self._client.post(url, json=json_body, headers=headers, timeout=timeout)
-                body = response.content
-                self._enforce_cap(body, url)
-                response_headers = dict(response.headers)
-                self._emit_attempt(
-                    HttpAttempt(
-                        method="POST",
-                        url=str(response.request.url),
-                        request_payload_json=payload_json,
-                        request_headers=headers,
-                        status_code=response.status_code,
-                        response_headers=response_headers,
-                        body=body,
-                        attempt_number=attempt,
-                    )
+                sha256, byte_count = decoded_digest(
+                    spooled.path, state.encoding, max_bytes=cap, url=url
                 )
-                if self._is_retryable_status(response.status_code):
-                    last_error = RetryableHttpError(f"retryable status={response.status_code}")
-                    if attempt < 3:
-                        continue
-                    raise last_error
-                response.raise_for_status()
-                return CapturedResponse(
-                    method="POST",
-                    url=str(response.request.url),
-                    params_json=payload_json,
-                    status_code=response.status_code,
-                    headers_json=json.dumps(response_headers, sort_keys=True),
-                    body=body,
+            except BaseException:
+                spooled.path.unlink(missing_ok=True)
+                raise
+
+        assert state.status_code is not None
+        self._emit_attempt(
+            HttpAttempt(
+                method="GET",
+                url=state.url,
+                request_payload_json=None,
+                request_headers=headers,
+                status_code=state.status_code,
+                response_headers=state.response_headers,
+                body=b"",
+                attempt_number=state.attempt_number,
+                body_path=spooled.path,
+                sha256=sha256,
+                elapsed_seconds=time.perf_counter() - started,
+                body_encoding=state.encoding,
+                byte_count=byte_count,
+            )
+        )
+        return CapturedResponse(
+            method="GET",
+            url=state.url,
+            params_json=None,
+            status_code=state.status_code,
+            headers_json=json.dumps(state.response_headers, sort_keys=True),
+            body=b"",
+            body_path=spooled.path,
+            sha256=sha256,
+            byte_count=byte_count,
+            body_encoding=state.encoding,
+        )
+
+    def _stream_head(
+        self,
+        url: str,
+        host: str,
+        provider: str,
+        headers: dict[str, str],
+        timeout: httpx.Timeout,
+        state: _RangedDownload,
+        pool: ThreadPoolExecutor,
+        attempt: int,
+        policy: RetryPolicy,
+    ) -> None:
+        """Stream the whole body, or its first part when the server does ranges.
+
+        The first request asks for ``bytes=0-<part>`` (the SEC-V5 probe at no
+        extra cost): a 200 means no range support and the full body follows; a
+        206 reveals the total size and the remaining parts are fetched on
+        ``pool`` while this one streams. Retries resume at ``writer.written``.
+        A 206 with an unknown total (``bytes 0-N/*``) cannot be split into
+        parts, so the body is requested again without ``Range``.
+        With ``keep_wire_encoding`` a gzip/deflate body is spooled as received
+        (ranges then address the encoded bytes) and decoded only to hash it.
+        """
+        writer = state.writer
+        request_headers = dict(headers)
+        if writer.written:
+            stop = "" if state.head_stop is None else str(state.head_stop - 1)
+            request_headers["Range"] = f"bytes={writer.written}-{stop}"
+            if state.validator:
+                request_headers["If-Range"] = state.validator
+        elif self.range_parts > 1 and not state.whole_body:
+            request_headers["Range"] = f"bytes=0-{self.range_part_bytes - 1}"
+
+        with self._client.stream("GET", url, headers=request_headers, timeout=timeout) as response:
+            self._observe(host, response)
+            if not response.is_success:
+                self._emit_response(
+                    method="GET",
+                    response=response,
+                    payload_json=None,
+                    headers=request_headers,
+                    body=response.read(),
+                    attempt_number=attempt,
                 )
-            except (httpx.TimeoutException, httpx.TransportError) as exc:
-                self._emit_attempt(
-                    HttpAttempt(
-                        method="POST",
-                        url=url,
-                        request_payload_json=payload_json,
-                        request_headers=headers,
-                        status_code=0,
-                        response_headers={},
-                        body=b"",
-                        attempt_number=attempt,
-                        error_type=type(exc).__name__,
-                        error_message=str(exc),
+                self._check_status(response, policy)
+            if response.status_code == 206:
+                content_range = parse_content_range(response.headers.get("content-range"))
+                if content_range is None or content_range[0] != writer.written:
+                    if state.parts:
+                        # Finished parts live in the spool file; resetting would zero them.
+                        raise RuntimeError(f"object changed during ranged download url={url}")
+                    writer.reset()
+                    raise RetryableHttpError(
+                        f"unexpected content-range={response.headers.get('content-range')}"
                     )
+                _, end, total = content_range
+                if state.status_code is None and total is None:
+                    # Parts cannot be planned without a size; leave this response
+                    # unread and ask for the whole body below.
+                    state.whole_body = True
+                elif state.status_code is None and total is not None:
+                    self._remember_head(state, response, head_stop=end + 1)
+                    writer.check_size(total)
+                    self._schedule_parts(url, host, provider, headers, timeout, state, pool, total)
+            else:
+                if state.parts:
+                    raise RuntimeError(f"object changed during ranged download url={url}")
+                if writer.written:
+                    writer.reset()
+                self._remember_head(state, response, head_stop=None)
+                self._enforce_declared_cap(response.headers, url, writer.max_bytes)
+            restart = state.status_code is None
+            if not restart:
+                state.attempt_number = attempt
+                for chunk in self._iter_body(response, state):
+                    writer.write(chunk)
+                expected = state.head_stop
+                if expected is None and response.headers.get("content-length", "").isdigit():
+                    expected = int(response.headers["content-length"])
+                if expected is not None and writer.written < expected:
+                    raise RetryableHttpError(f"short read {writer.written}/{expected} url={url}")
+        if restart:
+            # A new request: it waits for the limiter like every other one.
+            self._acquire(host)
+            self._stream_head(url, host, provider, headers, timeout, state, pool, attempt, policy)
+
+    def _remember_head(
+        self, state: _RangedDownload, response: httpx.Response, *, head_stop: int | None
+    ) -> None:
+        state.status_code = response.status_code
+        state.url = str(response.request.url)
+        state.response_headers = dict(response.headers)
+        state.head_stop = head_stop
+        encoding = _content_encoding(response)
+        keep = self.keep_wire_encoding and encoding in WIRE_ENCODINGS
+        state.encoding = encoding if keep else None
+        etag = response.headers.get("etag")
+        # If-Range only accepts strong validators.
+        if etag and not etag.startswith("W/"):
+            state.validator = etag
+        else:
+            state.validator = response.headers.get("last-modified")
+
+    def _iter_body(self, response: httpx.Response, state: _RangedDownload) -> Iterator[bytes]:
+        if state.encoding is None:
+            return response.iter_bytes(self.chunk_size)
+        if _content_encoding(response) != state.encoding:
+            raise RuntimeError(f"content-encoding changed during download url={state.url}")
+        return response.iter_raw(self.chunk_size)
+
+    def _schedule_parts(
+        self,
+        url: str,
+        host: str,
+        provider: str,
+        headers: dict[str, str],
+        timeout: httpx.Timeout,
+        state: _RangedDownload,
+        pool: ThreadPoolExecutor,
+        total: int,
+    ) -> None:
+        start = state.head_stop or 0
+        while start < total:
+            end = min(start + self.range_part_bytes, total) - 1
+            future = pool.submit(
+                self._fetch_part, url, host, provider, headers, timeout, state, start, end
+            )
+            state.parts.append((start, end, future))
+            start = end + 1
+
+    def _fetch_part(
+        self,
+        url: str,
+        host: str,
+        provider: str,
+        headers: dict[str, str],
+        timeout: httpx.Timeout,
+        state: _RangedDownload,
+        start: int,
+        end: int,
+    ) -> None:
+        length = end + 1 - start
+        written = 0
+        handle = state.writer.open_region(start)
+
+        def perform(attempt: int, policy: RetryPolicy) -> None:
+            nonlocal written
+            request_headers = dict(headers)
+            request_headers["Range"] = f"bytes={start + written}-{end}"
+            if state.validator:
+                request_headers["If-Range"] = state.validator
+            with self._client.stream(
+                "GET", url, headers=request_headers, timeout=timeout
+            ) as response:
+                self._observe(host, response)
+                self._emit_response(
+                    method="GET",
+                    response=response,
+                    payload_json=None,
+                    headers=request_headers,
+                    body=b"" if response.is_success else response.read(),
+                    attempt_number=attempt,
                 )
-                last_error = RetryableHttpError(f"retryable transport error: {exc}")
-                if attempt < 3:
-                    continue
-                raise last_error from exc
+                self._check_status(response, policy)
+                content_range = parse_content_range(response.headers.get("content-range"))
+                if response.status_code != 206 or content_range is None:
+                    raise RuntimeError(f"server ignored Range for part {start}-{end} url={url}")
+                if content_range[0] != start + written:
+                    raise RuntimeError(f"part {start}-{end} misaligned url={url}")
+                handle.seek(start + written)
+                for chunk in self._iter_body(response, state):
+                    piece = chunk[: length - written]
+                    handle.write(piece)
+                    written += len(piece)
+                    if written >= length:
+                        break
+                if written < length:
+                    raise RetryableHttpError(f"short read part {start}-{end} url={url}")
+
+        with handle:
+            self._with_retries(
+                method="GET",
+                url=url,
+                provider=provider,
+                payload_json=None,
+                headers=headers,
+                perform=perform,
+            )
+
+
+def _content_encoding(response: httpx.Response) -> str:
+    return response.headers.get("content-encoding", "").strip().lower()
+
 
-        assert last_error is not None
-        raise last_error
+def _elapsed_seconds(response: httpx.Response) -> float | None:
+    # Only set once the response is closed; streamed attempts report via stream_get.
+    try:
+        return response.elapsed.total_seconds()
+    except RuntimeError:
+        return None
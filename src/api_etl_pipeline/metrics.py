@@ -0,0 +1,206 @@
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter
+
+# Seconds; wide enough for a sub-millisecond SQLite commit and a 60 s Retry-After.
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+PROMETHEUS_PREFIX = "api_etl_"
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self, bucket_count: int) -> None:
+        self.counts = [0] * bucket_count
+        self.count = 0
+        self.sum = 0.0
+
+
+class Metrics:
+    """Run-scoped counters and latency histograms shared by every component.
+
+    Components call ``observe`` (histogram, seconds) and ``add`` (counter)
+    from any thread. A disabled instance returns before taking the lock, so
+    the cost left at each call site is an attribute check; ``DISABLED_METRICS``
+    is the default everywhere. ``snapshot`` goes into ``run.json`` and
+    ``write_prometheus`` writes the node-exporter textfile format.
+    """
+
+    def __init__(self, *, enabled: bool = True, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: dict[str, dict[Labels, _Histogram]] = {}
+        self._counters: dict[str, dict[Labels, float]] = {}
+
+    def observe(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(len(self.buckets))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram.counts[index] += 1
+                    break
+            histogram.count += 1
+            histogram.sum += value
+
+    def add(self, name: str, amount: float = 1, labels: dict[str, str] | None = None) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def time(self, name: str, labels: dict[str, str] | None = None) -> AbstractContextManager[None]:
+        """Context manager observing its body's wall time under ``name``."""
+        if not self.enabled:
+            return nullcontext()
+        return self._timed(name, labels)
+
+    @contextmanager
+    def _timed(self, name: str, labels: dict[str, str] | None) -> Iterator[None]:
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - started, labels)
+
+    def merge(self, other: "Metrics", labels: dict[str, str] | None = None) -> None:
+        """Add ``other``'s series into this instance, with ``labels`` added to each."""
+        if not (self.enabled and other.enabled):
+            return
+        if other.buckets != self.buckets:
+            raise ValueError("cannot merge metrics with different histogram buckets")
+        extra = labels or {}
+        with other._lock:
+            counters = {name: dict(series) for name, series in other._counters.items()}
+            histograms = {
+                name: {key: (list(h.counts), h.count, h.sum) for key, h in series.items()}
+                for name, series in other._histograms.items()
+            }
+        with self._lock:
+            for name, series in counters.items():
+                target = self._counters.setdefault(name, {})
+                for key, value in series.items():
+                    merged_key = _label_key({**dict(key), **extra})
+                    target[merged_key] = target.get(merged_key, 0) + value
+            for name, series in histograms.items():
+                target_series = self._histograms.setdefault(name, {})
+                for key, (counts, count, total) in series.items():
+                    merged_key = _label_key({**dict(key), **extra})
+                    histogram = target_series.get(merged_key)
+                    if histogram is None:
+                        histogram = target_series[merged_key] = _Histogram(len(self.buckets))
+                    for index, bucket_count in enumerate(counts):
+                        histogram.counts[index] += bucket_count
+                    histogram.count += count
+                    histogram.sum += total
+
+    def snapshot(self) -> dict:
+        """Totals and cumulative bucket counts, JSON-ready for ``run.json``."""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                for name, series in sorted(self._counters.items())
+            }
+            histograms = {
+                name: [
+                    {
+                        "labels": dict(key),
+                        "count": histogram.count,
+                        "sum": round(histogram.sum, 6),
+                        "buckets": self._cumulative(histogram),
+                    }
+                    for key, histogram in series.items()
+                ]
+                for name, series in sorted(self._histograms.items())
+            }
+        return {"enabled": self.enabled, "counters": counters, "histograms": histograms}
+
+    def write_prometheus(self, path: Path, *, labels: dict[str, str] | None = None) -> Path:
+        """Write the Prometheus text format atomically (the textfile collector reads mid-run).
+
+        ``labels`` (e.g. the provider) are added to every series.
+        """
+        extra = _label_key(labels)
+        lines: list[str] = []
+        snapshot = self.snapshot()
+        for name, series in snapshot["counters"].items():
+            metric = f"{PROMETHEUS_PREFIX}{name}"
+            lines.append(f"# TYPE {metric} counter")
+            for entry in series:
+                lines.append(f"{metric}{_render(extra, entry['labels'])} {entry['value']}")
+        for name, series in snapshot["histograms"].items():
+            metric = f"{PROMETHEUS_PREFIX}{name}"
+            lines.append(f"# TYPE {metric} histogram")
+            for entry in series:
+                for bound, count in entry["buckets"].items():
+                    rendered = _render(extra, entry["labels"], {"le": bound})
+                    lines.append(f"{metric}_bucket{rendered} {count}")
+                rendered = _render(extra, entry["labels"])
+                lines.append(f"{metric}_sum{rendered} {entry['sum']}")
+                lines.append(f"{metric}_count{rendered} {entry['count']}")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        staging = path.with_name(f".{path.name}.tmp")
+        staging.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(staging, path)
+        return path
+
+    def _cumulative(self, histogram: _Histogram) -> dict[str, int]:
+        buckets: dict[str, int] = {}
+        running = 0
+        for bound, count in zip(self.buckets, histogram.counts, strict=True):
+            running += count
+            buckets[f"{bound:g}"] = running
+        buckets["+Inf"] = histogram.count
+        return buckets
+
+
+DISABLED_METRICS = Metrics(enabled=False)
+
+
+def _label_key(labels: dict[str, str] | None) -> Labels:
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _render(*label_sets: Labels | dict[str, str]) -> str:
+    pairs: list[tuple[str, str]] = []
+    for labels in label_sets:
+        pairs.extend(labels.items() if isinstance(labels, dict) else labels)
+    if not pairs:
+        return ""
+    body = ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
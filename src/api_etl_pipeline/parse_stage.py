@@ -0,0 +1,94 @@
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any, NamedTuple, TypeVar
+
+from api_etl_pipeline.downloads import read_decoded
+from api_etl_pipeline.http_client import CapturedResponse
+
+T = TypeVar("T")
+
+PARSE_INLINE_MAX_BYTES = 256 * 1024
+
+
+class _BodyRef(NamedTuple):
+    # Exactly one of ``path`` (a spooled body) or ``shm_name`` is set.
+    path: str | None
+    shm_name: str | None
+    size: int
+    encoding: str | None = None
+
+
+class ParseStage:
+    """Runs CPU-bound body parsers off the fetch threads.
+
+    With ``workers > 0`` parsers run on a process pool, so decoding multi-MB
+    JSON does not hold the GIL the fetch threads need. Bodies are never
+    pickled: spooled bodies are passed by path and in-memory ones through a
+    ``SharedMemory`` block the worker attaches to. Bodies up to
+    ``inline_max_bytes`` are parsed on the calling thread, where the IPC round
+    trip would cost more than the parse. Parsers must be module-level
+    functions taking the body bytes first; their results are pickled back,
+    so they should return compact values rather than the raw JSON tree.
+    """
+
+    def __init__(self, workers: int = 0, *, inline_max_bytes: int = PARSE_INLINE_MAX_BYTES):
+        self.workers = max(workers, 0)
+        self.inline_max_bytes = inline_max_bytes
+        self._pool: ProcessPoolExecutor | None = None
+        if self.workers:
+            # spawn: the parent runs fetch and writer threads that fork would copy mid-lock.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+    def parse(self, parser: Callable[..., T], captured: CapturedResponse, **kwargs: Any) -> T:
+        size = captured.size
+        if self._pool is None or size <= self.inline_max_bytes:
+            body = captured.body
+            if captured.body_path is not None and not body:
+                body = read_decoded(captured.body_path, captured.body_encoding)
+            return parser(body, **kwargs)
+
+        if captured.body_path is not None and not captured.body:
+            ref = _BodyRef(str(captured.body_path), None, size, captured.body_encoding)
+            return self._pool.submit(_parse_ref, parser, ref, kwargs).result()
+
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        try:
+            block.buf[:size] = captured.body
+            ref = _BodyRef(None, block.name, size)
+            return self._pool.submit(_parse_ref, parser, ref, kwargs).result()
+        finally:
+            block.close()
+            block.unlink()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "ParseStage":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+INLINE_PARSE_STAGE = ParseStage()
+
+
+def _parse_ref(parser: Callable[..., T], ref: _BodyRef, kwargs: dict) -> T:
+    """Worker-side half of ``ParseStage.parse``."""
+    if ref.path is not None:
+        return parser(read_decoded(Path(ref.path), ref.encoding), **kwargs)
+    assert ref.shm_name is not None
+    block = shared_memory.SharedMemory(name=ref.shm_name)
+    try:
+        body = bytes(block.buf[: ref.size])
+    finally:
+        block.close()
+    return parser(body, **kwargs)
@@ -1,64 +1,176 @@
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from functools import partial
 from pathlib import Path
 
-from api_etl_pipeline.connectors.base import BaseConnector
+from api_etl_pipeline.artifact_index import SeenArtifactIndex
+from api_etl_pipeline.connectors.base import BaseConnector, FetchedItem
 from api_etl_pipeline.downloads import sha256_bytes
+from api_etl_pipeline.metrics import DISABLED_METRICS, Metrics
 from api_etl_pipeline.storage.blob_store import BlobStore
 from api_etl_pipeline.storage.db import SqliteStorage
 
 
 class PipelineRunner:
-    def __init__(self, storage: SqliteStorage, blob_store: BlobStore) -> None:
+    def __init__(
+        self,
+        storage: SqliteStorage,
+        blob_store: BlobStore,
+        *,
+        concurrency: int = 1,
+        artifact_index: SeenArtifactIndex | None = None,
+        metrics: Metrics = DISABLED_METRICS,
+    ) -> None:
         self.storage = storage
         self.blob_store = blob_store
+        self.concurrency = max(concurrency, 1)
+        self.artifact_index = artifact_index
+        self.metrics = metrics
 
     def run(self, connector: BaseConnector, limit: int = 1) -> dict:
-        plan = connector.plan(limit)
+        return self.run_plan(connector, connector.plan(limit))
 
+    def run_plan(self, connector: BaseConnector, plan: Iterable[dict]) -> dict:
+        """Fetch and store ``plan``'s items, then flush and checkpoint once."""
         response_rows = 0
-        artifact_rows = 0
-        parse_errors: list[dict] = []
+        not_modified = 0
+        artifacts_skipped = 0
+        parse_errors: list[tuple[dict, Future[int | None]]] = []
+        artifact_rows: list[Future[int | None]] = []
         artifact_manifest: list[dict[str, str]] = []
 
-        for item_index, item in enumerate(plan):
-            metadata_item, metadata_response = connector.fetch_metadata_item(item, item_index)
-            response_id = self.storage.insert_response(connector.provider, metadata_response)
-            response_rows += 1
+        # Writes are submitted to the storage writer and resolved after one
+        # flush at the end, so row ids never stall the fetch loop.
+        for fetched in self._fetch_all(connector, plan):
+            metadata_item = fetched.metadata_item
+            response_id: Future[int | None] = _resolved(None)
+            if fetched.metadata_response is not None:
+                response_id = self.storage.submit_response(
+                    connector.provider, fetched.metadata_response
+                )
+                response_rows += 1
 
             parse_error = metadata_item.get("parse_error")
             if isinstance(parse_error, dict):
-                parse_error["response_id"] = response_id
-                parse_errors.append(parse_error)
-
-            artifact_download = connector.download_artifact(metadata_item, item_index)
-            if artifact_download is None:
-                continue
-
-            target, captured = artifact_download
-            artifact_response_id = self.storage.insert_response(connector.provider, captured)
-            response_rows += 1
-            digest = sha256_bytes(captured.body)
-            blob_path: Path = self.blob_store.put(digest, captured.body)
-            artifact_manifest.append(
-                {
-                    "source_url": target.url,
-                    "sha256": digest,
-                    "blob_path": str(blob_path),
-                }
-            )
-            if self.storage.insert_artifact(
-                provider=connector.provider,
-                source_url=target.url,
-                sha256=digest,
-                byte_count=len(captured.body),
-                blob_path=str(blob_path),
-                response_id=artifact_response_id,
-            ):
-                artifact_rows += 1
+                parse_errors.append((parse_error, response_id))
 
+            if metadata_item.get("not_modified"):
+                not_modified += 1
+            artifacts_skipped += metadata_item.get("artifacts_skipped", 0)
+
+            # Extra metadata pages (e.g. SEC filings.files[] shards) are stored
+            # like the item's own response but carry no parse error of their own.
+            for supplemental in metadata_item.pop("supplemental_responses", []):
+                self.storage.submit_response(connector.provider, supplemental)
+                response_rows += 1
+
+            for target, captured in fetched.artifacts:
+                blob_path: Path
+                if captured.body_path is not None and captured.sha256 is not None:
+                    digest = captured.sha256
+                    blob_path = self.blob_store.put_file(
+                        digest, captured.body_path, encoding=captured.body_encoding
+                    )
+                    # An identical blob stored earlier may be in another encoding.
+                    captured = replace(
+                        captured,
+                        body_path=blob_path,
+                        body_encoding=BlobStore.encoding_of(blob_path),
+                    )
+                else:
+                    digest = sha256_bytes(captured.body)
+                    blob_path = self.blob_store.put(digest, captured.body)
+                artifact_response_id = self.storage.submit_response(connector.provider, captured)
+                if self.artifact_index is not None:
+                    self.artifact_index.add(target.url)
+                response_rows += 1
+                artifact_manifest.append(
+                    {
+                        "source_url": target.url,
+                        "sha256": digest,
+                        "blob_path": str(blob_path),
+                    }
+                )
+                artifact_rows.append(
+                    self.storage.submit_artifact(
+                        provider=connector.provider,
+                        source_url=target.url,
+                        sha256=digest,
+                        byte_count=captured.size,
+                        blob_path=str(blob_path),
+                        response_id=artifact_response_id,
+                        content_encoding=captured.body_encoding,
+                    )
+                )
+
+            validators = fetched.metadata_response and fetched.metadata_response.validators
+            if validators and not metadata_item.get("incomplete"):
+                # Queued after the item's artifacts, so it commits in the same or a
+                # later transaction: a 304 on the next run must never hide an
+                # artifact we failed to store. An ``incomplete`` item left some of
+                # the response for a later run, which must not get a 304 either.
+                self.storage.submit_validators(fetched.metadata_response.url, *validators)
+
+        self.storage.flush()
+        for parse_error, parse_response_id in parse_errors:
+            parse_error["response_id"] = parse_response_id.result()
         connector.checkpoint()
+        self.storage.checkpoint()
         return {
             "responses": response_rows,
-            "artifacts": artifact_rows,
-            "parse_errors": parse_errors,
+            "artifacts": sum(1 for row in artifact_rows if row.result()),
+            "not_modified": not_modified,
+            "artifacts_skipped": artifacts_skipped,
+            "parse_errors": [parse_error for parse_error, _ in parse_errors],
             "artifacts_manifest": artifact_manifest,
         }
+
+    def _fetch_all(self, connector: BaseConnector, plan: Iterable[dict]) -> Iterator[FetchedItem]:
+        """Yield fetched items in plan order, running up to ``concurrency`` at once.
+
+        Storage stays on the calling thread; only the network half of each item
+        runs on the pool. At most ``2 * concurrency`` items are in flight so a
+        long plan does not pile up completed bodies in memory.
+        """
+        is_stored = None
+        if self.artifact_index is not None:
+            is_stored = partial(self.artifact_index.is_stored, connector.provider)
+        fetch = partial(self._timed_fetch, connector, is_stored)
+        if self.concurrency == 1:
+            for item_index, item in enumerate(plan):
+                yield fetch(item, item_index)
+            return
+
+        pool = ThreadPoolExecutor(
+            max_workers=self.concurrency,
+            thread_name_prefix=f"{connector.provider}-fetch",
+        )
+        pending: deque[Future[FetchedItem]] = deque()
+        try:
+            for item_index, item in enumerate(plan):
+                pending.append(pool.submit(fetch, item, item_index))
+                if len(pending) >= self.concurrency * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _timed_fetch(
+        self,
+        connector: BaseConnector,
+        is_stored: Callable[[str], bool] | None,
+        item: dict,
+        item_index: int,
+    ) -> FetchedItem:
+        # Wall time of one item's network half: metadata, parse and downloads.
+        with self.metrics.time("pipeline_item_seconds", {"provider": connector.provider}):
+            return connector.fetch_item(item, item_index, is_stored=is_stored)
+
+
+def _resolved(value: int | None) -> Future[int | None]:
+    future: Future[int | None] = Future()
+    future.set_result(value)
+    return future
@@ -0,0 +1,184 @@
+import csv
+import hashlib
+import heapq
+import re
+import sqlite3
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from itertools import chain, count
+from pathlib import Path
+from typing import Literal
+
+# SEC company_tickers.json ({"0": {"cik_str": 320193, ...}}) and friends.
+_JSON_CIK = re.compile(rb'"cik(?:_str)?"\s*:\s*"?(\d{1,10})(?!\d)')
+CSV_CIK_COLUMNS = ("cik", "cik_str", "cik10")
+STALEST_WINDOW = 10_000
+
+
+def parse_cik(token: str) -> str | None:
+    """10-digit CIK for ``token``, or None if it is not a CIK (``0``, 11+ digits, text)."""
+    token = token.strip()
+    if not token.isdigit() or len(token) > 10 or int(token) == 0:
+        return None
+    return f"{int(token):010d}"
+
+
+def iter_cik_file(path: Path, *, chunk_bytes: int = 1 << 20) -> Iterator[str]:
+    """Stream 10-digit CIKs from a CIK list, ``ticker.txt``, a CSV or ``company_tickers.json``.
+
+    Each format is read by a fixed column: a list has one CIK per line,
+    ``ticker.txt`` is ``ticker<TAB>cik``, a ``.csv`` needs a header with one of
+    ``CSV_CIK_COLUMNS`` and JSON files are scanned for ``cik``/``cik_str``
+    values chunk by chunk. ``#`` starts a comment in lists. Values that are
+    not CIKs are skipped rather than aborting a long plan halfway.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        yield from _scan_json_ciks(path, chunk_bytes)
+        return
+    if suffix == ".csv":
+        yield from _read_csv_ciks(path)
+        return
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            fields = line.split("#", 1)[0].strip().split("\t")
+            cik = parse_cik(fields[1] if len(fields) == 2 else fields[0])
+            if cik is not None:
+                yield cik
+
+
+def iter_db_ciks(
+    path: Path, *, provider: str = "sec_edgar", chunk_rows: int = 10_000
+) -> Iterator[str]:
+    """CIKs a prior run's database synced (its ``sync_watermarks`` scopes), in key order."""
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        last = ""
+        while True:
+            rows = conn.execute(
+                """
+                SELECT scope FROM sync_watermarks
+                WHERE provider = ? AND scope > ? ORDER BY scope LIMIT ?
+                """,
+                (provider, last, chunk_rows),
+            ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            for (scope,) in rows:
+                yield scope
+    finally:
+        conn.close()
+
+
+def shard_of(key: str, shards: int) -> int:
+    """Stable shard for ``key``; every worker computes the same split."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % shards
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """``"index/count"`` (0-based index) as a tuple."""
+    index, _, shards = value.partition("/")
+    if not (index.isdigit() and shards.isdigit()) or not int(index) < int(shards):
+        raise ValueError(f"shard must be INDEX/COUNT with 0 <= INDEX < COUNT, got {value!r}")
+    return int(index), int(shards)
+
+
+def stalest_first(
+    keys: Iterable[str],
+    last_synced: Callable[[str], str | None],
+    *,
+    window: int = STALEST_WINDOW,
+) -> Iterator[str]:
+    """Reorder ``keys`` so never-synced and least recently synced come first.
+
+    Ordering is exact within each run of ``window`` keys, which keeps memory
+    bounded and lets the first items out after one window instead of after a
+    full pass over the source.
+    """
+    heap: list[tuple[bool, str, int, str]] = []
+    sequence = count()
+    for key in keys:
+        synced = last_synced(key)
+        heap.append((synced is not None, synced or "", next(sequence), key))
+        if len(heap) >= window:
+            yield from _drain(heap)
+    yield from _drain(heap)
+
+
+@dataclass(frozen=True)
+class CikUniverse:
+    """Re-iterable, lazily read CIK source for ``SecEdgarConnector.plan``.
+
+    Concatenates ``cik_file`` and ``cik_db``, drops repeats of the previous
+    CIK, keeps this worker's ``shard`` and optionally puts the stalest first.
+    """
+
+    cik_file: Path | None = None
+    cik_db: Path | None = None
+    order: Literal["source", "stalest"] = "source"
+    shard: tuple[int, int] | None = None
+    last_synced: Callable[[str], str | None] | None = None
+
+    def __iter__(self) -> Iterator[str]:
+        ciks = self._read()
+        if self.shard is not None:
+            index, shards = self.shard
+            ciks = (cik for cik in ciks if shard_of(cik, shards) == index)
+        if self.order == "stalest" and self.last_synced is not None:
+            ciks = stalest_first(ciks, self.last_synced)
+        return ciks
+
+    def _read(self) -> Iterator[str]:
+        readers: list[Iterator[str]] = []
+        if self.cik_file is not None:
+            readers.append(iter_cik_file(self.cik_file))
+        if self.cik_db is not None:
+            readers.append(iter_db_ciks(self.cik_db))
+        previous = None
+        for cik in chain.from_iterable(readers):
+            if cik != previous:
+                yield cik
+            previous = cik
+
+
+def _read_csv_ciks(path: Path) -> Iterator[str]:
+    with path.open(encoding="utf-8", newline="") as handle:
+        reader = csv.reader(handle)
+        header = [name.strip().lower() for name in next(reader, [])]
+        column = next((header.index(name) for name in CSV_CIK_COLUMNS if name in header), None)
+        if column is None:
+            raise ValueError(f"{path} has no CIK column; expected one of {CSV_CIK_COLUMNS}")
+        for row in reader:
+            cik = parse_cik(row[column]) if column < len(row) else None
+            if cik is not None:
+                yield cik
+
+
+def _scan_json_ciks(path: Path, chunk_bytes: int) -> Iterator[str]:
+    carry = b""
+    with path.open("rb") as handle:
+        while chunk := handle.read(chunk_bytes):
+            buffer = carry + chunk
+            end = 0
+            for match in _JSON_CIK.finditer(buffer):
+                # A match touching the buffer end may be cut short; rescan it with more input.
+                if match.end() == len(buffer):
+                    break
+                cik = parse_cik(match.group(1).decode())
+                if cik is not None:
+                    yield cik
+                end = match.end()
+            # Keep enough tail for a key split across chunks.
+            carry = buffer[max(end, len(buffer) - 64) :]
+        for match in _JSON_CIK.finditer(carry):
+            cik = parse_cik(match.group(1).decode())
+            if cik is not None:
+                yield cik
+
+
+def _drain(heap: list[tuple[bool, str, int, str]]) -> Iterator[str]:
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[-1]
@@ -1,58 +1,329 @@
+import asyncio
+import hashlib
+import sqlite3
 import threading
 import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+from api_etl_pipeline.metrics import DISABLED_METRICS, Metrics
+from api_etl_pipeline.settings import AppSettings
+
+SEC_COOLDOWN_RPS = 5.0
+SEC_COOLDOWN_SECONDS = 600.0
+THROTTLE_STATUSES = {429, 503}
 
 
 @dataclass
-class TokenBucket:
-    rate_per_second: float
-    capacity: float
-    tokens: float
-    last_refill: float
-
-    def consume(self, amount: float = 1.0) -> float:
-        now = time.monotonic()
-        elapsed = now - self.last_refill
-        self.tokens = min(self.capacity, self.tokens + (elapsed * self.rate_per_second))
-        self.last_refill = now
-        if self.tokens >= amount:
-            self.tokens -= amount
-            return 0.0
-        deficit = amount - self.tokens
-        wait_seconds = deficit / self.rate_per_second
-        self.tokens = 0.0
-        return wait_seconds
+class RateSlot:
+    """Reservation schedule for one limiter scope.
+
+    Each caller reserves the next free start time and advances ``next_slot`` by
+    one interval, so concurrent callers are spaced exactly ``1 / rate`` apart
+    instead of all waking together after the same deficit.
+    """
+
+    max_rate: float
+    rate: float
+    next_slot: float
+    blocked_until: float = 0.0
+    cooldown_rate: float | None = None
+    cooldown_until: float = 0.0
+
+    def effective_rate(self, now: float) -> float:
+        if self.cooldown_rate is not None and now < self.cooldown_until:
+            return min(self.rate, self.cooldown_rate)
+        return self.rate
+
+    def reserve(self, now: float) -> float:
+        start = max(now, self.next_slot, self.blocked_until)
+        self.next_slot = start + 1.0 / self.effective_rate(now)
+        return start - now
+
+    def throttle(self, now: float, *, min_rate: float) -> None:
+        # Multiplicative decrease; push out the schedule so queued callers slow down too.
+        self.rate = max(min_rate, self.rate / 2.0)
+        self.next_slot = max(self.next_slot, now + 1.0 / self.rate)
+
+    def recover(self, step: float) -> None:
+        self.rate = min(self.max_rate, self.rate + step)
+
+    def block(self, until: float) -> None:
+        self.blocked_until = max(self.blocked_until, until)
+
+    def cool_down(self, now: float, rate: float, seconds: float) -> None:
+        self.cooldown_rate = rate
+        self.cooldown_until = max(self.cooldown_until, now + seconds)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max((when - datetime.now(UTC)).total_seconds(), 0.0)
 
 
 class GlobalRateLimiter:
-    """Host-scoped limiter + APS scoped by (subscription_key, host)."""
+    """Host-scoped limiter + APS scoped by (subscription_key, host).
+
+    Caps come from ``SEC_MAX_RPS`` / ``NRC_MAX_RPS``; the current rate adapts
+    with AIMD on 429/503, ``Retry-After`` blocks the scope, and an SEC 403
+    caps the host at 5 rps for 10 minutes (dossier §2.2).
+    """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        *,
+        sec_max_rps: float = 2.0,
+        nrc_max_rps: float = 2.0,
+        default_max_rps: float = 5.0,
+        min_rps: float = 0.1,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Metrics = DISABLED_METRICS,
+    ) -> None:
+        self.sec_max_rps = sec_max_rps
+        self.nrc_max_rps = nrc_max_rps
+        self.default_max_rps = default_max_rps
+        self.min_rps = min_rps
+        self._clock = clock
+        self.metrics = metrics
         self._lock = threading.Lock()
-        self._host_buckets: dict[str, TokenBucket] = {}
-        self._aps_buckets: dict[tuple[str, str], TokenBucket] = {}
-
-    def _get_bucket(self, collection: dict, key: str | tuple[str, str], rps: float) -> TokenBucket:
-        bucket = collection.get(key)
-        if bucket is None:
-            bucket = TokenBucket(
-                rate_per_second=rps,
-                capacity=max(rps, 1.0),
-                tokens=max(rps, 1.0),
-                last_refill=time.monotonic(),
-            )
-            collection[key] = bucket
-        return bucket
+        self._slots: dict[str, RateSlot] = {}
+
+    @classmethod
+    def from_settings(
+        cls, settings: AppSettings, *, metrics: Metrics = DISABLED_METRICS
+    ) -> "GlobalRateLimiter":
+        caps = {"sec_max_rps": settings.sec_max_rps, "nrc_max_rps": settings.nrc_max_rps}
+        if settings.app_rate_limit_db is not None:
+            return SharedRateLimiter(settings.app_rate_limit_db, metrics=metrics, **caps)
+        return cls(metrics=metrics, **caps)
+
+    def max_rps_for(self, host: str) -> float:
+        if host.endswith("sec.gov"):
+            return self.sec_max_rps
+        if host.endswith("nrc.gov"):
+            return self.nrc_max_rps
+        return self.default_max_rps
+
+    def close(self) -> None:
+        pass
 
-    def acquire_host(self, host: str, rps: float) -> None:
+    def _new_slot(self, host: str) -> RateSlot:
+        max_rate = self.max_rps_for(host)
+        return RateSlot(max_rate=max_rate, rate=max_rate, next_slot=self._clock())
+
+    @contextmanager
+    def _locked_slots(self, scopes: list[tuple[str, str]]) -> Iterator[list[RateSlot]]:
+        """Yield the slots for ``(scope, host)`` pairs, held exclusively until exit."""
         with self._lock:
-            wait_seconds = self._get_bucket(self._host_buckets, host, rps).consume(1.0)
+            slots = []
+            for scope, host in scopes:
+                slot = self._slots.get(scope)
+                if slot is None:
+                    slot = self._slots[scope] = self._new_slot(host)
+                slots.append(slot)
+            yield slots
+
+    def reserve_host(self, host: str) -> float:
+        with self._locked_slots([_host_scope(host)]) as (slot,):
+            wait_seconds = slot.reserve(self._clock())
+        self.metrics.observe("rate_limiter_wait_seconds", wait_seconds, {"scope": host})
+        return wait_seconds
+
+    def reserve_aps(self, subscription_key: str, host: str) -> float:
+        with self._locked_slots([_aps_scope(subscription_key, host)]) as (slot,):
+            wait_seconds = slot.reserve(self._clock())
+        # Keyed by host only: the subscription key must not leak into metrics.
+        self.metrics.observe("rate_limiter_wait_seconds", wait_seconds, {"scope": f"aps:{host}"})
+        return wait_seconds
+
+    def acquire_host(self, host: str) -> None:
+        wait_seconds = self.reserve_host(host)
         if wait_seconds > 0:
             time.sleep(wait_seconds)
 
-    def acquire_aps(self, subscription_key: str, host: str, rps: float) -> None:
-        key = (subscription_key, host)
-        with self._lock:
-            wait_seconds = self._get_bucket(self._aps_buckets, key, rps).consume(1.0)
+    def acquire_aps(self, subscription_key: str, host: str) -> None:
+        wait_seconds = self.reserve_aps(subscription_key, host)
         if wait_seconds > 0:
             time.sleep(wait_seconds)
+
+    async def acquire_host_async(self, host: str) -> None:
+        wait_seconds = self.reserve_host(host)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+    async def acquire_aps_async(self, subscription_key: str, host: str) -> None:
+        wait_seconds = self.reserve_aps(subscription_key, host)
+        if wait_seconds > 0:
+            await asyncio.sleep(wait_seconds)
+
+    def observe(
+        self,
+        host: str,
+        status_code: int,
+        *,
+        retry_after: str | None = None,
+        subscription_key: str | None = None,
+    ) -> None:
+        """Feed a response back into the scopes that admitted it."""
+        scopes = [_host_scope(host)]
+        if subscription_key is not None:
+            scopes.append(_aps_scope(subscription_key, host))
+        with self._locked_slots(scopes) as slots:
+            now = self._clock()
+            delay = parse_retry_after(retry_after)
+            for slot in slots:
+                if status_code in THROTTLE_STATUSES:
+                    slot.throttle(now, min_rate=self.min_rps)
+                elif status_code == 403 and host.endswith("sec.gov"):
+                    slot.cool_down(now, SEC_COOLDOWN_RPS, SEC_COOLDOWN_SECONDS)
+                elif 200 <= status_code < 400:
+                    slot.recover(max(slot.max_rate / 20.0, 0.05))
+                if delay is not None and status_code in THROTTLE_STATUSES | {403}:
+                    slot.block(now + delay)
+
+
+class SharedRateLimiter(GlobalRateLimiter):
+    """Limiter whose slots live in a SQLite file shared by every worker process.
+
+    Enabled by ``APP_RATE_LIMIT_DB``. Each reservation or observation is one
+    ``BEGIN IMMEDIATE`` transaction, so the database file lock serializes all
+    workers onto the single schedule one process would keep: aggregate
+    throughput grows with workers up to the cap and never past it. Slot times
+    are wall-clock because monotonic clocks are not comparable between
+    processes. Subscription keys are stored hashed.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        clock: Callable[[], float] = time.time,
+        busy_timeout: float = 30.0,
+        **kwargs,
+    ) -> None:
+        super().__init__(clock=clock, **kwargs)
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS rate_slots (
+                scope TEXT PRIMARY KEY,
+                rate REAL NOT NULL,
+                next_slot REAL NOT NULL,
+                blocked_until REAL NOT NULL,
+                cooldown_rate REAL,
+                cooldown_until REAL NOT NULL
+            )
+            """
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE.
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self.busy_timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _locked_slots(self, scopes: list[tuple[str, str]]) -> Iterator[list[RateSlot]]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            slots = [self._load_slot(conn, scope, host) for scope, host in scopes]
+            yield slots
+            conn.executemany(
+                """
+                INSERT INTO rate_slots(
+                    scope, rate, next_slot, blocked_until, cooldown_rate, cooldown_until
+                ) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(scope) DO UPDATE SET
+                    rate = excluded.rate,
+                    next_slot = excluded.next_slot,
+                    blocked_until = excluded.blocked_until,
+                    cooldown_rate = excluded.cooldown_rate,
+                    cooldown_until = excluded.cooldown_until
+                """,
+                [
+                    (
+                        scope,
+                        slot.rate,
+                        slot.next_slot,
+                        slot.blocked_until,
+                        slot.cooldown_rate,
+                        slot.cooldown_until,
+                    )
+                    for (scope, _host), slot in zip(scopes, slots, strict=True)
+                ],
+            )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _load_slot(self, conn: sqlite3.Connection, scope: str, host: str) -> RateSlot:
+        row = conn.execute(
+            """
+            SELECT rate, next_slot, blocked_until, cooldown_rate, cooldown_until
+            FROM rate_slots WHERE scope = ?
+            """,
+            (scope,),
+        ).fetchone()
+        if row is None:
+            return self._new_slot(host)
+        rate, next_slot, blocked_until, cooldown_rate, cooldown_until = row
+        # The cap is this process's setting, so a lowered SEC_MAX_RPS applies at once.
+        max_rate = self.max_rps_for(host)
+        return RateSlot(
+            max_rate=max_rate,
+            rate=min(rate, max_rate),
+            next_slot=next_slot,
+            blocked_until=blocked_until,
+            cooldown_rate=cooldown_rate,
+            cooldown_until=cooldown_until,
+        )
+
+
+def _host_scope(host: str) -> tuple[str, str]:
+    return f"host:{host}", host
+
+
+def _aps_scope(subscription_key: str, host: str) -> tuple[str, str]:
+    digest = hashlib.sha256(subscription_key.encode("utf-8")).hexdigest()[:16]
+    return f"aps:{digest}:{host}", host
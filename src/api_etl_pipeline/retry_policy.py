@@ -1,14 +1,111 @@
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
+import random
+import threading
+from dataclasses import dataclass, field
 
 
 class RetryableHttpError(RuntimeError):
-    pass
+    def __init__(self, message: str, *, status_code: int = 0) -> None:
+        super().__init__(message)
+        self.status_code = status_code
 
 
-def with_retry(max_attempts: int = 3):
-    return retry(
-        reraise=True,
-        retry=retry_if_exception_type(RetryableHttpError),
-        stop=stop_after_attempt(max_attempts),
-        wait=wait_exponential_jitter(initial=0.2, max=5),
-    )
+@dataclass(frozen=True)
+class StatusRule:
+    max_attempts: int
+    backoff_max: float = 5.0
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Per-provider retry table; statuses without a rule are terminal."""
+
+    rules: dict[int, StatusRule]
+    server_error: StatusRule = StatusRule(max_attempts=3)
+    transport_error: StatusRule = StatusRule(max_attempts=3)
+    backoff_initial: float = 0.2
+
+    def rule_for(self, status_code: int) -> StatusRule | None:
+        if status_code == 0:
+            return self.transport_error
+        if status_code in self.rules:
+            return self.rules[status_code]
+        if status_code >= 500:
+            return self.server_error
+        return None
+
+    def is_retryable(self, status_code: int) -> bool:
+        return self.rule_for(status_code) is not None
+
+    def backoff(self, status_code: int, attempt_number: int) -> float:
+        rule = self.rule_for(status_code) or self.server_error
+        delay = min(rule.backoff_max, self.backoff_initial * 2 ** (attempt_number - 1))
+        return delay + random.uniform(0, self.backoff_initial)
+
+
+# Dossier 1 §2.2: 429/403 back off up to 5 attempts (the limiter applies the
+# 10-minute 5 rps cooldown); 5xx 3 attempts with jitter; 404 terminal.
+SEC_RETRY_POLICY = RetryPolicy(
+    rules={
+        429: StatusRule(max_attempts=5, backoff_max=60.0),
+        403: StatusRule(max_attempts=5, backoff_max=60.0),
+    },
+)
+
+# Dossier 2 §2.2: 429 up to 5 attempts; 500/502/503/504 3 attempts; 401/403/404
+# terminal. Other 5xx codes are not listed, so they are terminal as well.
+NRC_RETRY_POLICY = RetryPolicy(
+    rules={
+        429: StatusRule(max_attempts=5, backoff_max=60.0),
+        500: StatusRule(max_attempts=3),
+        502: StatusRule(max_attempts=3),
+        503: StatusRule(max_attempts=3),
+        504: StatusRule(max_attempts=3),
+    },
+    server_error=StatusRule(max_attempts=1),
+)
+
+DEFAULT_RETRY_POLICY = RetryPolicy(rules={429: StatusRule(max_attempts=3)})
+
+
+def retry_policy_for(provider: str) -> RetryPolicy:
+    if provider.startswith("sec_"):
+        return SEC_RETRY_POLICY
+    if provider.startswith("nrc_"):
+        return NRC_RETRY_POLICY
+    return DEFAULT_RETRY_POLICY
+
+
+@dataclass
+class RetryBudget:
+    """Run-wide cap on retries so a failing host cannot burn the request quota."""
+
+    max_retries: int
+    retries: int = 0
+    exhausted: int = 0
+    backoff_seconds: float = 0.0
+    by_status: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def try_spend(self, status_code: int) -> bool:
+        with self._lock:
+            if self.retries >= self.max_retries:
+                self.exhausted += 1
+                return False
+            self.retries += 1
+            key = str(status_code) if status_code else "transport"
+            self.by_status[key] = self.by_status.get(key, 0) + 1
+            return True
+
+    def record_backoff(self, seconds: float) -> None:
+        with self._lock:
+            self.backoff_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "budget": self.max_retries,
+                "retries": self.retries,
+                "exhausted": self.exhausted,
+                "backoff_seconds": round(self.backoff_seconds, 3),
+                "by_status": dict(sorted(self.by_status.items())),
+            }
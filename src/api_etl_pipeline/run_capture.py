@@ -1,13 +1,39 @@
 from __future__ import annotations
 
+import contextlib
 import gzip
 import hashlib
 import io
 import json
-from dataclasses import dataclass
+import os
+import queue
+import shutil
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, replace
 from datetime import UTC, datetime
 from pathlib import Path
 
+from api_etl_pipeline.capture_segment import (
+    KIND_BODY,
+    KIND_META,
+    KIND_REQUEST,
+    SegmentReader,
+    SegmentWriter,
+    segment_name,
+)
+from api_etl_pipeline.downloads import (
+    DECODE_CHUNK_BYTES,
+    ENCODING_SUFFIXES,
+    is_zlib_header,
+    iter_decoded,
+    iter_file_chunks,
+    read_decoded,
+    sha256_file,
+)
+from api_etl_pipeline.metrics import DISABLED_METRICS, Metrics
+
 SENSITIVE_KEYS = {
     "authorization",
     "cookie",
@@ -34,6 +60,42 @@ class AttemptRecord:
     attempt_number: int
     error_type: str | None = None
     error_message: str | None = None
+    body_path: Path | None = None
+    sha256: str | None = None
+    elapsed_seconds: float | None = None
+    byte_count: int | None = None
+    # Set when ``body_path`` holds gzip/deflate bytes as received.
+    body_encoding: str | None = None
+
+    @property
+    def body_size(self) -> int:
+        if self.byte_count is not None:
+            return self.byte_count
+        if self.body_path is not None:
+            return self.body_path.stat().st_size
+        return len(self.body)
+
+    def read_body(self) -> bytes:
+        if self.body_path is None:
+            return self.body
+        return read_decoded(self.body_path, self.body_encoding)
+
+    @property
+    def is_error(self) -> bool:
+        return not 200 <= self.status_code < 300
+
+
+@dataclass
+class _CaptureJob:
+    attempt_id: int
+    attempt: AttemptRecord
+    queued_bytes: int
+
+
+_STOP = object()
+
+CAPTURE_MODES = ("full", "metadata-only", "errors-only", "sampled")
+CAPTURE_FORMATS = ("files", "packed")
 
 
 class Tee(io.TextIOBase):
@@ -51,6 +113,42 @@ class Tee(io.TextIOBase):
             stream.flush()
 
 
+def write_run_summary(
+    run_dir: Path,
+    captures: dict[str, RunCapture],
+    *,
+    started_at: datetime,
+    metrics: Metrics,
+) -> dict:
+    """Top-level ``run.json`` of a multi-provider run; each section keeps its own."""
+    sections: dict[str, dict] = {}
+    for provider, capture in captures.items():
+        section = json.loads(capture.run_json_path.read_text(encoding="utf-8"))
+        sections[provider] = {
+            "run_dir": capture.run_dir.relative_to(run_dir).as_posix(),
+            "status": section["status"],
+            "exception": section["exception"],
+            "started_at": section["started_at"],
+            "ended_at": section["ended_at"],
+            "counts": section["counts"],
+        }
+    ended_at = datetime.now(UTC)
+    failed = any(section["status"] != "succeeded" for section in sections.values())
+    payload = {
+        "providers": list(captures),
+        "started_at": started_at.isoformat(),
+        "ended_at": ended_at.isoformat(),
+        "wall_seconds": round((ended_at - started_at).total_seconds(), 3),
+        "status": "failed" if failed else "succeeded",
+        "sections": sections,
+        "metrics": metrics.snapshot() if metrics.enabled else None,
+    }
+    (run_dir / "run.json").write_text(
+        json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8"
+    )
+    return payload
+
+
 def build_run_dir(base: Path, provider: str) -> Path:
     stem = f"{datetime.now(UTC).strftime('%Y%m%dT%H%M%SZ')}_{provider}"
     candidate = base / stem
@@ -65,6 +163,24 @@ def build_run_dir(base: Path, provider: str) -> Path:
 
 
 class RunCapture:
+    """Per-run capture directory.
+
+    With ``queue_max_bytes > 0`` attempts are written by a background thread:
+    ``capture_attempt`` only assigns the id (and hard-links file bodies, whose
+    spool files are renamed right after) before queueing, and blocks once the
+    in-memory bodies waiting in the queue exceed ``queue_max_bytes``.
+    ``finalize`` drains the queue before writing ``run.json``.
+
+    ``mode`` decides which attempts keep their body on disk: ``full`` (all),
+    ``metadata-only`` (none), ``errors-only`` (non-2xx and transport errors) or
+    ``sampled`` (errors plus ``sample_rate`` of the rest, chosen by URL hash so
+    reruns sample the same URLs). Meta files are always written.
+
+    ``format="packed"`` appends request, body and meta records to segments
+    under ``capture/`` instead of per-attempt files; ``extract_packed``
+    regenerates the ``files`` layout on demand.
+    """
+
     def __init__(
         self,
         run_dir: Path,
@@ -74,20 +190,41 @@ class RunCapture:
         limit: int,
         pretty_max_bytes: int,
         gzip_min_bytes: int,
+        queue_max_bytes: int = 0,
+        mode: str = "full",
+        sample_rate: float = 0.1,
+        format: str = "files",
+        segment_max_bytes: int = 1024 * 1024 * 1024,
+        metrics: Metrics = DISABLED_METRICS,
     ) -> None:
+        if mode not in CAPTURE_MODES:
+            raise ValueError(f"capture mode must be one of: {', '.join(CAPTURE_MODES)}")
+        if format not in CAPTURE_FORMATS:
+            raise ValueError(f"capture format must be one of: {', '.join(CAPTURE_FORMATS)}")
         self.run_dir = run_dir
         self.provider = provider
         self.live = live
         self.limit = limit
         self.pretty_max_bytes = pretty_max_bytes
         self.gzip_min_bytes = gzip_min_bytes
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.format = format
+        self.metrics = metrics
         self.started_at = datetime.now(UTC)
         self.ended_at: datetime | None = None
 
+        self._lock = threading.Lock()
         self._attempt_counter = 0
         self._parse_errors: list[dict] = []
         self._response_entries: list[dict] = []
         self._artifact_entries: list[dict] = []
+        self._capture_errors: list[str] = []
+        self._bodies_written = 0
+        self._bodies_skipped = 0
+        self._write_seconds = 0.0
+        self._backpressure_seconds = 0.0
+        self._drain_seconds = 0.0
 
         self.requests_dir = self.run_dir / "requests"
         self.responses_dir = self.run_dir / "responses"
@@ -95,9 +232,34 @@ class RunCapture:
         self.run_json_path = self.run_dir / "run.json"
         self.error_path = self.run_dir / "error.txt"
 
+        self.capture_dir = self.run_dir / "capture"
+
         self.run_dir.mkdir(parents=True, exist_ok=True)
-        self.requests_dir.mkdir(parents=True, exist_ok=True)
-        self.responses_dir.mkdir(parents=True, exist_ok=True)
+        self._segments: SegmentWriter | None = None
+        if format == "packed":
+            # File bodies queued for the writer are hard-linked here until packed.
+            self._pending_dir = self.capture_dir / ".pending"
+            self._pending_dir.mkdir(parents=True, exist_ok=True)
+            self._segments = SegmentWriter(
+                self.capture_dir,
+                max_segment_bytes=segment_max_bytes,
+                compress_min_bytes=gzip_min_bytes,
+            )
+        else:
+            self._pending_dir = self.responses_dir
+            self.requests_dir.mkdir(parents=True, exist_ok=True)
+            self.responses_dir.mkdir(parents=True, exist_ok=True)
+
+        self.queue_max_bytes = queue_max_bytes
+        self._queue: queue.Queue = queue.Queue()
+        self._queued_bytes = 0
+        self._queue_space = threading.Condition()
+        self._writer: threading.Thread | None = None
+        if queue_max_bytes > 0:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="run-capture", daemon=True
+            )
+            self._writer.start()
 
     def add_parse_error(self, error: dict) -> None:
         self._parse_errors.append(error)
@@ -110,11 +272,106 @@ class RunCapture:
         )
 
     def capture_attempt(self, attempt: AttemptRecord) -> int:
-        self._attempt_counter += 1
-        attempt_id = self._attempt_counter
-        stem = f"{attempt_id:04d}_{attempt.method.lower()}"
+        if self._writer is None:
+            with self._lock:
+                self._attempt_counter += 1
+                self._write_timed(self._attempt_counter, attempt)
+                return self._attempt_counter
+
+        if attempt.body_path is not None and not self.keeps_body(attempt):
+            # The spool file is about to move; hash it now unless the client did.
+            attempt = replace(
+                attempt,
+                sha256=attempt.sha256 or sha256_file(attempt.body_path),
+                byte_count=attempt.body_size,
+                body=b"",
+                body_path=None,
+            )
+        queued_bytes = 0 if attempt.body_path is not None else len(attempt.body)
+        self._reserve(queued_bytes)
+        with self._lock:
+            # Ids are assigned and queued under one lock so the writer sees them in order.
+            self._attempt_counter += 1
+            attempt_id = self._attempt_counter
+            if attempt.body_path is not None:
+                suffix = ENCODING_SUFFIXES[attempt.body_encoding] if attempt.body_encoding else ""
+                raw_path = self._pending_dir / f"{self._stem(attempt_id, attempt)}.raw.bin{suffix}"
+                _link_or_copy(attempt.body_path, raw_path)
+                attempt = replace(attempt, body_path=raw_path)
+            self._queue.put(_CaptureJob(attempt_id, attempt, queued_bytes))
+        return attempt_id
+
+    def drain(self) -> None:
+        """Wait for queued attempts to be written; later captures run inline."""
+        if self._writer is None:
+            return
+        started = time.perf_counter()
+        self._queue.put(_STOP)
+        self._writer.join()
+        self._writer = None
+        self._drain_seconds += time.perf_counter() - started
+
+    def close(self) -> None:
+        self.drain()
+        if self._segments is not None:
+            self._segments.close()
+            self._segments = None
+            with contextlib.suppress(OSError):
+                self._pending_dir.rmdir()
+
+    def _reserve(self, size: int) -> None:
+        with self._queue_space:
+            if self._queued_bytes and self._queued_bytes + size > self.queue_max_bytes:
+                started = time.perf_counter()
+                while self._queued_bytes and self._queued_bytes + size > self.queue_max_bytes:
+                    self._queue_space.wait()
+                waited = time.perf_counter() - started
+                self._backpressure_seconds += waited
+                self.metrics.observe("capture_backpressure_seconds", waited)
+            self._queued_bytes += size
+
+    def _writer_loop(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            try:
+                self._write_timed(job.attempt_id, job.attempt)
+            except Exception as exc:
+                self._capture_errors.append(f"{job.attempt_id}: {type(exc).__name__}: {exc}")
+            finally:
+                with self._queue_space:
+                    self._queued_bytes -= job.queued_bytes
+                    self._queue_space.notify_all()
+
+    def _write_timed(self, attempt_id: int, attempt: AttemptRecord) -> None:
+        started = time.perf_counter()
+        try:
+            self._write_attempt(attempt_id, attempt)
+        finally:
+            elapsed = time.perf_counter() - started
+            self._write_seconds += elapsed
+            self.metrics.observe("capture_write_seconds", elapsed, {"format": self.format})
+
+    def keeps_body(self, attempt: AttemptRecord) -> bool:
+        if self.mode == "full":
+            return True
+        if self.mode == "metadata-only":
+            return False
+        if attempt.is_error or attempt.error_type is not None:
+            return True
+        if self.mode == "errors-only":
+            return False
+        bucket = int.from_bytes(hashlib.sha256(attempt.url.encode()).digest()[:8], "big")
+        return bucket < self.sample_rate * 2**64
+
+    @staticmethod
+    def _stem(attempt_id: int, attempt: AttemptRecord) -> str:
+        return attempt_stem(attempt_id, attempt.method)
+
+    def _write_attempt(self, attempt_id: int, attempt: AttemptRecord) -> None:
+        stem = self._stem(attempt_id, attempt)
 
-        request_path = self.requests_dir / f"{stem}.json"
         request_payload = {
             "id": attempt_id,
             "method": attempt.method,
@@ -123,53 +380,71 @@ class RunCapture:
             "payload": self._load_json_or_text(attempt.request_payload_json),
             "headers": self._redact_obj(attempt.request_headers or {}),
         }
+        if self._segments is not None:
+            self._pack_attempt(attempt_id, attempt, request_payload)
+            return
+
+        request_path = self.requests_dir / f"{stem}.json"
         request_path.write_text(
             json.dumps(request_payload, indent=2, sort_keys=True),
             encoding="utf-8",
         )
 
-        raw_path = self.responses_dir / f"{stem}.raw.bin"
-        raw_path.write_bytes(attempt.body)
-
+        body_size = attempt.body_size
+        raw_path: Path | None = None
         gz_path: str | None = None
-        if len(attempt.body) >= self.gzip_min_bytes:
+        pretty_path: str | None = None
+        if not self.keeps_body(attempt):
+            body_sha256 = self._skipped_body_sha256(attempt)
+            self._bodies_skipped += 1
+        else:
+            raw_path = self.responses_dir / f"{stem}.raw.bin"
             gz_file = self.responses_dir / f"{stem}.raw.bin.gz"
-            with gzip.open(gz_file, "wb") as f:
-                f.write(attempt.body)
-            gz_path = str(gz_file.relative_to(self.run_dir))
+            wire_gzip = False
+            if attempt.body_path is not None and attempt.body_encoding is not None:
+                with raw_path.open("wb") as handle:
+                    for chunk in _iter_body(attempt):
+                        handle.write(chunk)
+                body_sha256 = attempt.sha256 or sha256_file(raw_path)
+                # A gzip body is already the .raw.bin.gz file; no need to recompress.
+                wire_gzip = attempt.body_encoding == "gzip" and body_size >= self.gzip_min_bytes
+                if wire_gzip and attempt.body_path != gz_file:
+                    shutil.copyfile(attempt.body_path, gz_file)
+                if attempt.body_path.parent == self._pending_dir and attempt.body_path != gz_file:
+                    attempt.body_path.unlink(missing_ok=True)
+            elif attempt.body_path is not None:
+                if attempt.body_path != raw_path:
+                    shutil.copyfile(attempt.body_path, raw_path)
+                body_sha256 = sha256_file(raw_path)
+            else:
+                raw_path.write_bytes(attempt.body)
+                body_sha256 = hashlib.sha256(attempt.body).hexdigest()
+            self._bodies_written += 1
 
-        pretty_path: str | None = None
-        content_type = (attempt.response_headers or {}).get("content-type", "")
-        if len(attempt.body) <= self.pretty_max_bytes and "json" in content_type.lower():
-            try:
-                parsed = json.loads(attempt.body)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                parsed = None
-            if parsed is not None:
-                pretty_file = self.responses_dir / f"{stem}.json"
-                pretty_file.write_text(
-                    json.dumps(parsed, indent=2, sort_keys=True) + "\n",
-                    encoding="utf-8",
-                )
+            if body_size >= self.gzip_min_bytes:
+                if not wire_gzip:
+                    with raw_path.open("rb") as src, gzip.open(gz_file, "wb") as f:
+                        shutil.copyfileobj(src, f)
+                gz_path = str(gz_file.relative_to(self.run_dir))
+            elif attempt.body_path == gz_file:
+                attempt.body_path.unlink(missing_ok=True)
+
+            pretty_file = self.responses_dir / f"{stem}.json"
+            if body_size <= self.pretty_max_bytes and _write_pretty(
+                attempt.response_headers, raw_path.read_bytes, pretty_file
+            ):
                 pretty_path = str(pretty_file.relative_to(self.run_dir))
 
-        meta = {
-            "id": attempt_id,
-            "method": attempt.method,
-            "url": attempt.url,
-            "attempt_number": attempt.attempt_number,
-            "status_code": attempt.status_code,
-            "request_path": str(request_path.relative_to(self.run_dir)),
-            "raw_path": str(raw_path.relative_to(self.run_dir)),
-            "pretty_path": pretty_path,
-            "gzip_path": gz_path,
-            "byte_count": len(attempt.body),
-            "sha256": hashlib.sha256(attempt.body).hexdigest(),
-            "request_headers": self._redact_obj(attempt.request_headers or {}),
-            "response_headers": self._redact_obj(attempt.response_headers or {}),
-            "error_type": attempt.error_type,
-            "error_message": attempt.error_message,
-        }
+        meta = self._meta(attempt_id, attempt, body_size, body_sha256)
+        meta.update(
+            {
+                "request_path": str(request_path.relative_to(self.run_dir)),
+                "raw_path": str(raw_path.relative_to(self.run_dir)) if raw_path else None,
+                "pretty_path": pretty_path,
+                "gzip_path": gz_path,
+                "body_captured": raw_path is not None,
+            }
+        )
         meta_path = self.responses_dir / f"{stem}.meta.json"
         meta_path.write_text(json.dumps(meta, indent=2, sort_keys=True), encoding="utf-8")
         self._response_entries.append(
@@ -181,7 +456,100 @@ class RunCapture:
                 "url": attempt.url,
             }
         )
-        return attempt_id
+
+    def _pack_attempt(self, attempt_id: int, attempt: AttemptRecord, request: dict) -> None:
+        assert self._segments is not None
+        segments = self._segments
+        body_size = attempt.body_size
+        segments.append(attempt_id, KIND_REQUEST, json.dumps(request, sort_keys=True).encode())
+        body_captured = self.keeps_body(attempt)
+        if not body_captured:
+            body_sha256 = self._skipped_body_sha256(attempt)
+            self._bodies_skipped += 1
+        elif attempt.body_path is not None and attempt.body_encoding is not None:
+            body_sha256 = self._pack_encoded_body(attempt_id, attempt)
+            if attempt.body_path.parent == self._pending_dir:
+                attempt.body_path.unlink(missing_ok=True)
+            self._bodies_written += 1
+        elif attempt.body_path is not None:
+            _, body_sha256 = segments.append_file(attempt_id, KIND_BODY, attempt.body_path)
+            if attempt.body_path.parent == self._pending_dir:
+                attempt.body_path.unlink(missing_ok=True)
+            self._bodies_written += 1
+        else:
+            segments.append(attempt_id, KIND_BODY, attempt.body)
+            body_sha256 = hashlib.sha256(attempt.body).hexdigest()
+            self._bodies_written += 1
+
+        meta = self._meta(attempt_id, attempt, body_size, body_sha256)
+        meta.update(
+            {
+                "request_path": None,
+                "raw_path": None,
+                "pretty_path": None,
+                "gzip_path": None,
+                "body_captured": body_captured,
+            }
+        )
+        entry = segments.append(attempt_id, KIND_META, json.dumps(meta, sort_keys=True).encode())
+        self._response_entries.append(
+            {
+                "id": attempt_id,
+                "meta_path": None,
+                "raw_path": None,
+                "status_code": attempt.status_code,
+                "url": attempt.url,
+                "segment": segment_name(entry.segment),
+                "offset": entry.offset,
+            }
+        )
+
+    def _pack_encoded_body(self, attempt_id: int, attempt: AttemptRecord) -> str:
+        assert self._segments is not None and attempt.body_path is not None
+        with attempt.body_path.open("rb") as handle:
+            framed = attempt.body_encoding == "gzip" or is_zlib_header(handle.read(2))
+        if framed and attempt.sha256 is not None:
+            self._segments.append_compressed(
+                attempt_id, KIND_BODY, attempt.body_path, raw_length=attempt.body_size
+            )
+            return attempt.sha256
+        # Raw deflate has no framing a reader could detect; store it decoded.
+        inflated = attempt.body_path.with_name(f"{attempt.body_path.name}.inflated")
+        try:
+            with inflated.open("wb") as handle:
+                for chunk in _iter_body(attempt):
+                    handle.write(chunk)
+            _, body_sha256 = self._segments.append_file(attempt_id, KIND_BODY, inflated)
+        finally:
+            inflated.unlink(missing_ok=True)
+        return body_sha256
+
+    def _meta(
+        self, attempt_id: int, attempt: AttemptRecord, body_size: int, body_sha256: str
+    ) -> dict:
+        return {
+            "id": attempt_id,
+            "method": attempt.method,
+            "url": attempt.url,
+            "attempt_number": attempt.attempt_number,
+            "status_code": attempt.status_code,
+            "byte_count": body_size,
+            "sha256": body_sha256,
+            "elapsed_seconds": attempt.elapsed_seconds,
+            "request_headers": self._redact_obj(attempt.request_headers or {}),
+            "response_headers": self._redact_obj(attempt.response_headers or {}),
+            "error_type": attempt.error_type,
+            "error_message": attempt.error_message,
+            "content_encoding": attempt.body_encoding,
+        }
+
+    @staticmethod
+    def _skipped_body_sha256(attempt: AttemptRecord) -> str:
+        if attempt.sha256 is not None:
+            return attempt.sha256
+        if attempt.body_path is not None:
+            return sha256_file(attempt.body_path)
+        return hashlib.sha256(attempt.body).hexdigest()
 
     def write_error(self, message: str) -> None:
         self.error_path.write_text(message, encoding="utf-8")
@@ -192,7 +560,10 @@ class RunCapture:
         status: str,
         counts: dict[str, int],
         exception: str | None = None,
+        retries: dict | None = None,
+        failed_batches: list[dict] | None = None,
     ) -> None:
+        self.close()
         self.ended_at = datetime.now(UTC)
         payload = {
             "provider": self.provider,
@@ -206,11 +577,34 @@ class RunCapture:
                 "attempts": self._attempt_counter,
                 "responses": counts.get("responses", 0),
                 "artifacts": counts.get("artifacts", 0),
+                "artifacts_skipped": counts.get("artifacts_skipped", 0),
                 "parse_errors": len(self._parse_errors),
+                # Only for `queue work` runs: plan items completed and failed.
+                **{
+                    key: counts[key]
+                    for key in ("queue_items", "queue_items_failed")
+                    if key in counts
+                },
             },
+            **({"failed_batches": failed_batches} if failed_batches is not None else {}),
             "responses": self._response_entries,
             "artifacts": self._artifact_entries,
             "parse_errors": self._parse_errors,
+            "retries": retries or {},
+            "metrics": self.metrics.snapshot() if self.metrics.enabled else None,
+            "capture": {
+                "mode": self.mode,
+                "format": self.format,
+                "sample_rate": self.sample_rate if self.mode == "sampled" else None,
+                "bodies_written": self._bodies_written,
+                "bodies_skipped": self._bodies_skipped,
+                "background": self.queue_max_bytes > 0,
+                "queue_max_bytes": self.queue_max_bytes,
+                "write_seconds": round(self._write_seconds, 3),
+                "backpressure_wait_seconds": round(self._backpressure_seconds, 3),
+                "drain_seconds": round(self._drain_seconds, 3),
+                "errors": self._capture_errors,
+            },
         }
         self.run_json_path.write_text(
             json.dumps(payload, indent=2, sort_keys=True),
@@ -242,3 +636,83 @@ class RunCapture:
         if isinstance(value, list):
             return [cls._redact_obj(item) for item in value]
         return value
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _write_pretty(
+    response_headers: dict[str, str] | None,
+    read_body: Callable[[], bytes],
+    target: Path,
+) -> bool:
+    content_type = (response_headers or {}).get("content-type", "")
+    if "json" not in content_type.lower():
+        return False
+    try:
+        parsed = json.loads(read_body())
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return False
+    target.write_text(json.dumps(parsed, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return True
+
+
+def attempt_stem(attempt_id: int, method: str) -> str:
+    # Zero-padded so file listings sort by attempt id well past 9,999 attempts.
+    return f"{attempt_id:06d}_{method.lower()}"
+
+
+def _iter_body(attempt: AttemptRecord) -> Iterator[bytes]:
+    assert attempt.body_path is not None and attempt.body_encoding is not None
+    return iter_decoded(
+        iter_file_chunks(attempt.body_path, DECODE_CHUNK_BYTES), attempt.body_encoding
+    )
+
+
+def extract_packed(
+    run_dir: Path,
+    out_dir: Path,
+    *,
+    attempt_ids: list[int] | None = None,
+    pretty_max_bytes: int = 2_000_000,
+) -> list[Path]:
+    """Rebuild ``requests/`` and ``responses/`` files from a packed capture."""
+    reader = SegmentReader(run_dir / "capture")
+    requests_dir = out_dir / "requests"
+    responses_dir = out_dir / "responses"
+    requests_dir.mkdir(parents=True, exist_ok=True)
+    responses_dir.mkdir(parents=True, exist_ok=True)
+    written: list[Path] = []
+    for attempt_id in attempt_ids or reader.attempt_ids():
+        records = reader.records_for(attempt_id)
+        if KIND_META not in records:
+            raise KeyError(f"attempt {attempt_id} not found in {run_dir}")
+        meta = json.loads(reader.read(records[KIND_META]))
+        stem = attempt_stem(attempt_id, meta["method"])
+
+        request_path = requests_dir / f"{stem}.json"
+        request = json.loads(reader.read(records[KIND_REQUEST]))
+        request_path.write_text(json.dumps(request, indent=2, sort_keys=True), encoding="utf-8")
+        meta["request_path"] = str(request_path.relative_to(out_dir))
+
+        if KIND_BODY in records:
+            raw_path = responses_dir / f"{stem}.raw.bin"
+            with raw_path.open("wb") as handle:
+                for chunk in reader.iter_chunks(records[KIND_BODY]):
+                    handle.write(chunk)
+            meta["raw_path"] = str(raw_path.relative_to(out_dir))
+            pretty_file = responses_dir / f"{stem}.json"
+            if meta["byte_count"] <= pretty_max_bytes and _write_pretty(
+                meta["response_headers"], raw_path.read_bytes, pretty_file
+            ):
+                meta["pretty_path"] = str(pretty_file.relative_to(out_dir))
+            written.append(raw_path)
+
+        meta_path = responses_dir / f"{stem}.meta.json"
+        meta_path.write_text(json.dumps(meta, indent=2, sort_keys=True), encoding="utf-8")
+        written.extend([request_path, meta_path])
+    return written
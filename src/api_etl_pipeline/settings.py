@@ -1,8 +1,12 @@
+from datetime import date
 from pathlib import Path
+from typing import Any, Literal
 
 from pydantic import Field, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from api_etl_pipeline.planning import parse_shard
+
 
 class AppSettings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -18,14 +22,108 @@ class AppSettings(BaseSettings):
         default=5_000_000,
         alias="APP_CAPTURE_GZIP_MIN_BYTES",
     )
+    app_capture_mode: Literal["full", "metadata-only", "errors-only", "sampled"] = Field(
+        default="full",
+        alias="APP_CAPTURE_MODE",
+    )
+    app_capture_sample_rate: float = Field(
+        default=0.1,
+        ge=0.0,
+        le=1.0,
+        alias="APP_CAPTURE_SAMPLE_RATE",
+    )
+    app_capture_format: Literal["files", "packed"] = Field(
+        default="files",
+        alias="APP_CAPTURE_FORMAT",
+    )
+    app_capture_segment_max_bytes: int = Field(
+        default=1024 * 1024 * 1024,
+        alias="APP_CAPTURE_SEGMENT_MAX_BYTES",
+    )
+    app_capture_queue_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        alias="APP_CAPTURE_QUEUE_MAX_BYTES",
+    )
     sec_user_agent: str | None = Field(default=None, alias="SEC_USER_AGENT")
     nrc_subscription_key: str | None = Field(default=None, alias="NRC_SUBSCRIPTION_KEY")
     nrc_aps_subscription_key: str | None = Field(default=None, alias="NRC_APS_SUBSCRIPTION_KEY")
+    app_db_write_batch_size: int = Field(default=500, alias="APP_DB_WRITE_BATCH_SIZE")
+    app_db_flush_interval_seconds: float = Field(
+        default=0.25,
+        alias="APP_DB_FLUSH_INTERVAL_SECONDS",
+    )
+    app_db_write_queue_max: int = Field(default=10_000, alias="APP_DB_WRITE_QUEUE_MAX")
+    app_db_inline_body_max_bytes: int = Field(
+        default=4096,
+        alias="APP_DB_INLINE_BODY_MAX_BYTES",
+    )
+    app_artifact_dedupe: bool = Field(default=True, alias="APP_ARTIFACT_DEDUPE")
+    app_retry_budget: int = Field(default=50, alias="APP_RETRY_BUDGET")
+    app_metrics_enabled: bool = Field(default=True, alias="APP_METRICS_ENABLED")
+    app_metrics_prom_file: Path | None = Field(default=None, alias="APP_METRICS_PROM_FILE")
+    app_parse_workers: int = Field(default=0, ge=0, alias="APP_PARSE_WORKERS")
+    app_parse_inline_max_bytes: int = Field(
+        default=256 * 1024,
+        ge=0,
+        alias="APP_PARSE_INLINE_MAX_BYTES",
+    )
+    app_queue_lease_seconds: float = Field(default=300.0, gt=0, alias="APP_QUEUE_LEASE_SECONDS")
+    app_queue_max_attempts: int = Field(default=3, ge=1, alias="APP_QUEUE_MAX_ATTEMPTS")
+    app_http_profiles: dict[str, dict[str, dict[str, Any]]] = Field(
+        default_factory=dict,
+        alias="APP_HTTP_PROFILES",
+    )
+    app_rate_limit_db: Path | None = Field(default=None, alias="APP_RATE_LIMIT_DB")
+    sec_max_rps: float = Field(default=2.0, alias="SEC_MAX_RPS")
+    nrc_max_rps: float = Field(default=2.0, alias="NRC_MAX_RPS")
+    sec_bulk_parse_workers: int | None = Field(default=None, alias="SEC_BULK_PARSE_WORKERS")
+    sec_bulk_max_bytes: int = Field(
+        default=8 * 1024 * 1024 * 1024,
+        alias="SEC_BULK_MAX_BYTES",
+    )
+    sec_forms: str | None = Field(default=None, alias="SEC_FORMS")
+    sec_filed_from: date | None = Field(default=None, alias="SEC_FILED_FROM")
+    sec_filed_to: date | None = Field(default=None, alias="SEC_FILED_TO")
+    sec_max_filings_per_cik: int = Field(default=1, ge=0, alias="SEC_MAX_FILINGS_PER_CIK")
+    sec_watermark_overlap_hours: float = Field(
+        default=48.0,
+        ge=0.0,
+        alias="SEC_WATERMARK_OVERLAP_HOURS",
+    )
+    sec_cik_file: Path | None = Field(default=None, alias="SEC_CIK_FILE")
+    sec_cik_db: Path | None = Field(default=None, alias="SEC_CIK_DB")
+    sec_plan_order: Literal["source", "stalest"] = Field(default="source", alias="SEC_PLAN_ORDER")
+    sec_plan_shard: str | None = Field(default=None, alias="SEC_PLAN_SHARD")
+    sec_concurrency: int = Field(default=1, alias="SEC_CONCURRENCY")
+    nrc_concurrency: int = Field(default=4, alias="NRC_CONCURRENCY")
+    nrc_aps_take: int | None = Field(default=None, gt=0, alias="NRC_APS_TAKE")
+    nrc_watermark_overlap_hours: float = Field(
+        default=72.0,
+        ge=0.0,
+        alias="NRC_WATERMARK_OVERLAP_HOURS",
+    )
 
     @property
     def resolved_nrc_subscription_key(self) -> str | None:
         return self.nrc_subscription_key or self.nrc_aps_subscription_key
 
+    @property
+    def resolved_sec_forms(self) -> list[str] | None:
+        if not self.sec_forms:
+            return None
+        return [form.strip() for form in self.sec_forms.split(",") if form.strip()]
+
+    @property
+    def resolved_sec_plan_shard(self) -> tuple[int, int] | None:
+        return parse_shard(self.sec_plan_shard) if self.sec_plan_shard else None
+
+    def concurrency_for(self, provider: str) -> int:
+        if provider == "sec_edgar":
+            return self.sec_concurrency
+        if provider == "nrc_adams_aps":
+            return self.nrc_concurrency
+        return 1
+
     @property
     def resolved_run_dir(self) -> Path:
         if self.app_run_dir is not None:
@@ -38,4 +136,6 @@ class AppSettings(BaseSettings):
         self.app_blob_dir = self.app_blob_dir.expanduser()
         if self.app_run_dir is not None:
             self.app_run_dir = self.app_run_dir.expanduser()
+        if self.sec_plan_shard:
+            parse_shard(self.sec_plan_shard)
         return self
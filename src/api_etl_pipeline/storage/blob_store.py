@@ -1,14 +1,128 @@
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Iterator
 from pathlib import Path
 
+from api_etl_pipeline.downloads import (
+    DECODE_CHUNK_BYTES,
+    ENCODING_SUFFIXES,
+    iter_decoded,
+    iter_file_chunks,
+    read_decoded,
+)
+from api_etl_pipeline.metrics import DISABLED_METRICS, Metrics
+
 
 class BlobStore:
-    def __init__(self, root: Path) -> None:
+    def __init__(self, root: Path, *, metrics: Metrics = DISABLED_METRICS) -> None:
         self.root = root
+        self.metrics = metrics
         self.root.mkdir(parents=True, exist_ok=True)
+        self.spool_dir = self.root / ".spool"
+
+    def path_for(self, sha256: str, encoding: str | None = None) -> Path:
+        # Blobs kept in their wire encoding are still named by the decoded sha256.
+        suffix = ENCODING_SUFFIXES[encoding] if encoding else ""
+        return self.root / sha256[:2] / f"{sha256}{suffix}"
+
+    def find(self, sha256: str) -> Path | None:
+        """Stored path for ``sha256`` in any encoding, or None."""
+        for encoding in (None, *ENCODING_SUFFIXES):
+            path = self.path_for(sha256, encoding)
+            if path.exists():
+                return path
+        return None
+
+    @staticmethod
+    def encoding_of(path: Path) -> str | None:
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if path.name.endswith(suffix):
+                return encoding
+        return None
+
+    def read_bytes(self, sha256: str) -> bytes:
+        """Decoded content of a stored blob."""
+        path = self.find(sha256)
+        if path is None:
+            raise FileNotFoundError(f"blob {sha256} not found under {self.root}")
+        return read_decoded(path, self.encoding_of(path))
+
+    def iter_bytes(self, sha256: str) -> Iterator[bytes]:
+        """Decoded content of a stored blob, in chunks."""
+        path = self.find(sha256)
+        if path is None:
+            raise FileNotFoundError(f"blob {sha256} not found under {self.root}")
+        chunks = iter_file_chunks(path, DECODE_CHUNK_BYTES)
+        encoding = self.encoding_of(path)
+        return iter_decoded(chunks, encoding) if encoding else iter(chunks)
 
     def put(self, sha256: str, content: bytes) -> Path:
-        target = self.root / sha256[:2] / sha256
+        existing = self.find(sha256)
+        if existing is not None:
+            self._record(None, 0)
+            return existing
+        target = self.path_for(sha256)
+        started = time.perf_counter()
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        fd, name = tempfile.mkstemp(dir=self.spool_dir, suffix=".part")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(content)
+        target = self._place(target, Path(name), keep_source=False)
+        self._record(started, len(content))
+        return target
+
+    def put_file(
+        self,
+        sha256: str,
+        source: Path,
+        *,
+        keep_source: bool = False,
+        encoding: str | None = None,
+    ) -> Path:
+        """Move an already-hashed file into place; ``source`` is consumed unless kept.
+
+        ``encoding`` marks ``source`` as still gzip/deflate encoded, with
+        ``sha256`` taken over its decoded content. A blob already stored in
+        any encoding is reused; use ``encoding_of`` on the returned path.
+        """
+        existing = self.find(sha256)
+        if existing is not None:
+            if not keep_source and source != existing:
+                source.unlink(missing_ok=True)
+            self._record(None, 0)
+            return existing
+        target = self.path_for(sha256, encoding)
+        started = time.perf_counter()
+        size = source.stat().st_size if self.metrics.enabled else 0
+        target = self._place(target, source, keep_source=keep_source)
+        self._record(started, size)
+        return target
+
+    def _record(self, started: float | None, size: int) -> None:
+        # ``started`` is None for a blob that was already stored.
+        if started is None:
+            self.metrics.add("blob_puts_total", 1, {"result": "deduplicated"})
+            return
+        self.metrics.observe("blob_write_seconds", time.perf_counter() - started)
+        self.metrics.add("blob_puts_total", 1, {"result": "stored"})
+        self.metrics.add("blob_bytes_total", size)
+
+    @staticmethod
+    def _place(target: Path, source: Path, *, keep_source: bool) -> Path:
         target.parent.mkdir(parents=True, exist_ok=True)
-        if not target.exists():
-            target.write_bytes(content)
+        if keep_source:
+            staging = target.with_name(f"{target.name}.part")
+            shutil.copyfile(source, staging)
+            os.replace(staging, target)
+            return target
+        try:
+            os.replace(source, target)
+        except OSError:
+            # Spool on another filesystem: copy next to the target, then rename.
+            staging = target.with_name(f"{target.name}.part")
+            shutil.copyfile(source, staging)
+            os.replace(staging, target)
+            source.unlink(missing_ok=True)
         return target
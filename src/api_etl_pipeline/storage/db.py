@@ -1,10 +1,28 @@
+import hashlib
+import os
+import queue
 import sqlite3
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from api_etl_pipeline.downloads import read_decoded, sha256_bytes, sha256_file
 from api_etl_pipeline.http_client import CapturedResponse
+from api_etl_pipeline.metrics import DISABLED_METRICS, Metrics
+from api_etl_pipeline.storage.blob_store import BlobStore
 
-SCHEMA_SQL = """
-CREATE TABLE IF NOT EXISTS responses (
+BLOB_READ_CHUNK_BYTES = 1024 * 1024
+INLINE_BODY_MAX_BYTES = 4096
+# 1: response bodies are content-addressed (``body_sha256``) instead of a BLOB column.
+# 2: ``artifacts.content_encoding`` for blobs kept as received (gzip/deflate).
+SCHEMA_VERSION = 2
+
+RESPONSES_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {name} (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     provider TEXT NOT NULL,
     method TEXT NOT NULL,
@@ -12,10 +30,16 @@ CREATE TABLE IF NOT EXISTS responses (
     params_json TEXT,
     status_code INTEGER NOT NULL,
     headers_json TEXT NOT NULL,
-    body BLOB NOT NULL,
+    body_sha256 TEXT NOT NULL,
+    body_bytes INTEGER NOT NULL,
+    body_inline BLOB,
     created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
+"""
 
+SCHEMA_SQL = (
+    RESPONSES_TABLE_SQL.format(name="responses")
+    + """
 CREATE TABLE IF NOT EXISTS artifacts (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     provider TEXT NOT NULL,
@@ -24,42 +48,445 @@ CREATE TABLE IF NOT EXISTS artifacts (
     bytes INTEGER NOT NULL,
     blob_path TEXT NOT NULL,
     response_id INTEGER,
+    content_encoding TEXT,
     created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
     UNIQUE(source_url, sha256),
     FOREIGN KEY(response_id) REFERENCES responses(id)
 );
+
+CREATE TABLE IF NOT EXISTS http_validators (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS bulk_snapshots (
+    url TEXT NOT NULL,
+    fetch_date_utc TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    members INTEGER NOT NULL,
+    reissues INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY(url, fetch_date_utc)
+);
+
+CREATE TABLE IF NOT EXISTS sec_submission_members (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_url TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    snapshot_sha256 TEXT NOT NULL,
+    cik TEXT,
+    entity_name TEXT,
+    filing_count INTEGER NOT NULL,
+    latest_accession TEXT,
+    latest_filing_date TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(source_url, sha256)
+);
+
+CREATE TABLE IF NOT EXISTS sync_watermarks (
+    provider TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    watermark INTEGER NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY(provider, scope)
+);
+
+CREATE TABLE IF NOT EXISTS sync_seen_items (
+    provider TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    watermark INTEGER NOT NULL,
+    PRIMARY KEY(provider, scope, item_key)
+);
 """
+)
+
+
+@dataclass
+class _WriteOp:
+    apply: Callable[[dict[Future, object]], object]
+    future: Future = field(default_factory=Future)
+    urgent: bool = False
+
+
+_STOP = object()
 
 
 class SqliteStorage:
-    def __init__(self, db_path: Path) -> None:
+    """SQLite sink for responses and artifacts.
+
+    Response bodies are content-addressed: rows keep ``body_sha256`` and the
+    bytes live once in ``body_store`` (the blob store artifacts already use);
+    bodies up to ``inline_max_bytes`` are kept inline in ``body_inline``.
+
+    With ``batch_size > 1`` writes are queued and committed by a background
+    writer thread in transactions of up to ``batch_size`` rows or every
+    ``flush_interval`` seconds; ``submit_*`` return futures for the row ids.
+    At most ``write_queue_max`` writes wait for the writer (``0``: no bound);
+    beyond that ``submit_*`` blocks, so producers slow to the commit rate.
+    The database runs in WAL mode with ``synchronous=NORMAL``, so commits do
+    not fsync; ``checkpoint()`` and ``close()`` make everything durable.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        batch_size: int = 1,
+        flush_interval: float = 0.25,
+        write_queue_max: int = 10_000,
+        body_store: BlobStore | None = None,
+        inline_max_bytes: int = INLINE_BODY_MAX_BYTES,
+        metrics: Metrics = DISABLED_METRICS,
+    ) -> None:
         db_path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(db_path)
+        self.metrics = metrics
+        self.body_store = body_store or BlobStore(db_path.parent / "bodies")
+        self.inline_max_bytes = inline_max_bytes
+        # Shared with HttpClient worker threads (validator lookups) and the
+        # writer thread; every statement goes through ``_lock``.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("PRAGMA synchronous = NORMAL;")
         self.conn.execute("PRAGMA foreign_keys = ON;")
         self.conn.executescript(SCHEMA_SQL)
+        self._migrate()
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_body_sha256 ON responses(body_sha256);"
+        )
+
+        self.batch_size = max(batch_size, 1)
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max(write_queue_max, 0))
+        self._writer: threading.Thread | None = None
+        if self.batch_size > 1:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="sqlite-writer", daemon=True
+            )
+            self._writer.start()
 
     def close(self) -> None:
-        self.conn.close()
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+            self.conn.close()
+
+    def flush(self) -> None:
+        """Block until every queued write has been committed."""
+        self._submit(lambda pending: None, urgent=True).result()
+
+    def checkpoint(self) -> None:
+        """Flush queued writes and fold the WAL into the database file durably."""
+        self.flush()
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(FULL);")
+
+    def get_validators(self, url: str) -> tuple[str | None, str | None] | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM http_validators WHERE url = ?",
+                (url,),
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put_validators(self, url: str, etag: str | None, last_modified: str | None) -> None:
+        self.submit_validators(url, etag, last_modified).result()
+
+    def submit_validators(
+        self, url: str, etag: str | None, last_modified: str | None
+    ) -> Future[None]:
+        def apply(pending: dict[Future, object]) -> None:
+            self.conn.execute(
+                """
+                INSERT INTO http_validators(url, etag, last_modified) VALUES (?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (url, etag, last_modified),
+            )
+
+        return self._submit(apply)
+
+    def get_bulk_snapshot(self, url: str, fetch_date_utc: str) -> str | None:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT sha256 FROM bulk_snapshots WHERE url = ? AND fetch_date_utc = ?",
+                (url, fetch_date_utc),
+            ).fetchone()
+        return row[0] if row else None
+
+    def bulk_snapshot_ingested(self, url: str, sha256: str) -> bool:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM bulk_snapshots WHERE url = ? AND sha256 = ? LIMIT 1",
+                (url, sha256),
+            ).fetchone()
+        return row is not None
+
+    def put_bulk_snapshot(
+        self, *, url: str, fetch_date_utc: str, sha256: str, byte_count: int, members: int
+    ) -> None:
+        def apply(pending: dict[Future, object]) -> None:
+            self.conn.execute(
+                """
+                INSERT INTO bulk_snapshots(url, fetch_date_utc, sha256, bytes, members)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url, fetch_date_utc) DO UPDATE SET
+                    reissues = reissues + (sha256 != excluded.sha256),
+                    sha256 = excluded.sha256,
+                    bytes = excluded.bytes,
+                    members = excluded.members,
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (url, fetch_date_utc, sha256, byte_count, members),
+            )
+
+        self._submit(apply, urgent=True).result()
+
+    def get_watermark(self, provider: str, scope: str) -> tuple[int | None, set[str]]:
+        """The stored watermark for ``scope`` and the item keys seen inside its overlap."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT watermark FROM sync_watermarks WHERE provider = ? AND scope = ?",
+                (provider, scope),
+            ).fetchone()
+            seen = self.conn.execute(
+                "SELECT item_key FROM sync_seen_items WHERE provider = ? AND scope = ?",
+                (provider, scope),
+            ).fetchall()
+        return (row[0] if row else None), {key for (key,) in seen}
+
+    def last_synced(self, provider: str, scope: str) -> str | None:
+        """When ``scope``'s watermark was last written (``None``: never synced)."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT updated_at FROM sync_watermarks WHERE provider = ? AND scope = ?",
+                (provider, scope),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put_watermark(
+        self,
+        provider: str,
+        scope: str,
+        *,
+        watermark: int | None,
+        seen: dict[str, int],
+        retain_seconds: int,
+    ) -> None:
+        """Advance ``scope`` to ``watermark`` (never backwards) and record ``seen`` keys.
+
+        Seen keys older than ``watermark - retain_seconds`` can no longer fall
+        inside the overlap window and are pruned.
+        """
+
+        def apply(pending: dict[Future, object]) -> None:
+            if watermark is not None:
+                self.conn.execute(
+                    """
+                    INSERT INTO sync_watermarks(provider, scope, watermark) VALUES (?, ?, ?)
+                    ON CONFLICT(provider, scope) DO UPDATE SET
+                        watermark = max(watermark, excluded.watermark),
+                        updated_at = CURRENT_TIMESTAMP
+                    """,
+                    (provider, scope, watermark),
+                )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sync_seen_items(provider, scope, item_key, watermark)"
+                " VALUES (?, ?, ?, ?)",
+                [(provider, scope, key, value) for key, value in seen.items()],
+            )
+            self.conn.execute(
+                """
+                DELETE FROM sync_seen_items
+                WHERE provider = ? AND scope = ? AND watermark < (
+                    SELECT watermark - ? FROM sync_watermarks WHERE provider = ? AND scope = ?
+                )
+                """,
+                (provider, scope, retain_seconds, provider, scope),
+            )
+
+        self._submit(apply, urgent=True).result()
+
+    def submit_submission_members(self, rows: list[dict]) -> Future[int]:
+        """Queue parsed bulk members; duplicates by ``(source_url, sha256)`` are skipped."""
+
+        def apply(pending: dict[Future, object]) -> int:
+            cursor = self.conn.executemany(
+                """
+                INSERT OR IGNORE INTO sec_submission_members(
+                    source_url, sha256, snapshot_sha256, cik, entity_name,
+                    filing_count, latest_accession, latest_filing_date
+                ) VALUES (
+                    :source_url, :sha256, :snapshot_sha256, :cik, :entity_name,
+                    :filing_count, :latest_accession, :latest_filing_date
+                )
+                """,
+                rows,
+            )
+            return cursor.rowcount
+
+        return self._submit(apply)
 
     def insert_response(self, provider: str, captured: CapturedResponse) -> int:
-        cursor = self.conn.execute(
-            """
-            INSERT INTO responses(
-                provider, method, url, params_json, status_code, headers_json, body
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                provider,
-                captured.method,
-                captured.url,
-                captured.params_json,
-                captured.status_code,
-                captured.headers_json,
-                captured.body,
-            ),
+        return self.submit_response(provider, captured, urgent=True).result()
+
+    def submit_response(
+        self, provider: str, captured: CapturedResponse, *, urgent: bool = False
+    ) -> Future[int]:
+        # Hash and store the body on the caller's thread; the writer only inserts the row.
+        digest, inline = self._store_body(captured)
+
+        def apply(pending: dict[Future, object]) -> int:
+            cursor = self.conn.execute(
+                """
+                INSERT INTO responses(
+                    provider, method, url, params_json, status_code, headers_json,
+                    body_sha256, body_bytes, body_inline
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    provider,
+                    captured.method,
+                    captured.url,
+                    captured.params_json,
+                    captured.status_code,
+                    captured.headers_json,
+                    digest,
+                    captured.size,
+                    inline,
+                ),
+            )
+            return int(cursor.lastrowid)
+
+        return self._submit(apply, urgent=urgent)
+
+    def read_body(self, response_id: int) -> bytes:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT body_sha256, body_inline FROM responses WHERE id = ?",
+                (response_id,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(response_id)
+        digest, inline = row
+        if inline is not None:
+            return bytes(inline)
+        return self.body_store.read_bytes(digest)
+
+    def _store_body(self, captured: CapturedResponse) -> tuple[str, bytes | None]:
+        if captured.body_path is None:
+            digest = captured.sha256 or sha256_bytes(captured.body)
+            if captured.size <= self.inline_max_bytes:
+                return digest, captured.body
+            self.body_store.put(digest, captured.body)
+            return digest, None
+        digest = captured.sha256 or sha256_file(captured.body_path)
+        if captured.size <= self.inline_max_bytes:
+            return digest, read_decoded(captured.body_path, captured.body_encoding)
+        self.body_store.put_file(
+            digest, captured.body_path, keep_source=True, encoding=captured.body_encoding
         )
-        self.conn.commit()
-        return int(cursor.lastrowid)
+        return digest, None
+
+    def _migrate(self) -> None:
+        version = self.conn.execute("PRAGMA user_version;").fetchone()[0]
+        if version >= SCHEMA_VERSION:
+            return
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(responses);")}
+        if "body" in columns:
+            self._migrate_inline_bodies()
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(artifacts);")}
+        if "content_encoding" not in columns:
+            self.conn.execute("ALTER TABLE artifacts ADD COLUMN content_encoding TEXT;")
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION};")
+
+    def _migrate_inline_bodies(self) -> None:
+        """Move pre-v1 ``responses.body`` BLOBs into the body store, keeping row ids."""
+        # Rebuilding a table referenced by ``artifacts`` needs foreign keys off
+        # (https://sqlite.org/lang_altertable.html#otheralter).
+        self.conn.execute("PRAGMA foreign_keys = OFF;")
+        try:
+            self.conn.execute("BEGIN;")
+            self.conn.execute(RESPONSES_TABLE_SQL.format(name="responses_v1"))
+            rows = self.conn.execute("SELECT id, length(body) FROM responses;").fetchall()
+            for response_id, size in rows:
+                digest, inline = self._migrate_body(response_id, size)
+                self.conn.execute(
+                    """
+                    INSERT INTO responses_v1(
+                        id, provider, method, url, params_json, status_code, headers_json,
+                        body_sha256, body_bytes, body_inline, created_at
+                    )
+                    SELECT id, provider, method, url, params_json, status_code, headers_json,
+                        ?, ?, ?, created_at
+                    FROM responses WHERE id = ?
+                    """,
+                    (digest, size, inline, response_id),
+                )
+            self.conn.execute("DROP TABLE responses;")
+            self.conn.execute("ALTER TABLE responses_v1 RENAME TO responses;")
+            if self.conn.execute("PRAGMA foreign_key_check;").fetchone() is not None:
+                raise sqlite3.IntegrityError("foreign key check failed after body migration")
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        finally:
+            self.conn.execute("PRAGMA foreign_keys = ON;")
+        # Reclaim the pages the inline bodies used.
+        self.conn.execute("VACUUM;")
+
+    def _migrate_body(self, response_id: int, size: int) -> tuple[str, bytes | None]:
+        with self.conn.blobopen("responses", "body", response_id, readonly=True) as blob:
+            if size <= self.inline_max_bytes:
+                body = blob.read()
+                return sha256_bytes(body), body
+            self.body_store.spool_dir.mkdir(parents=True, exist_ok=True)
+            fd, name = tempfile.mkstemp(dir=self.body_store.spool_dir, suffix=".part")
+            digest = hashlib.sha256()
+            with os.fdopen(fd, "wb") as handle:
+                while chunk := blob.read(BLOB_READ_CHUNK_BYTES):
+                    digest.update(chunk)
+                    handle.write(chunk)
+        self.body_store.put_file(digest.hexdigest(), Path(name))
+        return digest.hexdigest(), None
+
+    def artifact_count(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT count(*) FROM artifacts").fetchone()[0]
+
+    def iter_artifact_urls(self, chunk_rows: int = 10_000) -> Iterator[str]:
+        """Every stored ``source_url``, read in id-ordered chunks without holding the lock."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    "SELECT id, source_url FROM artifacts WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, chunk_rows),
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, url in rows:
+                yield url
+
+    def artifact_url_exists(self, source_url: str) -> bool:
+        # Served by the UNIQUE(source_url, sha256) index.
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM artifacts WHERE source_url = ? LIMIT 1", (source_url,)
+            ).fetchone()
+        return row is not None
 
     def insert_artifact(
         self,
@@ -70,14 +497,114 @@ class SqliteStorage:
         byte_count: int,
         blob_path: str,
         response_id: int | None,
+        content_encoding: str | None = None,
     ) -> int | None:
-        cursor = self.conn.execute(
-            """
-            INSERT OR IGNORE INTO artifacts(
-                provider, source_url, sha256, bytes, blob_path, response_id
-            ) VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            (provider, source_url, sha256, byte_count, blob_path, response_id),
-        )
-        self.conn.commit()
-        return int(cursor.lastrowid) if cursor.lastrowid else None
+        return self.submit_artifact(
+            provider=provider,
+            source_url=source_url,
+            sha256=sha256,
+            byte_count=byte_count,
+            blob_path=blob_path,
+            response_id=response_id,
+            content_encoding=content_encoding,
+            urgent=True,
+        ).result()
+
+    def submit_artifact(
+        self,
+        *,
+        provider: str,
+        source_url: str,
+        sha256: str,
+        byte_count: int,
+        blob_path: str,
+        response_id: int | Future[int] | None,
+        content_encoding: str | None = None,
+        urgent: bool = False,
+    ) -> Future[int | None]:
+        def apply(pending: dict[Future, object]) -> int | None:
+            resolved = _resolve(response_id, pending)
+            cursor = self.conn.execute(
+                """
+                INSERT OR IGNORE INTO artifacts(
+                    provider, source_url, sha256, bytes, blob_path, response_id,
+                    content_encoding
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    provider,
+                    source_url,
+                    sha256,
+                    byte_count,
+                    blob_path,
+                    resolved,
+                    content_encoding,
+                ),
+            )
+            return int(cursor.lastrowid) if cursor.rowcount == 1 else None
+
+        return self._submit(apply, urgent=urgent)
+
+    def _submit(
+        self, apply: Callable[[dict[Future, object]], object], *, urgent: bool = False
+    ) -> Future:
+        op = _WriteOp(apply=apply, urgent=urgent)
+        if self._writer is None:
+            self._apply_batch([op])
+        else:
+            self._queue.put(op)
+        return op.future
+
+    def _writer_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch: list[_WriteOp] = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and not batch[-1].urgent:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    op = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if op is _STOP:
+                    stopping = True
+                    break
+                batch.append(op)
+            self._apply_batch(batch)
+
+    def _apply_batch(self, batch: list[_WriteOp]) -> None:
+        # Futures resolve only after COMMIT; later ops in the same batch read
+        # earlier results (e.g. an artifact's response_id) from ``pending``.
+        pending: dict[Future, object] = {}
+        try:
+            with self._lock:
+                started = time.perf_counter()
+                with self.conn:
+                    for op in batch:
+                        pending[op.future] = op.apply(pending)
+                self.metrics.observe("sqlite_commit_seconds", time.perf_counter() - started)
+                self.metrics.add("sqlite_rows_total", len(batch))
+        except Exception as exc:
+            if len(batch) == 1:
+                batch[0].future.set_exception(exc)
+                return
+            # Replay one row per transaction so a bad row only fails itself
+            # (and whatever depends on its id).
+            for op in batch:
+                self._apply_batch([op])
+            return
+        for op in batch:
+            op.future.set_result(pending[op.future])
+
+
+def _resolve(value: int | Future[int] | None, pending: dict[Future, object]) -> int | None:
+    if isinstance(value, Future):
+        if value in pending:
+            return int(pending[value])  # type: ignore[arg-type]
+        return value.result()
+    return value
@@ -0,0 +1,161 @@
+import importlib.util
+import threading
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass, fields, replace
+from typing import Any, Literal
+
+import httpx
+
+from api_etl_pipeline.metrics import DISABLED_METRICS, Metrics
+
+Pool = Literal["api", "bulk"]
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass(frozen=True)
+class PoolProfile:
+    max_connections: int = 4
+    max_keepalive_connections: int = 2
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+
+# Keyed by host suffix ("" matches every host), then pool. JSON metadata goes
+# through "api"; streamed artifacts (PDFs, filing documents, submissions.zip)
+# through "bulk", so long downloads never hold the connections metadata needs.
+# Bulk pools leave room for APP_RANGE_PARTS parallel ranges of two downloads
+# and stay on HTTP/1.1: one multiplexed connection would share a single TCP
+# window between all parts.
+DEFAULT_PROFILES: dict[str, dict[str, PoolProfile]] = {
+    "": {
+        "api": PoolProfile(),
+        "bulk": PoolProfile(max_connections=8, max_keepalive_connections=4, keepalive_expiry=15.0),
+    },
+    "sec.gov": {
+        "api": PoolProfile(keepalive_expiry=60.0, http2=True),
+        "bulk": PoolProfile(max_connections=8, max_keepalive_connections=4, keepalive_expiry=30.0),
+    },
+    "nrc.gov": {
+        "api": PoolProfile(keepalive_expiry=60.0, http2=True),
+        "bulk": PoolProfile(max_connections=8, max_keepalive_connections=4, keepalive_expiry=30.0),
+    },
+}
+
+
+class TransportProfiles:
+    """Per-host, per-pool connection settings (``APP_HTTP_PROFILES`` overrides).
+
+    ``overrides`` has the shape of ``DEFAULT_PROFILES`` with partial field
+    dicts, e.g. ``{"data.sec.gov": {"api": {"max_connections": 8}}}``. The
+    longest matching host suffix wins; its fields apply over the defaults.
+    """
+
+    def __init__(self, overrides: dict[str, dict[str, dict[str, Any]]] | None = None) -> None:
+        known = {item.name for item in fields(PoolProfile)}
+        self.profiles = {suffix: dict(pools) for suffix, pools in DEFAULT_PROFILES.items()}
+        for suffix, pools in (overrides or {}).items():
+            for pool, values in pools.items():
+                if pool not in ("api", "bulk"):
+                    raise ValueError(f"unknown pool {pool!r} for {suffix!r}; use api or bulk")
+                unknown = set(values) - known
+                if unknown:
+                    raise ValueError(f"unknown profile fields for {suffix!r}: {sorted(unknown)}")
+                base = self.resolve(suffix, pool)
+                self.profiles.setdefault(suffix, {})[pool] = replace(base, **values)
+
+    def resolve(self, host: str, pool: Pool) -> PoolProfile:
+        matches = [
+            suffix
+            for suffix, pools in self.profiles.items()
+            if pool in pools and (host == suffix or host.endswith(f".{suffix}") or not suffix)
+        ]
+        return self.profiles[max(matches, key=len)][pool]
+
+
+class _TracedTransport(httpx.HTTPTransport):
+    """Counts, per request, whether httpcore opened a connection or reused one."""
+
+    def __init__(self, labels: dict[str, str], metrics: Metrics, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.labels = labels
+        self.metrics = metrics
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if not self.metrics.enabled:
+            return super().handle_request(request)
+        events: list[str] = []
+        upstream: Callable[[str, dict], None] | None = request.extensions.get("trace")
+
+        def trace(name: str, info: dict) -> None:
+            if name.endswith((".connect_tcp.complete", ".start_tls.complete")):
+                events.append(name)
+            if upstream is not None:
+                upstream(name, info)
+
+        request.extensions["trace"] = trace
+        response = super().handle_request(request)
+        opened = any(name.endswith(".connect_tcp.complete") for name in events)
+        self.metrics.add(
+            "http_pool_requests_total",
+            1,
+            {**self.labels, "connection": "new" if opened else "reused"},
+        )
+        if any(name.endswith(".start_tls.complete") for name in events):
+            self.metrics.add("http_tls_handshakes_total", 1, self.labels)
+        return response
+
+
+class PoolRouter:
+    """The ``httpx.Client`` surface ``HttpClient`` uses, with one client per (host, pool).
+
+    ``get``/``post`` go to the host's ``api`` pool and ``stream`` to its
+    ``bulk`` pool. Clients are created on first use, so offline runs never
+    open one. HTTP/2 is used where a profile asks for it and the optional
+    ``h2`` package is installed; otherwise connections stay on HTTP/1.1.
+    """
+
+    def __init__(
+        self, profiles: TransportProfiles | None = None, *, metrics: Metrics = DISABLED_METRICS
+    ) -> None:
+        self.profiles = profiles or TransportProfiles()
+        self.metrics = metrics
+        self._clients: dict[tuple[str, str], httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def client_for(self, url: str, pool: Pool) -> httpx.Client:
+        host = httpx.URL(url).host
+        with self._lock:
+            client = self._clients.get((host, pool))
+            if client is None:
+                profile = self.profiles.resolve(host, pool)
+                transport = _TracedTransport(
+                    {"host": host, "pool": pool},
+                    self.metrics,
+                    http2=profile.http2 and HTTP2_AVAILABLE,
+                    limits=httpx.Limits(
+                        max_connections=profile.max_connections,
+                        max_keepalive_connections=profile.max_keepalive_connections,
+                        keepalive_expiry=profile.keepalive_expiry,
+                    ),
+                )
+                client = httpx.Client(transport=transport, follow_redirects=True, trust_env=False)
+                self._clients[(host, pool)] = client
+        return client
+
+    def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.client_for(url, "api").get(url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return self.client_for(url, "api").post(url, **kwargs)
+
+    def stream(
+        self, method: str, url: str, **kwargs: Any
+    ) -> AbstractContextManager[httpx.Response]:
+        return self.client_for(url, "bulk").stream(method, url, **kwargs)
+
+    def close(self) -> None:
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import NamedTuple
+
+from api_etl_pipeline.connectors.base import BaseConnector
+from api_etl_pipeline.pipeline import PipelineRunner
+
+WORK_ITEMS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_items (
+    id INTEGER PRIMARY KEY,
+    queue TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    payload_json TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires_at REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL,
+    UNIQUE(queue, item_key)
+);
+CREATE INDEX IF NOT EXISTS work_items_claim ON work_items(queue, status, id);
+"""
+WORK_STATUSES = ("pending", "leased", "done", "failed")
+
+
+class WorkItem(NamedTuple):
+    id: int
+    payload: dict
+    attempts: int
+
+
+class WorkQueue:
+    """Persistent plan items with leases, shared by every worker on one database.
+
+    ``enqueue`` is idempotent (items are keyed by their canonical JSON), so
+    re-enqueueing a backfill after a crash adds nothing. ``claim`` leases the
+    oldest pending items to one worker in a ``BEGIN IMMEDIATE`` transaction;
+    a lease that is not renewed by ``heartbeat`` before it expires returns the
+    item to the pool, and an item that has used ``max_attempts`` is marked
+    ``failed`` instead of being claimed again.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 3,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._clock = clock
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: write transactions are opened with BEGIN IMMEDIATE.
+        self.conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("PRAGMA synchronous = NORMAL;")
+        self.conn.executescript(WORK_ITEMS_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def enqueue(self, queue: str, items: Iterable[dict], *, chunk_rows: int = 1000) -> int:
+        """Add plan items (JSON objects) to ``queue``; returns how many were new."""
+        added = 0
+        chunk: list[tuple[str, str, str, float]] = []
+        for item in items:
+            try:
+                payload = json.dumps(item, sort_keys=True, separators=(",", ":"))
+            except TypeError as exc:
+                raise ValueError(f"plan item is not JSON-serializable: {exc}") from exc
+            item_key = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            chunk.append((queue, item_key, payload, self._clock()))
+            if len(chunk) >= chunk_rows:
+                added += self._insert(chunk)
+                chunk = []
+        if chunk:
+            added += self._insert(chunk)
+        return added
+
+    def claim(self, queue: str, worker_id: str, batch_size: int) -> list[WorkItem]:
+        """Lease up to ``batch_size`` items (pending or with an expired lease) to ``worker_id``."""
+        with self._transaction() as conn:
+            now = self._clock()
+            conn.execute(
+                """
+                UPDATE work_items
+                SET status = 'failed', lease_owner = NULL, lease_expires_at = NULL,
+                    last_error = 'lease expired', updated_at = ?
+                WHERE queue = ? AND status = 'leased' AND lease_expires_at < ? AND attempts >= ?
+                """,
+                (now, queue, now, self.max_attempts),
+            )
+            rows = conn.execute(
+                """
+                SELECT id, payload_json, attempts FROM work_items
+                WHERE queue = ?
+                  AND (status = 'pending' OR (status = 'leased' AND lease_expires_at < ?))
+                ORDER BY id
+                LIMIT ?
+                """,
+                (queue, now, batch_size),
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE work_items
+                SET status = 'leased', attempts = attempts + 1, lease_owner = ?,
+                    lease_expires_at = ?, updated_at = ?
+                WHERE id = ?
+                """,
+                [(worker_id, now + self.lease_seconds, now, row[0]) for row in rows],
+            )
+        return [WorkItem(row[0], json.loads(row[1]), row[2] + 1) for row in rows]
+
+    def heartbeat(self, worker_id: str, item_ids: list[int]) -> int:
+        """Extend ``worker_id``'s leases; returns how many it still holds."""
+        with self._transaction() as conn:
+            now = self._clock()
+            return conn.executemany(
+                """
+                UPDATE work_items SET lease_expires_at = ?, updated_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                [(now + self.lease_seconds, now, item_id, worker_id) for item_id in item_ids],
+            ).rowcount
+
+    def complete(self, worker_id: str, item_ids: list[int]) -> None:
+        self._finish(worker_id, item_ids, status="done", error=None)
+
+    def fail(self, worker_id: str, item_ids: list[int], error: str) -> None:
+        """Return items to the pool, or mark them ``failed`` once out of attempts."""
+        self._finish(worker_id, item_ids, status=None, error=error)
+
+    def release(self, worker_id: str, item_ids: list[int]) -> None:
+        """Give leases back without charging an attempt (clean shutdown)."""
+        with self._transaction() as conn:
+            conn.executemany(
+                """
+                UPDATE work_items
+                SET status = 'pending', attempts = attempts - 1, lease_owner = NULL,
+                    lease_expires_at = NULL, updated_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                [(self._clock(), item_id, worker_id) for item_id in item_ids],
+            )
+
+    def counts(self, queue: str) -> dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, COUNT(*) FROM work_items WHERE queue = ? GROUP BY status",
+                (queue,),
+            ).fetchall()
+        counts = dict.fromkeys(WORK_STATUSES, 0)
+        counts.update(rows)
+        return counts
+
+    def _insert(self, rows: list[tuple[str, str, str, float]]) -> int:
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                """
+                INSERT OR IGNORE INTO work_items(queue, item_key, payload_json, updated_at)
+                VALUES (?, ?, ?, ?)
+                """,
+                rows,
+            )
+            return conn.total_changes - before
+
+    def _finish(
+        self, worker_id: str, item_ids: list[int], *, status: str | None, error: str | None
+    ) -> None:
+        with self._transaction() as conn:
+            conn.executemany(
+                """
+                UPDATE work_items
+                SET status = COALESCE(?, CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END),
+                    lease_owner = NULL, lease_expires_at = NULL, last_error = ?, updated_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_owner = ?
+                """,
+                [
+                    (status, self.max_attempts, error, self._clock(), item_id, worker_id)
+                    for item_id in item_ids
+                ],
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+
+@dataclass
+class QueueWorker:
+    """Drains one queue through a ``PipelineRunner`` batch by batch.
+
+    Each claimed batch is one ``run_plan`` call, so its artifacts are flushed
+    and the connector checkpointed before the items are marked done. A batch
+    that raises is marked failed and listed under ``failed_batches``, and the
+    worker keeps claiming. A daemon thread renews the batch's leases every
+    third of the lease period.
+    """
+
+    queue: WorkQueue
+    name: str
+    worker_id: str
+    batch_size: int = 50
+    max_batches: int | None = None
+
+    def run(self, runner: PipelineRunner, connector: BaseConnector) -> dict:
+        totals: dict = {
+            "responses": 0,
+            "artifacts": 0,
+            "not_modified": 0,
+            "artifacts_skipped": 0,
+            "parse_errors": [],
+            "artifacts_manifest": [],
+            "failed_batches": [],
+            "items_done": 0,
+        }
+        batches = 0
+        while self.max_batches is None or batches < self.max_batches:
+            items = self.queue.claim(self.name, self.worker_id, self.batch_size)
+            if not items:
+                break
+            batches += 1
+            item_ids = [item.id for item in items]
+            try:
+                with self._heartbeat(item_ids):
+                    result = runner.run_plan(connector, [item.payload for item in items])
+            except Exception as exc:
+                # The items go back to the pool until ``max_attempts``; the
+                # worker moves on to the next batch. Seen keys recorded for the
+                # batch must not reach the next batch's checkpoint.
+                connector.discard_pending()
+                error = f"{type(exc).__name__}: {exc}"
+                self.queue.fail(self.worker_id, item_ids, error)
+                totals["failed_batches"].append({"item_ids": item_ids, "error": error})
+                continue
+            except BaseException:
+                self.queue.release(self.worker_id, item_ids)
+                raise
+            self.queue.complete(self.worker_id, item_ids)
+            _merge_totals(totals, result)
+            totals["items_done"] += len(items)
+        return totals
+
+    @contextmanager
+    def _heartbeat(self, item_ids: list[int]) -> Iterator[None]:
+        stop = threading.Event()
+
+        def renew() -> None:
+            while not stop.wait(self.queue.lease_seconds / 3):
+                self.queue.heartbeat(self.worker_id, item_ids)
+
+        thread = threading.Thread(target=renew, name=f"{self.worker_id}-heartbeat", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+
+def _merge_totals(totals: dict, result: dict) -> None:
+    for key, value in result.items():
+        if isinstance(value, list):
+            totals.setdefault(key, []).extend(value)
+        elif isinstance(value, int | float):
+            totals[key] = totals.get(key, 0) + value
+        else:
+            totals[key] = value
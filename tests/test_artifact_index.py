@@ -0,0 +1,74 @@
+from pathlib import Path
+
+from api_etl_pipeline.artifact_index import BloomFilter, SeenArtifactIndex
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+FILING_URL = "https://www.sec.gov/Archives/edgar/data/320193/000032019324000123/aapl-20231230.htm"
+BULK_URL = "https://www.sec.gov/Archives/edgar/daily-index/bulkdata/submissions.zip"
+
+
+def test_bloom_filter_has_no_false_negatives() -> None:
+    bloom = BloomFilter(1000, error_rate=0.01)
+    keys = [f"https://x/{index}" for index in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"https://y/{index}" in bloom for index in range(10_000))
+    assert false_positives < 300
+
+
+def test_only_immutable_urls_are_skipped(tmp_path: Path) -> None:
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        for url in (FILING_URL, BULK_URL):
+            storage.insert_artifact(
+                provider="sec_edgar",
+                source_url=url,
+                sha256="a" * 64,
+                byte_count=1,
+                blob_path="blob",
+                response_id=None,
+            )
+        index = SeenArtifactIndex(storage)
+        assert index.is_stored("sec_edgar", FILING_URL)
+        assert not index.is_stored("sec_edgar", FILING_URL.replace("123/", "124/"))
+        assert not index.is_stored("sec_bulk", BULK_URL)
+        assert not index.is_stored("nrc_adams_aps", FILING_URL)
+    finally:
+        storage.close()
+
+
+def test_rerun_skips_stored_artifacts_before_download(tmp_path: Path) -> None:
+    def run() -> dict:
+        storage = SqliteStorage(tmp_path / "db.sqlite3")
+        try:
+            with HttpClient(
+                live=False,
+                fixture_root=Path("tests/fixtures"),
+                rate_limiter=GlobalRateLimiter(),
+                sec_user_agent=None,
+                nrc_subscription_key=None,
+                attempt_observer=lambda attempt: attempts.append(attempt.url),
+            ) as client:
+                runner = PipelineRunner(
+                    storage=storage,
+                    blob_store=BlobStore(tmp_path / "blobs"),
+                    artifact_index=SeenArtifactIndex(storage),
+                )
+                return runner.run(SecEdgarConnector(client), limit=1)
+        finally:
+            storage.close()
+
+    attempts: list[str] = []
+    first = run()
+    assert (first["artifacts"], first["artifacts_skipped"]) == (1, 0)
+
+    attempts.clear()
+    second = run()
+    assert (second["responses"], second["artifacts"], second["artifacts_skipped"]) == (1, 0, 1)
+    assert FILING_URL not in attempts
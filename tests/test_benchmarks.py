@@ -0,0 +1,31 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from api_etl_pipeline.benchmarks import BENCHMARKS, run_benchmarks, write_report
+
+
+def test_every_benchmark_reports_throughput_latency_and_rss(tmp_path: Path) -> None:
+    report = run_benchmarks(workdir=tmp_path / "work", scale=0.01, isolate=False)
+
+    assert list(report["benchmarks"]) == list(BENCHMARKS)
+    for result in report["benchmarks"].values():
+        assert result["operations"] >= 1
+        assert result["bytes"] > 0
+        assert result["ops_per_second"] > 0
+        assert result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
+        assert result["peak_rss_bytes"] >= result["baseline_rss_bytes"] > 0
+    assert not (tmp_path / "work" / "sqlite_insert").exists()
+
+    path = write_report(report, tmp_path / "out" / "bench.json")
+    assert json.loads(path.read_text())["scale"] == 0.01
+
+
+def test_isolated_run_and_unknown_names(tmp_path: Path) -> None:
+    report = run_benchmarks(["blob_store_put"], workdir=tmp_path, scale=0.01)
+    assert list(report["benchmarks"]) == ["blob_store_put"]
+    assert report["isolated"] is True
+
+    with pytest.raises(ValueError, match="unknown benchmarks: nope"):
+        run_benchmarks(["nope"], workdir=tmp_path)
@@ -0,0 +1,102 @@
+import sqlite3
+from pathlib import Path
+
+from api_etl_pipeline.downloads import sha256_bytes
+from api_etl_pipeline.http_client import CapturedResponse
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SCHEMA_VERSION, SqliteStorage
+
+LEGACY_RESPONSES_SQL = """
+CREATE TABLE responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    params_json TEXT,
+    status_code INTEGER NOT NULL,
+    headers_json TEXT NOT NULL,
+    body BLOB NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE artifacts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    provider TEXT NOT NULL,
+    source_url TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    blob_path TEXT NOT NULL,
+    response_id INTEGER,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE(source_url, sha256),
+    FOREIGN KEY(response_id) REFERENCES responses(id)
+);
+"""
+
+
+def _captured(body: bytes) -> CapturedResponse:
+    return CapturedResponse(
+        method="GET",
+        url="https://data.sec.gov/submissions/CIK0000320193.json",
+        params_json="{}",
+        status_code=200,
+        headers_json="{}",
+        body=body,
+    )
+
+
+def test_identical_bodies_are_stored_once(tmp_path: Path) -> None:
+    blobs = BlobStore(tmp_path / "blobs")
+    storage = SqliteStorage(tmp_path / "db.sqlite3", body_store=blobs, inline_max_bytes=16)
+    large = b"x" * 1000
+    try:
+        first = storage.insert_response("sec_edgar", _captured(large))
+        second = storage.insert_response("sec_edgar", _captured(large))
+        tiny = storage.insert_response("sec_edgar", _captured(b"{}"))
+
+        rows = storage.conn.execute(
+            "SELECT body_sha256, body_bytes, body_inline FROM responses ORDER BY id"
+        ).fetchall()
+        assert rows[0] == rows[1] == (sha256_bytes(large), 1000, None)
+        assert rows[2] == (sha256_bytes(b"{}"), 2, b"{}")
+        assert [p for p in blobs.root.rglob("*") if p.is_file()] == [
+            blobs.path_for(sha256_bytes(large))
+        ]
+        assert storage.read_body(first) == storage.read_body(second) == large
+        assert storage.read_body(tiny) == b"{}"
+    finally:
+        storage.close()
+
+
+def test_legacy_inline_bodies_are_migrated(tmp_path: Path) -> None:
+    db_path = tmp_path / "db.sqlite3"
+    large = b"y" * 5000
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(LEGACY_RESPONSES_SQL)
+    legacy.executemany(
+        "INSERT INTO responses(provider, method, url, status_code, headers_json, body)"
+        " VALUES ('sec_edgar', 'GET', ?, 200, '{}', ?)",
+        [("https://a", large), ("https://b", b"{}")],
+    )
+    legacy.execute(
+        "INSERT INTO artifacts(provider, source_url, sha256, bytes, blob_path, response_id)"
+        " VALUES ('sec_edgar', 'https://a', ?, 5000, 'blob', 1)",
+        (sha256_bytes(large),),
+    )
+    legacy.commit()
+    legacy.close()
+
+    blobs = BlobStore(tmp_path / "blobs")
+    storage = SqliteStorage(db_path, body_store=blobs)
+    try:
+        assert storage.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        columns = {row[1] for row in storage.conn.execute("PRAGMA table_info(responses)")}
+        assert "body" not in columns
+        columns = {row[1] for row in storage.conn.execute("PRAGMA table_info(artifacts)")}
+        assert "content_encoding" in columns
+        assert storage.read_body(1) == large
+        assert storage.read_body(2) == b"{}"
+        assert blobs.path_for(sha256_bytes(large)).read_bytes() == large
+        assert storage.insert_response("sec_edgar", _captured(b"{}")) == 3
+        assert storage.conn.execute("SELECT response_id FROM artifacts").fetchall() == [(1,)]
+    finally:
+        storage.close()
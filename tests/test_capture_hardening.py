@@ -51,7 +51,7 @@ def test_raw_and_pretty_written(tmp_path: Path) -> None:
             attempt_number=1,
         )
     )
-    meta = json.loads((tmp_path / "run" / "responses" / "0001_get.meta.json").read_text())
+    meta = json.loads((tmp_path / "run" / "responses" / "000001_get.meta.json").read_text())
     assert (tmp_path / "run" / meta["raw_path"]).exists()
     assert (tmp_path / "run" / meta["pretty_path"]).exists()
     assert meta["request_headers"]["Authorization"] == "***REDACTED***"
@@ -103,3 +103,99 @@ def test_run_dir_collision(tmp_path: Path) -> None:
     second = build_run_dir(base, "p")
     assert second != first
     assert second.name.startswith(first.name)
+
+
+def test_background_writer_drains_on_finalize(tmp_path: Path) -> None:
+    run = RunCapture(
+        tmp_path / "run",
+        provider="x",
+        live=False,
+        limit=1,
+        pretty_max_bytes=2_000_000,
+        gzip_min_bytes=5_000_000,
+        queue_max_bytes=16,
+    )
+    spooled = tmp_path / "spool.part"
+    spooled.write_bytes(b"artifact-bytes")
+    ids = []
+    for index in range(5):
+        ids.append(
+            run.capture_attempt(
+                AttemptRecord(
+                    method="GET",
+                    url=f"http://example/{index}",
+                    request_payload_json=None,
+                    request_headers=None,
+                    status_code=200,
+                    response_headers={"content-type": "application/json"},
+                    body=b'{"index": %d}' % index,
+                    attempt_number=1,
+                )
+            )
+        )
+    ids.append(
+        run.capture_attempt(
+            AttemptRecord(
+                method="GET",
+                url="http://example/file",
+                request_payload_json=None,
+                request_headers=None,
+                status_code=200,
+                response_headers=None,
+                body=b"",
+                attempt_number=1,
+                body_path=spooled,
+            )
+        )
+    )
+    # The pipeline renames spool files into the blob store right after capture.
+    spooled.unlink()
+    run.finalize(status="succeeded", counts={})
+
+    assert ids == [1, 2, 3, 4, 5, 6]
+    run_json = json.loads((tmp_path / "run" / "run.json").read_text())
+    assert [entry["id"] for entry in run_json["responses"]] == ids
+    assert run_json["capture"]["background"] is True
+    assert run_json["capture"]["errors"] == []
+    assert (tmp_path / "run" / "responses" / "000006_get.raw.bin").read_bytes() == b"artifact-bytes"
+    assert json.loads((tmp_path / "run" / "responses" / "000005_get.json").read_text()) == {
+        "index": 4
+    }
+
+
+def test_errors_only_mode_keeps_metadata_for_successes(tmp_path: Path) -> None:
+    run = RunCapture(
+        tmp_path / "run",
+        provider="x",
+        live=False,
+        limit=1,
+        pretty_max_bytes=2_000_000,
+        gzip_min_bytes=5_000_000,
+        mode="errors-only",
+    )
+    for status in (500, 200):
+        run.capture_attempt(
+            AttemptRecord(
+                method="GET",
+                url="http://example",
+                request_payload_json=None,
+                request_headers=None,
+                status_code=status,
+                response_headers={"content-type": "text/plain"},
+                body=b"body-%d" % status,
+                attempt_number=1,
+                elapsed_seconds=0.25,
+            )
+        )
+    run.finalize(status="succeeded", counts={})
+
+    responses = tmp_path / "run" / "responses"
+    failed = json.loads((responses / "000001_get.meta.json").read_text())
+    ok = json.loads((responses / "000002_get.meta.json").read_text())
+    assert (tmp_path / "run" / failed["raw_path"]).read_bytes() == b"body-500"
+    assert ok["raw_path"] is None and ok["body_captured"] is False
+    assert ok["byte_count"] == 8 and ok["elapsed_seconds"] == 0.25
+    assert not (responses / "000002_get.raw.bin").exists()
+    run_json = json.loads((tmp_path / "run" / "run.json").read_text())
+    assert run_json["capture"]["bodies_written"] == 1
+    assert run_json["capture"]["bodies_skipped"] == 1
@@ -0,0 +1,105 @@
+from pathlib import Path
+
+import httpx
+
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+FIXTURES = Path("tests/fixtures/sec_edgar")
+ETAG = '"submissions-v1"'
+
+
+def test_unchanged_submissions_short_circuit_on_304(tmp_path: Path) -> None:
+    seen_conditional: list[str | None] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "data.sec.gov":
+            seen_conditional.append(request.headers.get("if-none-match"))
+            if request.headers.get("if-none-match") == ETAG:
+                return httpx.Response(304, headers={"etag": ETAG})
+            return httpx.Response(
+                200,
+                headers={"etag": ETAG, "content-type": "application/json"},
+                content=(FIXTURES / "submissions.json").read_bytes(),
+            )
+        return httpx.Response(200, content=(FIXTURES / "artifact.htm").read_bytes())
+
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    runner = PipelineRunner(storage=storage, blob_store=BlobStore(tmp_path / "blobs"))
+    results = []
+    try:
+        for _ in range(2):
+            with HttpClient(
+                live=True,
+                fixture_root=Path("tests/fixtures"),
+                rate_limiter=GlobalRateLimiter(),
+                sec_user_agent="ua",
+                nrc_subscription_key=None,
+                spool_dir=tmp_path / "spool",
+                validator_store=storage,
+            ) as client:
+                client._client = httpx.Client(transport=httpx.MockTransport(handler))
+                results.append(runner.run(SecEdgarConnector(client), limit=1))
+    finally:
+        storage.close()
+
+    first, second = results
+    assert seen_conditional == [None, ETAG]
+    assert (first["responses"], first["artifacts"], first["not_modified"]) == (2, 1, 0)
+    assert (second["responses"], second["artifacts"], second["not_modified"]) == (1, 0, 1)
+    assert second["parse_errors"] == []
+
+
+def test_capped_incremental_run_does_not_save_validators(tmp_path: Path) -> None:
+    filings = [
+        (f"0000320193-24-00002{day}", f"2024-04-0{day}T12:00:00.000Z", f"{day}.htm")
+        for day in (5, 4, 3, 2, 1)
+    ]
+    listed = filings[-1:]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host != "data.sec.gov":
+            return httpx.Response(200, content=b"<html></html>")
+        recent = {
+            "accessionNumber": [accession for accession, _, _ in listed],
+            "acceptanceDateTime": [accepted for _, accepted, _ in listed],
+            "form": ["8-K"] * len(listed),
+            "primaryDocument": [document for _, _, document in listed],
+        }
+        etag = f'"v{len(listed)}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, headers={"etag": etag}, json={"filings": {"recent": recent}})
+
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    runner = PipelineRunner(storage=storage, blob_store=BlobStore(tmp_path / "blobs"))
+
+    def run() -> tuple[list[str], int]:
+        with HttpClient(
+            live=True,
+            fixture_root=Path("tests/fixtures"),
+            rate_limiter=GlobalRateLimiter(),
+            sec_user_agent="ua",
+            nrc_subscription_key=None,
+            spool_dir=tmp_path / "spool",
+            validator_store=storage,
+        ) as client:
+            client._client = httpx.Client(transport=httpx.MockTransport(handler))
+            result = runner.run(SecEdgarConnector(client, storage=storage, max_filings=2), limit=1)
+        names = [entry["source_url"].rsplit("/", 1)[1] for entry in result["artifacts_manifest"]]
+        return names, result["not_modified"]
+
+    try:
+        assert run() == (["1.htm"], 0)
+        listed = filings
+        # Five unseen filings and a cap of two: the ETag is only kept once
+        # the last capped run has taken everything.
+        assert run() == (["3.htm", "2.htm"], 0)
+        assert run() == (["5.htm", "4.htm"], 0)
+        assert run() == ([], 1)
+    finally:
+        storage.close()
@@ -0,0 +1,38 @@
+import pytest
+
+from api_etl_pipeline.connectors.base import BaseConnector
+
+
+class _Stubs:
+    provider = "test"
+
+    def plan(self, limit: int) -> list[dict]:
+        return []
+
+    def download_artifact(self, metadata_item: dict, item_index: int) -> None:
+        return None
+
+    def checkpoint(self) -> None:
+        return None
+
+
+def test_connectors_must_provide_a_metadata_path() -> None:
+    with pytest.raises(TypeError, match="must override fetch_metadata_item"):
+
+        class _Missing(_Stubs, BaseConnector):
+            pass
+
+    with pytest.raises(TypeError, match="or both fetch_metadata and parse_metadata"):
+
+        class _HalfSplit(_Stubs, BaseConnector):
+            def fetch_metadata(self, item: dict, item_index: int) -> None:
+                return None
+
+    class _Split(_Stubs, BaseConnector):
+        def fetch_metadata(self, item: dict, item_index: int) -> None:
+            return None
+
+        def parse_metadata(self, item: dict, item_index: int, response: object) -> dict:
+            return {"item": item}
+
+    assert _Split().fetch_metadata_item({"n": 1}, 0) == ({"item": {"n": 1}}, None)
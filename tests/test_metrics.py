@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from api_etl_pipeline.cli import app
+from api_etl_pipeline.metrics import DISABLED_METRICS, Metrics
+
+
+def test_histograms_counters_and_prometheus_text(tmp_path: Path) -> None:
+    metrics = Metrics(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.05, 3.0):
+        metrics.observe("http_request_seconds", seconds, {"host": "data.sec.gov"})
+    metrics.add("http_response_bytes_total", 2048, {"host": "data.sec.gov"})
+    with metrics.time("sqlite_commit_seconds"):
+        pass
+
+    snapshot = metrics.snapshot()
+    (request,) = snapshot["histograms"]["http_request_seconds"]
+    assert request["buckets"] == {"0.01": 1, "0.1": 3, "+Inf": 4}
+    assert request["sum"] == 3.105
+    assert snapshot["histograms"]["sqlite_commit_seconds"][0]["count"] == 1
+    assert snapshot["counters"]["http_response_bytes_total"][0]["value"] == 2048
+
+    path = metrics.write_prometheus(tmp_path / "etl.prom", labels={"provider": "sec_edgar"})
+    lines = path.read_text().splitlines()
+    assert "# TYPE api_etl_http_request_seconds histogram" in lines
+    assert (
+        'api_etl_http_request_seconds_bucket{provider="sec_edgar",host="data.sec.gov",le="0.1"} 3'
+        in lines
+    )
+    assert 'api_etl_http_request_seconds_count{provider="sec_edgar",host="data.sec.gov"} 4' in lines
+    assert 'api_etl_http_response_bytes_total{provider="sec_edgar",host="data.sec.gov"} 2048' in (
+        lines
+    )
+    assert not list(tmp_path.glob(".*.tmp"))
+
+
+def test_disabled_metrics_record_nothing() -> None:
+    DISABLED_METRICS.observe("http_request_seconds", 1.0)
+    DISABLED_METRICS.add("http_requests_total")
+    with DISABLED_METRICS.time("pipeline_item_seconds"):
+        pass
+    assert DISABLED_METRICS.snapshot()["histograms"] == {}
+    assert DISABLED_METRICS.snapshot()["counters"] == {}
+
+
+def test_offline_run_reports_stage_metrics(tmp_path: Path) -> None:
+    prom_file = tmp_path / "textfile" / "api_etl.prom"
+    result = CliRunner().invoke(
+        app,
+        ["run", "--provider", "sec_edgar"],
+        env={
+            "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+            "APP_BLOB_DIR": str(tmp_path / "blobs"),
+            "APP_RUN_DIR": str(tmp_path / "runs"),
+            "APP_METRICS_PROM_FILE": str(prom_file),
+        },
+    )
+    assert result.exit_code == 0, result.output
+
+    (run_dir,) = (tmp_path / "runs").iterdir()
+    metrics = json.loads((run_dir / "run.json").read_text())["metrics"]
+    for name in (
+        "capture_write_seconds",
+        "sqlite_commit_seconds",
+        "blob_write_seconds",
+        "pipeline_item_seconds",
+    ):
+        assert metrics["histograms"][name][0]["count"] >= 1, name
+    assert {entry["labels"]["status"] for entry in metrics["counters"]["http_requests_total"]} == {
+        "200"
+    }
+    assert metrics["counters"]["http_response_bytes_total"][0]["value"] > 0
+    assert 'api_etl_sqlite_rows_total{provider="sec_edgar"}' in prom_file.read_text()
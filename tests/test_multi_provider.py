@@ -0,0 +1,112 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from api_etl_pipeline.cli import app
+from api_etl_pipeline.http_client import HttpClient
+
+FIXTURE_LATENCY_SECONDS = 0.3
+
+
+def _invoke(tmp_path: Path, *args: str):
+    return CliRunner().invoke(
+        app,
+        ["run", *args],
+        env={
+            "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+            "APP_BLOB_DIR": str(tmp_path / "blobs"),
+            "APP_RUN_DIR": str(tmp_path / "runs"),
+        },
+    )
+
+
+def test_providers_run_concurrently_into_one_store_and_run_tree(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    offline_file = HttpClient._offline_file
+
+    def slow_offline_file(self, provider: str, name: str) -> bytes:
+        time.sleep(FIXTURE_LATENCY_SECONDS)
+        return offline_file(self, provider, name)
+
+    # Each provider reads two fixtures: ~0.6 s alone, ~1.2 s if run one after the other.
+    monkeypatch.setattr(HttpClient, "_offline_file", slow_offline_file)
+    result = _invoke(tmp_path, "--provider", "sec_edgar", "--provider", "nrc_adams_aps")
+    assert result.exit_code == 0, result.output
+
+    (run_dir,) = (tmp_path / "runs").iterdir()
+    assert run_dir.name.endswith("_sec_edgar+nrc_adams_aps")
+    summary = json.loads((run_dir / "run.json").read_text())
+    assert summary["status"] == "succeeded"
+    assert summary["providers"] == ["sec_edgar", "nrc_adams_aps"]
+    assert summary["wall_seconds"] < 4 * FIXTURE_LATENCY_SECONDS
+    for provider in ("sec_edgar", "nrc_adams_aps"):
+        section = summary["sections"][provider]
+        assert section["run_dir"] == provider
+        assert section["counts"]["artifacts"] == 1
+        assert json.loads((run_dir / provider / "run.json").read_text())["provider"] == provider
+    assert (run_dir / "run.log").exists()
+
+    conn = sqlite3.connect(tmp_path / "db.sqlite3")
+    providers = dict(conn.execute("SELECT provider, COUNT(*) FROM artifacts GROUP BY provider"))
+    conn.close()
+    assert providers == {"sec_edgar": 1, "nrc_adams_aps": 1}
+
+
+def test_one_failing_provider_fails_the_run_but_not_the_others(tmp_path: Path) -> None:
+    result = _invoke(tmp_path, "--provider", "sec_edgar", "--provider", "nope")
+    assert result.exit_code != 0
+    assert not (tmp_path / "runs").exists()
+
+    result = CliRunner().invoke(
+        app,
+        ["run", "--provider", "sec_edgar", "--provider", "sec_bulk"],
+        env={
+            "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+            "APP_BLOB_DIR": str(tmp_path / "blobs"),
+            "APP_RUN_DIR": str(tmp_path / "runs"),
+            "SEC_BULK_MAX_BYTES": "1",
+        },
+    )
+    assert result.exit_code == 1
+    (run_dir,) = (tmp_path / "runs").iterdir()
+    sections = json.loads((run_dir / "run.json").read_text())["sections"]
+    assert sections["sec_edgar"]["status"] == "succeeded"
+    assert sections["sec_bulk"]["status"] == "failed"
+
+
+def test_sections_keep_their_own_metrics(tmp_path: Path) -> None:
+    result = CliRunner().invoke(
+        app,
+        ["run", "--provider", "sec_edgar", "--provider", "nrc_adams_aps"],
+        env={
+            "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+            "APP_BLOB_DIR": str(tmp_path / "blobs"),
+            "APP_RUN_DIR": str(tmp_path / "runs"),
+            "APP_METRICS_PROM_FILE": str(tmp_path / "etl.prom"),
+        },
+    )
+    assert result.exit_code == 0, result.output
+    (run_dir,) = (tmp_path / "runs").iterdir()
+
+    def hosts(metrics: dict) -> set[str]:
+        return {entry["labels"]["host"] for entry in metrics["counters"]["http_requests_total"]}
+
+    sec = json.loads((run_dir / "sec_edgar" / "run.json").read_text())["metrics"]
+    nrc = json.loads((run_dir / "nrc_adams_aps" / "run.json").read_text())["metrics"]
+    assert hosts(sec) and not any(host.endswith("nrc.gov") for host in hosts(sec))
+    assert hosts(nrc) and all(host.endswith("nrc.gov") for host in hosts(nrc))
+
+    summary = json.loads((run_dir / "run.json").read_text())["metrics"]
+    by_provider = {
+        entry["labels"]["provider"] for entry in summary["counters"]["http_requests_total"]
+    }
+    assert by_provider == {"sec_edgar", "nrc_adams_aps"}
+    assert "sqlite_commit_seconds" in summary["histograms"]
+    prom = (tmp_path / "etl.prom").read_text()
+    assert 'provider="sec_edgar"' in prom and 'provider="nrc_adams_aps"' in prom
+    assert "sec_edgar+nrc_adams_aps" not in prom
@@ -0,0 +1,151 @@
+import json
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import httpx
+
+from api_etl_pipeline.connectors.nrc_adams_aps import NrcAdamsApsConnector
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+NEWEST = datetime(2024, 6, 1, tzinfo=UTC)
+
+
+class _ApsServer:
+    """APS stand-in: rejects ``take`` above ``max_take`` and ignores the date filter."""
+
+    def __init__(self, count: int, *, max_take: int = 100) -> None:
+        self.max_take = max_take
+        self.documents = [
+            self._document(index, NEWEST - timedelta(hours=index)) for index in range(count)
+        ]
+        self.searches: list[dict] = []
+        self.second_page_requested = threading.Event()
+
+    @staticmethod
+    def _document(index: int, added: datetime) -> dict:
+        return {
+            "document": {
+                "AccessionNumber": f"ML24{index:07d}",
+                "DateAddedTimestamp": added.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "Url": f"https://www.nrc.gov/docs/ML24{index:07d}.pdf",
+            }
+        }
+
+    def add_newer(self, count: int) -> None:
+        for offset in range(1, count + 1):
+            added = NEWEST + timedelta(hours=offset)
+            self.documents.insert(0, self._document(9_000_000 + offset, added))
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            body = json.loads(request.content)
+            self.searches.append(body)
+            take = body.get("take")
+            if take is not None and take > self.max_take:
+                return httpx.Response(400, json={"error": "take too large"})
+            if body["skip"] > 0:
+                self.second_page_requested.set()
+            page = self.documents[body["skip"] : body["skip"] + (take or 20)]
+            return httpx.Response(200, json={"count": len(self.documents), "results": page})
+        if request.url.path.endswith("ML240000099.pdf"):
+            # Last document of page one: only finishes once page two was requested.
+            assert self.second_page_requested.wait(timeout=5)
+        return httpx.Response(200, content=b"%PDF-1.7 " + request.url.path.encode())
+
+
+def _run(tmp_path: Path, server: _ApsServer) -> tuple[dict, NrcAdamsApsConnector]:
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        client = HttpClient(
+            live=True,
+            fixture_root=Path("tests/fixtures"),
+            rate_limiter=GlobalRateLimiter(nrc_max_rps=10_000),
+            sec_user_agent=None,
+            nrc_subscription_key="key",
+            spool_dir=tmp_path / "spool",
+            sleep=lambda seconds: None,
+        )
+        client._client = httpx.Client(transport=httpx.MockTransport(server))
+        with client:
+            connector = NrcAdamsApsConnector(client, storage=storage)
+            runner = PipelineRunner(
+                storage=storage, blob_store=BlobStore(tmp_path / "blobs"), concurrency=4
+            )
+            return runner.run(connector, limit=0), connector
+    finally:
+        storage.close()
+
+
+def test_full_sync_discovers_take_and_pages_to_the_end(tmp_path: Path) -> None:
+    server = _ApsServer(230)
+    result, connector = _run(tmp_path, server)
+
+    assert connector.take == 100
+    assert [search.get("take") for search in server.searches] == [1000, 500, 100, 100, 100]
+    assert [search["skip"] for search in server.searches[2:]] == [0, 100, 200]
+    assert result["artifacts"] == 230
+    # Three accepted pages, no trailing empty page: 30 < 100 ends the sync.
+    assert result["responses"] == 3 + 230
+    assert result["parse_errors"] == []
+    assert server.searches[2]["searchCriteria"]["properties"] == []
+
+
+def test_incremental_sync_only_pages_through_new_documents(tmp_path: Path) -> None:
+    server = _ApsServer(230)
+    _run(tmp_path, server)
+
+    server.add_newer(2)
+    server.searches.clear()
+    result, _ = _run(tmp_path, server)
+
+    assert result["artifacts"] == 2
+    assert [a["source_url"].rsplit("/", 1)[1] for a in result["artifacts_manifest"]] == [
+        "ML249000002.pdf",
+        "ML249000001.pdf",
+    ]
+    # Page one mixes new, seen and pre-window documents; page two is entirely
+    # older than the 3-day window, so paging stops there.
+    assert [search["skip"] for search in server.searches if search.get("take") == 100] == [0, 100]
+    assert server.searches[-1]["searchCriteria"]["properties"] == [
+        {"name": "DateAddedTimestamp", "operator": "ge", "value": "2024-05-29"}
+    ]
+
+
+def test_queued_pages_cover_the_same_documents(tmp_path: Path) -> None:
+    server = _ApsServer(230)
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        client = HttpClient(
+            live=True,
+            fixture_root=Path("tests/fixtures"),
+            rate_limiter=GlobalRateLimiter(nrc_max_rps=10_000),
+            sec_user_agent=None,
+            nrc_subscription_key="key",
+            spool_dir=tmp_path / "spool",
+            sleep=lambda seconds: None,
+        )
+        client._client = httpx.Client(transport=httpx.MockTransport(server))
+        with client:
+            connector = NrcAdamsApsConnector(client, storage=storage)
+            pages = list(connector.queue_plan(0))
+            assert [(page["skip"], page["take"]) for page in pages] == [
+                (0, 100),
+                (100, 100),
+                (200, 100),
+            ]
+            json.dumps(pages)
+            runner = PipelineRunner(
+                storage=storage, blob_store=BlobStore(tmp_path / "blobs"), concurrency=4
+            )
+            result = runner.run_plan(connector, pages)
+    finally:
+        storage.close()
+
+    assert result["artifacts"] == 230
+    assert result["responses"] == 3 + 230
+    assert sorted(search["skip"] for search in server.searches[-3:]) == [0, 100, 200]
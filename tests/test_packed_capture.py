@@ -0,0 +1,69 @@
+import json
+from pathlib import Path
+
+from api_etl_pipeline.capture_segment import INDEX_NAME, KIND_BODY, SegmentReader
+from api_etl_pipeline.run_capture import AttemptRecord, RunCapture, extract_packed
+
+
+def _attempt(url: str, body: bytes = b"", body_path: Path | None = None) -> AttemptRecord:
+    return AttemptRecord(
+        method="GET",
+        url=url,
+        request_payload_json=None,
+        request_headers={"Authorization": "secret"},
+        status_code=200,
+        response_headers={"content-type": "application/json"},
+        body=body,
+        attempt_number=1,
+        body_path=body_path,
+    )
+
+
+def test_packed_capture_round_trips_through_extract(tmp_path: Path) -> None:
+    run_dir = tmp_path / "run"
+    run = RunCapture(
+        run_dir,
+        provider="x",
+        live=False,
+        limit=1,
+        pretty_max_bytes=2_000_000,
+        gzip_min_bytes=1024,
+        queue_max_bytes=1024,
+        format="packed",
+        segment_max_bytes=4096,
+    )
+    large = json.dumps({"rows": list(range(2000))}).encode()
+    spooled = tmp_path / "spool.part"
+    spooled.write_bytes(large)
+    run.capture_attempt(_attempt("http://example/small", body=b'{"ok": true}'))
+    run.capture_attempt(_attempt("http://example/large", body_path=spooled))
+    spooled.unlink()
+    for index in range(20):
+        run.capture_attempt(_attempt(f"http://example/{index}", body=b"x" * 500))
+    run.finalize(status="succeeded", counts={})
+
+    capture_dir = run_dir / "capture"
+    assert not (run_dir / "responses").exists()
+    assert len(list(capture_dir.glob("segment-*.pack"))) > 1
+    assert not (capture_dir / ".pending").exists()
+
+    reader = SegmentReader(capture_dir)
+    body = reader.records_for(2)[KIND_BODY]
+    assert body.compressed and body.raw_length == len(large)
+    assert reader.read(body) == large
+
+    run_json = json.loads((run_dir / "run.json").read_text())
+    assert run_json["capture"]["format"] == "packed"
+    assert run_json["responses"][0]["meta_path"] is None
+    assert run_json["responses"][0]["segment"] == "segment-000001.pack"
+
+    extract_packed(run_dir, run_dir, attempt_ids=[1, 2])
+    meta = json.loads((run_dir / "responses" / "000001_get.meta.json").read_text())
+    assert meta["request_headers"]["Authorization"] == "***REDACTED***"
+    assert (run_dir / meta["raw_path"]).read_bytes() == b'{"ok": true}'
+    assert json.loads((run_dir / meta["pretty_path"]).read_text()) == {"ok": True}
+    assert (run_dir / "responses" / "000002_get.raw.bin").read_bytes() == large
+
+    # Without the index the segments are still readable by scanning headers.
+    (capture_dir / INDEX_NAME).unlink()
+    assert SegmentReader(capture_dir).attempt_ids() == list(range(1, 23))
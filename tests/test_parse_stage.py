@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from api_etl_pipeline.connectors.nrc_adams_aps import parse_search_page
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.connectors.sec_filings import decode_submissions
+from api_etl_pipeline.http_client import CapturedResponse, HttpClient
+from api_etl_pipeline.parse_stage import ParseStage
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+SUBMISSIONS = Path("tests/fixtures/sec_edgar/submissions.json")
+SEARCH = Path("tests/fixtures/nrc_adams_aps/search.json")
+
+
+def _captured(body: bytes, body_path: Path | None = None) -> CapturedResponse:
+    return CapturedResponse(
+        method="GET",
+        url="https://example.test/body.json",
+        params_json=None,
+        status_code=200,
+        headers_json="{}",
+        body=b"" if body_path is not None else body,
+        body_path=body_path,
+        byte_count=len(body),
+    )
+
+
+def test_worker_parse_matches_inline_for_memory_and_spooled_bodies(tmp_path: Path) -> None:
+    body = SUBMISSIONS.read_bytes()
+    spooled = tmp_path / "spooled.json"
+    spooled.write_bytes(body)
+    inline_columns, inline_shards = ParseStage().parse(decode_submissions, _captured(body))
+
+    with ParseStage(2, inline_max_bytes=0) as stage:
+        for captured in (_captured(body), _captured(body, spooled)):
+            columns, shards = stage.parse(decode_submissions, captured)
+            assert list(columns.accession) == list(inline_columns.accession)
+            assert columns.primary_document == inline_columns.primary_document
+            assert shards == inline_shards
+        search = SEARCH.read_bytes()
+        assert stage.parse(parse_search_page, _captured(search)) == parse_search_page(search)
+        assert stage.parse(parse_search_page, _captured(b"not json")) is None
+
+
+def test_sec_connector_parses_on_worker_processes(tmp_path: Path) -> None:
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        with (
+            HttpClient(
+                live=False,
+                fixture_root=Path("tests/fixtures"),
+                rate_limiter=GlobalRateLimiter(),
+                sec_user_agent=None,
+                nrc_subscription_key=None,
+            ) as client,
+            ParseStage(2, inline_max_bytes=0) as stage,
+        ):
+            runner = PipelineRunner(storage=storage, blob_store=BlobStore(tmp_path / "blobs"))
+            result = runner.run(SecEdgarConnector(client, parse_stage=stage), limit=1)
+    finally:
+        storage.close()
+
+    assert result["artifacts"] == 1
+    assert result["parse_errors"] == []
+    assert result["artifacts_manifest"][0]["source_url"].startswith(
+        "https://www.sec.gov/Archives/edgar/data/"
+    )
@@ -0,0 +1,58 @@
+import time
+from pathlib import Path
+
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+ITEMS = 16
+LATENCY_SECONDS = 0.05
+
+
+class _SlowSecConnector(SecEdgarConnector):
+    """Offline SEC connector with simulated network latency per request."""
+
+    def plan(self, limit: int) -> list[dict]:
+        return [{"cik10": f"{320193 + index:010d}"} for index in range(limit)]
+
+    def fetch_metadata_item(self, item, item_index):
+        time.sleep(LATENCY_SECONDS)
+        return super().fetch_metadata_item(item, item_index)
+
+    def download_artifact(self, metadata_item, item_index):
+        time.sleep(LATENCY_SECONDS)
+        return super().download_artifact(metadata_item, item_index)
+
+
+def _timed_run(tmp_path: Path, concurrency: int) -> tuple[float, dict]:
+    storage = SqliteStorage(tmp_path / f"c{concurrency}.sqlite3")
+    blobs = BlobStore(tmp_path / f"c{concurrency}_blobs")
+    try:
+        with HttpClient(
+            live=False,
+            fixture_root=Path("tests/fixtures"),
+            rate_limiter=GlobalRateLimiter(),
+            sec_user_agent=None,
+            nrc_subscription_key=None,
+        ) as client:
+            runner = PipelineRunner(storage=storage, blob_store=blobs, concurrency=concurrency)
+            started = time.perf_counter()
+            result = runner.run(_SlowSecConnector(client), limit=ITEMS)
+            return time.perf_counter() - started, result
+    finally:
+        storage.close()
+
+
+def test_concurrent_run_is_faster_and_equivalent(tmp_path: Path) -> None:
+    serial_seconds, serial = _timed_run(tmp_path, concurrency=1)
+    parallel_seconds, parallel = _timed_run(tmp_path, concurrency=8)
+
+    assert serial["responses"] == parallel["responses"] == ITEMS * 2
+    assert serial["artifacts"] == parallel["artifacts"] == ITEMS
+    assert [a["source_url"] for a in parallel["artifacts_manifest"]] == [
+        a["source_url"] for a in serial["artifacts_manifest"]
+    ]
+    assert parallel_seconds < serial_seconds / 3
@@ -0,0 +1,117 @@
+import json
+import tracemalloc
+from itertools import count, islice
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from api_etl_pipeline.cli import app
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.planning import CikUniverse, iter_cik_file
+from api_etl_pipeline.storage.db import SqliteStorage
+
+
+def test_cik_files_stream_lists_ticker_maps_and_json(tmp_path: Path) -> None:
+    text = tmp_path / "ciks.txt"
+    text.write_text(
+        "# universe\n320193\naapl\t320193\nmsft\t789019  # ticker.txt row\n\n"
+        "none\n0\n12345678901\n0001018724\n"
+    )
+    assert list(iter_cik_file(text)) == [
+        "0000320193",
+        "0000320193",
+        "0000789019",
+        "0001018724",
+    ]
+
+    # The CIK column is found by name, not by being the first number in a row.
+    table = tmp_path / "universe.csv"
+    table.write_text("row,Ticker,CIK,Name\n1,AAPL,320193,Apple\n2,BAD,0,x\n3,MSFT,789019,\n4\n")
+    assert list(iter_cik_file(table)) == ["0000320193", "0000789019"]
+    headless = tmp_path / "headless.csv"
+    headless.write_text("1,AAPL,320193\n")
+    with pytest.raises(ValueError, match="no CIK column"):
+        list(iter_cik_file(headless))
+
+    tickers = {
+        str(index): {"cik_str": cik, "ticker": f"T{index}", "title": "x"}
+        for index, cik in enumerate([320193, 789019, 0, 12345678901, 1018724, 1652044])
+    }
+    company_tickers = tmp_path / "company_tickers.json"
+    company_tickers.write_text(json.dumps(tickers))
+    expected = ["0000320193", "0000789019", "0001018724", "0001652044"]
+    # Tiny chunks split keys and numbers across reads.
+    for chunk_bytes in (5, 7, 64, 1 << 20):
+        assert list(iter_cik_file(company_tickers, chunk_bytes=chunk_bytes)) == expected
+
+
+def test_universe_shards_prioritizes_stale_and_reads_prior_db(tmp_path: Path) -> None:
+    storage = SqliteStorage(tmp_path / "prior.sqlite3")
+    for cik in ("0000000003", "0000000001"):
+        storage.put_watermark("sec_edgar", cik, watermark=1, seen={}, retain_seconds=0)
+    storage.close()
+    cik_file = tmp_path / "ciks.txt"
+    cik_file.write_text("".join(f"{cik}\n" for cik in range(1, 201)))
+
+    everything = set(CikUniverse(cik_file=cik_file))
+    shards = [set(CikUniverse(cik_file=cik_file, shard=(index, 3))) for index in range(3)]
+    assert set().union(*shards) == everything
+    assert sum(len(shard) for shard in shards) == len(everything) == 200
+    assert all(shards)
+
+    synced = {"0000000001": "2024-01-02 00:00:00", "0000000002": "2024-01-01 00:00:00"}
+    stalest = list(CikUniverse(cik_file=cik_file, order="stalest", last_synced=synced.get))
+    assert stalest[:2] == ["0000000003", "0000000004"]
+    assert stalest[-2:] == ["0000000002", "0000000001"]
+
+    assert list(CikUniverse(cik_db=tmp_path / "prior.sqlite3")) == ["0000000001", "0000000003"]
+
+
+def test_large_cik_plan_is_lazy_and_bounded(tmp_path: Path) -> None:
+    cik_file = tmp_path / "universe.txt"
+    with cik_file.open("w") as handle:
+        for cik in range(1, 100_001):
+            handle.write(f"{cik}\n")
+    connector = SecEdgarConnector(None, ciks=CikUniverse(cik_file=cik_file, shard=(1, 4)))  # type: ignore[arg-type]
+
+    tracemalloc.start()
+    plan = connector.plan(0)
+    first = next(plan)
+    planned = 1 + sum(1 for _ in plan)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert first["cik10"].isdigit() and len(first["cik10"]) == 10
+    assert 22_000 < planned < 28_000
+    assert peak < 4 * 1024 * 1024
+
+    endless = SecEdgarConnector(None, ciks=(f"{cik:010d}" for cik in count(1)))  # type: ignore[arg-type]
+    assert [item["cik10"] for item in islice(endless.plan(3), 5)] == [
+        "0000000001",
+        "0000000002",
+        "0000000003",
+    ]
+
+
+def test_offline_run_plans_from_cik_file(tmp_path: Path) -> None:
+    cik_file = tmp_path / "ticker.txt"
+    cik_file.write_text("aapl\t320193\nmsft\t789019\n")
+    result = CliRunner().invoke(
+        app,
+        # Without --limit a CIK file is planned whole.
+        ["run", "--provider", "sec_edgar"],
+        env={
+            "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+            "APP_BLOB_DIR": str(tmp_path / "blobs"),
+            "APP_RUN_DIR": str(tmp_path / "runs"),
+            "SEC_CIK_FILE": str(cik_file),
+            "SEC_PLAN_ORDER": "stalest",
+        },
+    )
+    assert result.exit_code == 0, result.output
+    (run_json,) = (tmp_path / "runs").glob("*/run.json")
+    run = json.loads(run_json.read_text())
+    assert run["args"]["limit"] == 0
+    urls = [entry["url"] for entry in run["responses"]]
+    assert "https://data.sec.gov/submissions/CIK0000320193.json" in urls
+    assert "https://data.sec.gov/submissions/CIK0000789019.json" in urls
@@ -0,0 +1,151 @@
+import hashlib
+import re
+from pathlib import Path
+
+import httpx
+import pytest
+
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+
+URL = "https://www.nrc.gov/docs/ML2400/ML24001A001.pdf"
+PAYLOAD = bytes(range(256)) * 40  # 10,240 bytes
+ETAG = '"doc-v1"'
+
+
+class _Stream(httpx.SyncByteStream):
+    def __init__(self, body: bytes, fail_after: int | None) -> None:
+        self.body = body
+        self.fail_after = fail_after
+
+    def __iter__(self):
+        step = 512
+        for offset in range(0, len(self.body), step):
+            if self.fail_after is not None and offset >= self.fail_after:
+                raise httpx.ReadError("connection reset by peer")
+            yield self.body[offset : offset + step]
+
+
+class _RangeServer:
+    """Stand-in origin: honors Range (or not) and can drop one connection."""
+
+    def __init__(
+        self,
+        *,
+        ranges: bool = True,
+        drop: tuple[str | None, int] | None = None,
+        total: bool = True,
+        restart_at: str | None = None,
+    ):
+        self.ranges = ranges
+        self.drop = drop
+        self.total = total
+        self.restart_at = restart_at
+        self.seen: list[str | None] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        requested = request.headers.get("range")
+        self.seen.append(requested)
+        fail_after = None
+        if self.drop is not None and self.drop[0] == requested:
+            fail_after = self.drop[1]
+            self.drop = None
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", requested or "")
+        if not self.ranges or match is None:
+            headers = {"etag": ETAG, "content-length": str(len(PAYLOAD))}
+            return httpx.Response(200, headers=headers, stream=_Stream(PAYLOAD, fail_after))
+        start = int(match.group(1))
+        end = min(int(match.group(2) or len(PAYLOAD) - 1), len(PAYLOAD) - 1)
+        if requested == self.restart_at:
+            start = 0  # a changed object answered from the top
+        headers = {
+            "etag": ETAG,
+            "content-range": f"bytes {start}-{end}/{len(PAYLOAD) if self.total else '*'}",
+            "content-length": str(end + 1 - start),
+        }
+        body = PAYLOAD[start : end + 1]
+        return httpx.Response(206, headers=headers, stream=_Stream(body, fail_after))
+
+
+def _client(tmp_path: Path, server: _RangeServer, *, parts: int) -> HttpClient:
+    client = HttpClient(
+        live=True,
+        fixture_root=Path("tests/fixtures"),
+        rate_limiter=GlobalRateLimiter(nrc_max_rps=1000),
+        sec_user_agent="ua",
+        nrc_subscription_key="key",
+        spool_dir=tmp_path / "spool",
+        sleep=lambda seconds: None,
+    )
+    client._client = httpx.Client(transport=httpx.MockTransport(server))
+    client.range_parts = parts
+    client.range_part_bytes = 2048
+    client.chunk_size = 512
+    return client
+
+
+def _assert_payload(captured) -> None:
+    assert captured.sha256 == hashlib.sha256(PAYLOAD).hexdigest()
+    assert captured.byte_count == len(PAYLOAD)
+    assert captured.body_path.read_bytes() == PAYLOAD
+
+
+def test_large_object_is_fetched_as_parallel_ranges(tmp_path: Path) -> None:
+    server = _RangeServer()
+    captured = _client(tmp_path, server, parts=4).stream_get(URL, provider="nrc_adams_aps")
+    _assert_payload(captured)
+    assert captured.status_code == 206
+    assert server.seen[0] == "bytes=0-2047"
+    assert sorted(server.seen[1:]) == [
+        "bytes=2048-4095",
+        "bytes=4096-6143",
+        "bytes=6144-8191",
+        "bytes=8192-10239",
+    ]
+
+
+def test_server_without_range_support_streams_whole_body(tmp_path: Path) -> None:
+    server = _RangeServer(ranges=False)
+    captured = _client(tmp_path, server, parts=4).stream_get(URL, provider="nrc_adams_aps")
+    _assert_payload(captured)
+    assert captured.status_code == 200
+    assert len(server.seen) == 1
+
+
+def test_dropped_connection_resumes_from_spool(tmp_path: Path) -> None:
+    server = _RangeServer(drop=(None, 3072))
+    captured = _client(tmp_path, server, parts=1).stream_get(URL, provider="nrc_adams_aps")
+    _assert_payload(captured)
+    assert server.seen == [None, "bytes=3072-"]
+
+
+@pytest.mark.parametrize("dropped", ["bytes=0-2047", "bytes=4096-6143"])
+def test_dropped_part_resumes_within_its_range(tmp_path: Path, dropped: str) -> None:
+    server = _RangeServer(drop=(dropped, 1024))
+    captured = _client(tmp_path, server, parts=3).stream_get(URL, provider="nrc_adams_aps")
+    _assert_payload(captured)
+    start = int(dropped.split("=")[1].split("-")[0])
+    assert f"bytes={start + 1024}-{start + 2047}" in server.seen
+
+
+def test_unknown_total_falls_back_to_whole_body(tmp_path: Path) -> None:
+    server = _RangeServer(total=False)
+    client = _client(tmp_path, server, parts=4)
+    acquired: list[str] = []
+    acquire_host = client.rate_limiter.acquire_host
+    client.rate_limiter.acquire_host = lambda host: acquired.append(host) or acquire_host(host)
+
+    captured = client.stream_get(URL, provider="nrc_adams_aps")
+    _assert_payload(captured)
+    assert captured.status_code == 200
+    assert server.seen == ["bytes=0-2047", None]
+    # The whole-body request goes through the rate limiter too.
+    assert len(acquired) == 2
+
+
+def test_misaligned_resume_does_not_erase_finished_parts(tmp_path: Path) -> None:
+    server = _RangeServer(drop=("bytes=0-2047", 1024), restart_at="bytes=1024-2047")
+    client = _client(tmp_path, server, parts=3)
+    with pytest.raises(RuntimeError, match="object changed"):
+        client.stream_get(URL, provider="nrc_adams_aps")
+    assert list((tmp_path / "spool").iterdir()) == []
@@ -0,0 +1,135 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter, SharedRateLimiter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_reservations_are_spaced_exactly_under_concurrency() -> None:
+    clock = _Clock()
+    limiter = GlobalRateLimiter(sec_max_rps=10, clock=clock)
+    waits: list[float] = []
+    lock = threading.Lock()
+
+    def reserve() -> None:
+        wait = limiter.reserve_host("data.sec.gov")
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=reserve) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(waits) == pytest.approx([index / 10 for index in range(8)])
+
+
+def test_throttle_halves_rate_and_honors_retry_after() -> None:
+    clock = _Clock()
+    limiter = GlobalRateLimiter(nrc_max_rps=4, clock=clock)
+    host = "adams-api.nrc.gov"
+    assert limiter.reserve_aps("key", host) == 0
+
+    clock.now += 10
+    limiter.observe(host, 429, retry_after="3", subscription_key="key")
+    assert limiter.reserve_aps("key", host) == pytest.approx(3.0)
+    # Rate dropped from 4 to 2 rps, so the next slot is 0.5 s later.
+    assert limiter.reserve_aps("key", host) == pytest.approx(3.5)
+
+    clock.now += 100
+    for _ in range(40):
+        limiter.observe(host, 200, subscription_key="key")
+    limiter.reserve_host(host)
+    assert limiter.reserve_host(host) == pytest.approx(0.25)
+
+
+def test_sec_403_caps_rate_during_cooldown() -> None:
+    clock = _Clock()
+    limiter = GlobalRateLimiter(sec_max_rps=10, clock=clock)
+    limiter.observe("www.sec.gov", 403)
+    limiter.reserve_host("www.sec.gov")
+    assert limiter.reserve_host("www.sec.gov") == pytest.approx(0.2)
+
+    clock.now += 601
+    limiter.reserve_host("www.sec.gov")
+    assert limiter.reserve_host("www.sec.gov") == pytest.approx(0.1)
+
+
+def test_async_acquire_waits_for_reserved_slot() -> None:
+    limiter = GlobalRateLimiter(default_max_rps=50)
+
+    async def acquire_all() -> None:
+        await asyncio.gather(*(limiter.acquire_host_async("example.org") for _ in range(3)))
+
+    started = time.monotonic()
+    asyncio.run(acquire_all())
+    # Three slots at 50 rps: the last caller starts two intervals after the first.
+    assert time.monotonic() - started >= 0.035
+
+
+def test_shared_limiter_spaces_instances_on_one_schedule(tmp_path: Path) -> None:
+    clock = _Clock()
+    path = tmp_path / "limiter.sqlite3"
+    first = SharedRateLimiter(path, sec_max_rps=10, clock=clock)
+    second = SharedRateLimiter(path, sec_max_rps=10, clock=clock)
+    try:
+        waits = [limiter.reserve_host("data.sec.gov") for limiter in (first, second, first, second)]
+        assert waits == pytest.approx([0.0, 0.1, 0.2, 0.3])
+
+        # A 403 seen by one worker caps the host for every worker.
+        clock.now += 10
+        first.observe("www.sec.gov", 403)
+        second.reserve_host("www.sec.gov")
+        assert second.reserve_host("www.sec.gov") == pytest.approx(0.2)
+
+        second.reserve_aps("secret-key", "adams-api.nrc.gov")
+        assert first.reserve_aps("secret-key", "adams-api.nrc.gov") == pytest.approx(0.5)
+        assert first.reserve_aps("other-key", "adams-api.nrc.gov") == 0
+    finally:
+        first.close()
+        second.close()
+    assert b"secret-key" not in path.read_bytes()
+
+
+def test_shared_limiter_caps_aggregate_rate_across_processes(tmp_path: Path) -> None:
+    path = tmp_path / "limiter.sqlite3"
+    # Each worker reserves slots and reports their start times on the shared clock.
+    script = (
+        "import sys, time\n"
+        "from pathlib import Path\n"
+        "from api_etl_pipeline.rate_limiter import SharedRateLimiter\n"
+        "reads = []\n"
+        "def clock():\n"
+        "    reads.append(time.time())\n"
+        "    return reads[-1]\n"
+        "limiter = SharedRateLimiter(Path(sys.argv[1]), default_max_rps=50, clock=clock)\n"
+        "for _ in range(10):\n"
+        "    wait = limiter.reserve_host('example.org')\n"
+        "    print(reads[-1] + wait)\n"
+    )
+    workers = [
+        subprocess.Popen(
+            [sys.executable, "-c", script, str(path)], stdout=subprocess.PIPE, text=True
+        )
+        for _ in range(4)
+    ]
+    starts = sorted(float(line) for worker in workers for line in worker.communicate()[0].split())
+    assert all(worker.returncode == 0 for worker in workers)
+
+    assert len(starts) == 40
+    gaps = [later - earlier for earlier, later in zip(starts, starts[1:], strict=False)]
+    assert min(gaps) >= 1 / 50 - 1e-6
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import httpx
+import pytest
+
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.retry_policy import RetryableHttpError, RetryBudget
+
+
+def _client(statuses: list[int], budget: RetryBudget, sleeps: list[float]) -> tuple:
+    calls: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(str(request.url))
+        return httpx.Response(statuses.pop(0) if len(statuses) > 1 else statuses[0])
+
+    client = HttpClient(
+        live=True,
+        fixture_root=Path("tests/fixtures"),
+        rate_limiter=GlobalRateLimiter(sec_max_rps=1000, nrc_max_rps=1000),
+        sec_user_agent="ua",
+        nrc_subscription_key="key",
+        retry_budget=budget,
+        sleep=sleeps.append,
+    )
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client, calls
+
+
+def test_sec_throttle_retries_five_times_with_growing_backoff() -> None:
+    budget = RetryBudget(max_retries=50)
+    sleeps: list[float] = []
+    client, calls = _client([429], budget, sleeps)
+    with pytest.raises(RetryableHttpError):
+        client.get("https://data.sec.gov/a", provider="sec_edgar")
+    assert len(calls) == 5
+    assert len(sleeps) == 4
+    assert sleeps[-1] > sleeps[0]
+    assert budget.snapshot()["by_status"] == {"429": 4}
+
+
+def test_nrc_forbidden_is_terminal() -> None:
+    budget = RetryBudget(max_retries=50)
+    sleeps: list[float] = []
+    client, calls = _client([403], budget, sleeps)
+    with pytest.raises(httpx.HTTPStatusError):
+        client.post("https://adams-api.nrc.gov/aps/api/search", provider="nrc_adams_aps")
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_server_error_recovers_within_three_attempts() -> None:
+    budget = RetryBudget(max_retries=50)
+    sleeps: list[float] = []
+    client, calls = _client([503, 502, 200], budget, sleeps)
+    response = client.get("https://www.nrc.gov/docs/ML24/ML24001A001.pdf", provider="nrc_adams_aps")
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert budget.snapshot()["retries"] == 2
+    assert budget.snapshot()["backoff_seconds"] == pytest.approx(sum(sleeps), abs=1e-3)
+
+
+def test_exhausted_budget_stops_retrying() -> None:
+    budget = RetryBudget(max_retries=1)
+    sleeps: list[float] = []
+    client, calls = _client([500], budget, sleeps)
+    with pytest.raises(RetryableHttpError):
+        client.get("https://data.sec.gov/a", provider="sec_edgar")
+    assert len(calls) == 2
+    assert budget.snapshot()["exhausted"] == 1
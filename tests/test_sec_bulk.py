@@ -0,0 +1,130 @@
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import httpx
+
+from api_etl_pipeline.connectors.sec_bulk import (
+    BULK_SUBMISSIONS_URL,
+    SecBulkSubmissionsConnector,
+)
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+FIXTURE = Path("tests/fixtures/sec_bulk/submissions.zip")
+
+
+def _reissued_zip() -> bytes:
+    out = io.BytesIO()
+    with (
+        zipfile.ZipFile(FIXTURE) as source,
+        zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as target,
+    ):
+        for name in source.namelist():
+            payload = json.loads(source.read(name))
+            if name == "CIK0000789019.json":
+                payload["name"] = "MICROSOFT CORPORATION"
+            target.writestr(name, json.dumps(payload, sort_keys=True))
+    return out.getvalue()
+
+
+def _run(tmp_path: Path, storage: SqliteStorage, body: bytes, **connector_kwargs) -> dict:
+    client = HttpClient(
+        live=True,
+        fixture_root=Path("tests/fixtures"),
+        rate_limiter=GlobalRateLimiter(),
+        sec_user_agent="ua",
+        nrc_subscription_key=None,
+        spool_dir=tmp_path / "blobs" / ".spool",
+    )
+    client.range_parts = 1
+    client._client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+    )
+    connector = SecBulkSubmissionsConnector(
+        client, storage, today=lambda: "2024-02-03", **connector_kwargs
+    )
+    with client:
+        return PipelineRunner(storage, BlobStore(tmp_path / "blobs")).run(connector)
+
+
+def _members(storage: SqliteStorage) -> list[tuple]:
+    return storage.conn.execute(
+        "SELECT source_url, cik, entity_name, filing_count, latest_accession"
+        " FROM sec_submission_members ORDER BY id"
+    ).fetchall()
+
+
+def test_snapshot_is_ingested_once_and_reissues_reingest(tmp_path: Path) -> None:
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        first = _run(tmp_path, storage, FIXTURE.read_bytes(), parse_workers=1)
+        assert first["artifacts"] == 1 and first["responses"] == 1
+        members = _members(storage)
+        assert members == [
+            (
+                f"{BULK_SUBMISSIONS_URL}#CIK0000320193.json",
+                "0000320193",
+                "Apple Inc.",
+                2,
+                "0000320193-24-000123",
+            ),
+            (
+                f"{BULK_SUBMISSIONS_URL}#CIK0000320193-submissions-001.json",
+                "0000320193",
+                None,
+                1,
+                "0000320193-94-000016",
+            ),
+            (
+                f"{BULK_SUBMISSIONS_URL}#CIK0000789019.json",
+                "0000789019",
+                "MICROSOFT CORP",
+                1,
+                "0000950170-24-008814",
+            ),
+        ]
+
+        again = _run(tmp_path, storage, FIXTURE.read_bytes(), parse_workers=1)
+        assert again["not_modified"] == 1
+        assert len(_members(storage)) == 3
+
+        reissued = _run(tmp_path, storage, _reissued_zip(), parse_workers=2, batch_size=1)
+        assert reissued["not_modified"] == 0
+        members = _members(storage)
+        assert len(members) == 4
+        assert members[-1][2] == "MICROSOFT CORPORATION"
+        assert storage.conn.execute(
+            "SELECT fetch_date_utc, members, reissues FROM bulk_snapshots"
+        ).fetchall() == [("2024-02-03", 3, 1)]
+    finally:
+        storage.close()
+
+
+def test_missing_snapshot_is_logged_not_fatal(tmp_path: Path) -> None:
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    client = HttpClient(
+        live=True,
+        fixture_root=Path("tests/fixtures"),
+        rate_limiter=GlobalRateLimiter(),
+        sec_user_agent="ua",
+        nrc_subscription_key=None,
+        spool_dir=tmp_path / ".spool",
+    )
+    client._client = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(404))
+    )
+    try:
+        with client:
+            result = PipelineRunner(storage, BlobStore(tmp_path / "blobs")).run(
+                SecBulkSubmissionsConnector(client, storage)
+            )
+        assert result["artifacts"] == 0
+        assert result["parse_errors"][0]["stage"] == "bulk_snapshot_missing"
+        assert storage.conn.execute("SELECT count(*) FROM bulk_snapshots").fetchone()[0] == 0
+    finally:
+        storage.close()
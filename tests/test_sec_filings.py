@@ -0,0 +1,171 @@
+import json
+import threading
+from datetime import date
+from pathlib import Path
+
+import httpx
+
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.connectors.sec_filings import FilingColumns, iter_shards, shards_for
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+RECENT = {
+    "accessionNumber": [
+        "0000320193-24-000123",
+        "0000320193-24-000100",
+        "0000320193-23-000077",
+        "not-an-accession",
+    ],
+    "form": ["10-Q", "8-K", "10-K", "10-K"],
+    "filingDate": ["2024-02-02", "2024-01-15", "2023-11-03", "2023-10-01"],
+    "acceptanceDateTime": ["2024-02-02T18:01:14.000Z", "", "2023-11-03T18:04:09.000Z"],
+    "primaryDocument": ["aapl-20231230.htm", "ex99.htm", "aapl-20230930.htm", "x.htm"],
+}
+SHARD = {
+    "accessionNumber": ["0000320193-22-000108", "0000320193-21-000105"],
+    "form": ["10-K", "10-K"],
+    "filingDate": ["2022-10-28", "2021-10-29"],
+    "primaryDocument": ["aapl-20220924.htm", "aapl-20210925.htm"],
+}
+
+
+def test_columns_filter_without_per_filing_records() -> None:
+    columns = FilingColumns.from_block(RECENT)
+
+    assert len(columns) == 4
+    assert columns.forms == ["10-Q", "8-K", "10-K"]
+    assert columns.select() == [0, 1, 2]
+    assert columns.select(forms={"10-K"}) == [2]
+    assert columns.select(forms={"S-1"}) == []
+    assert columns.select(date_from="2024-01-01") == [0, 1]
+    assert columns.select(date_from=date(2023, 11, 3), date_to=date(2024, 1, 15)) == [1, 2]
+    assert columns.select(accessions=["0000320193-23-000077"]) == [2]
+    assert columns.select(exclude_accessions=["0000320193-24-000123"]) == [1, 2]
+
+    filing = columns.filing(0)
+    assert filing.accession_number == "0000320193-24-000123"
+    assert filing.filing_date == "2024-02-02"
+    assert filing.acceptance_timestamp == 1706896874
+    assert columns.filing(1).acceptance_timestamp is None
+    assert columns.oldest_filing_date() == 20231001
+
+
+def test_shards_are_prefetched_in_order() -> None:
+    payload = {
+        "filings": {
+            "files": [
+                {"name": "CIK0000320193-submissions-001.json", "filingCount": 2},
+                {"name": "../escape.json"},
+                {"filingCount": 3},
+                {"name": "CIK0000320193-submissions-002.json", "filingTo": "2001-12-31"},
+            ]
+        }
+    }
+    shards = shards_for(payload)
+    assert [shard.name for shard in shards] == [
+        "CIK0000320193-submissions-001.json",
+        "CIK0000320193-submissions-002.json",
+    ]
+    assert shards[1].filing_to == 20011231
+
+    fetched: list[str] = []
+    second_requested = threading.Event()
+
+    def fetch(shard):
+        fetched.append(shard.name)
+        if shard is shards[1]:
+            second_requested.set()
+        return FilingColumns.from_block(SHARD)
+
+    walk = iter_shards(shards, fetch)
+    first_shard, first_columns = next(walk)
+    assert first_shard is shards[0] and len(first_columns) == 2
+    # The second shard is requested while the caller still holds the first.
+    assert second_requested.wait(timeout=5)
+    walk.close()
+    assert fetched == [shard.name for shard in shards]
+
+
+def test_connector_follows_shards_until_the_cap(tmp_path: Path) -> None:
+    fixtures = tmp_path / "fixtures" / "sec_edgar"
+    fixtures.mkdir(parents=True)
+    submissions = {
+        "cik": "320193",
+        "filings": {
+            "recent": RECENT,
+            "files": [{"name": "CIK0000320193-submissions-001.json", "filingCount": 2}],
+        },
+    }
+    (fixtures / "submissions.json").write_text(json.dumps(submissions))
+    (fixtures / "CIK0000320193-submissions-001.json").write_text(json.dumps(SHARD))
+    (fixtures / "artifact.htm").write_text("<html></html>")
+
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        with HttpClient(
+            live=False,
+            fixture_root=tmp_path / "fixtures",
+            rate_limiter=GlobalRateLimiter(),
+            sec_user_agent=None,
+            nrc_subscription_key=None,
+        ) as client:
+            runner = PipelineRunner(storage=storage, blob_store=BlobStore(tmp_path / "blobs"))
+            connector = SecEdgarConnector(client, forms=["10-K"], max_filings=3)
+            result = runner.run(connector, limit=1)
+    finally:
+        storage.close()
+
+    assert [entry["source_url"] for entry in result["artifacts_manifest"]] == [
+        "https://www.sec.gov/Archives/edgar/data/320193/000032019323000077/aapl-20230930.htm",
+        "https://www.sec.gov/Archives/edgar/data/320193/000032019322000108/aapl-20220924.htm",
+        "https://www.sec.gov/Archives/edgar/data/320193/000032019321000105/aapl-20210925.htm",
+    ]
+    # submissions.json + one shard + three artifact downloads
+    assert result["responses"] == 5
+    assert result["parse_errors"] == []
+
+
+def test_missing_shard_is_a_parse_error_not_a_failed_run(tmp_path: Path) -> None:
+    submissions = {
+        "cik": "320193",
+        "filings": {
+            "recent": RECENT,
+            "files": [{"name": "CIK0000320193-submissions-001.json", "filingCount": 2}],
+        },
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("CIK0000320193.json"):
+            return httpx.Response(200, headers={"etag": '"v1"'}, json=submissions)
+        if request.url.path.endswith("-submissions-001.json"):
+            return httpx.Response(404, text="Not Found")
+        return httpx.Response(200, text="<html></html>")
+
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        with HttpClient(
+            live=True,
+            fixture_root=tmp_path / "fixtures",
+            rate_limiter=GlobalRateLimiter(sec_max_rps=1000),
+            sec_user_agent="ua",
+            nrc_subscription_key=None,
+            spool_dir=tmp_path / "spool",
+        ) as client:
+            client._client = httpx.Client(transport=httpx.MockTransport(handler))
+            runner = PipelineRunner(storage=storage, blob_store=BlobStore(tmp_path / "blobs"))
+            connector = SecEdgarConnector(client, forms=["10-K"], max_filings=3)
+            result = runner.run(connector, limit=1)
+        # No ETag is kept, so the next run cannot get a 304 and skip the shard.
+        validators = storage.get_validators("https://data.sec.gov/submissions/CIK0000320193.json")
+    finally:
+        storage.close()
+
+    assert validators is None
+    assert len(result["artifacts_manifest"]) == 1
+    (error,) = result["parse_errors"]
+    assert error["stage"] == "fetch_shard"
+    assert "CIK0000320193-submissions-001.json (404)" in error["message"]
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+
+def _write_submissions(fixtures: Path, filings: list[tuple[str, str, str]]) -> None:
+    recent = {
+        "accessionNumber": [accession for accession, _, _ in filings],
+        "acceptanceDateTime": [accepted for _, accepted, _ in filings],
+        "form": ["8-K"] * len(filings),
+        "primaryDocument": [document for _, _, document in filings],
+    }
+    (fixtures / "submissions.json").write_text(
+        json.dumps({"cik": "320193", "filings": {"recent": recent}})
+    )
+
+
+def _run(tmp_path: Path, max_filings: int = 0) -> list[str]:
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        with HttpClient(
+            live=False,
+            fixture_root=tmp_path / "fixtures",
+            rate_limiter=GlobalRateLimiter(),
+            sec_user_agent=None,
+            nrc_subscription_key=None,
+        ) as client:
+            runner = PipelineRunner(storage=storage, blob_store=BlobStore(tmp_path / "blobs"))
+            connector = SecEdgarConnector(client, storage=storage, max_filings=max_filings)
+            result = runner.run(connector, limit=1)
+    finally:
+        storage.close()
+    return [entry["source_url"].rsplit("/", 1)[1] for entry in result["artifacts_manifest"]]
+
+
+def test_steady_state_runs_fetch_only_new_filings(tmp_path: Path) -> None:
+    fixtures = tmp_path / "fixtures" / "sec_edgar"
+    fixtures.mkdir(parents=True)
+    (fixtures / "artifact.htm").write_text("<html></html>")
+    older = ("0000320193-24-000010", "2024-03-01T12:00:00.000Z", "a.htm")
+    newest = ("0000320193-24-000011", "2024-03-05T12:00:00.000Z", "b.htm")
+    _write_submissions(fixtures, [newest, older])
+
+    assert _run(tmp_path) == ["b.htm", "a.htm"]
+    assert _run(tmp_path) == []
+
+    # A late filing inside the 48 h overlap is still picked up; one accepted
+    # before the window is not, and seen accessions are never re-requested.
+    late = ("0000320193-24-000012", "2024-03-04T00:00:00.000Z", "c.htm")
+    stale = ("0000320193-24-000009", "2024-03-02T00:00:00.000Z", "d.htm")
+    fresh = ("0000320193-24-000013", "2024-03-06T00:00:00.000Z", "e.htm")
+    _write_submissions(fixtures, [fresh, newest, late, stale, older])
+    assert _run(tmp_path) == ["e.htm", "c.htm"]
+    assert _run(tmp_path) == []
+
+
+def test_capped_incremental_runs_take_oldest_unseen_first(tmp_path: Path) -> None:
+    fixtures = tmp_path / "fixtures" / "sec_edgar"
+    fixtures.mkdir(parents=True)
+    (fixtures / "artifact.htm").write_text("<html></html>")
+    filings = [
+        (f"0000320193-24-00002{day}", f"2024-04-0{day}T12:00:00.000Z", f"{day}.htm")
+        for day in (5, 4, 3, 2, 1)
+    ]
+    _write_submissions(fixtures, filings[-1:])
+    assert _run(tmp_path, max_filings=2) == ["1.htm"]
+
+    _write_submissions(fixtures, filings)
+    assert _run(tmp_path, max_filings=2) == ["3.htm", "2.htm"]
+    assert _run(tmp_path, max_filings=2) == ["5.htm", "4.htm"]
+    assert _run(tmp_path, max_filings=2) == []
+
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        watermark, seen = storage.get_watermark("sec_edgar", "0000320193")
+    finally:
+        storage.close()
+    assert watermark == 1712318400  # 2024-04-05T12:00:00Z
+    # Accessions older than the overlap behind the watermark are pruned.
+    assert seen == {"0000320193-24-000025", "0000320193-24-000024", "0000320193-24-000023"}
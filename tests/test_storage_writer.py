@@ -0,0 +1,112 @@
+import sqlite3
+import threading
+from pathlib import Path
+
+from api_etl_pipeline.http_client import CapturedResponse
+from api_etl_pipeline.storage.db import SqliteStorage
+
+
+def _captured(url: str, body: bytes = b"{}") -> CapturedResponse:
+    return CapturedResponse(
+        method="GET",
+        url=url,
+        params_json="{}",
+        status_code=200,
+        headers_json="{}",
+        body=body,
+    )
+
+
+def test_batched_writes_resolve_ids_and_commit_on_flush(tmp_path: Path) -> None:
+    db_path = tmp_path / "db.sqlite3"
+    storage = SqliteStorage(db_path, batch_size=100, flush_interval=60.0)
+    try:
+        assert storage.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        response_ids = [
+            storage.submit_response("sec_edgar", _captured(f"https://x/{i}")) for i in range(3)
+        ]
+        first = storage.submit_artifact(
+            provider="sec_edgar",
+            source_url="https://x/0",
+            sha256="a" * 64,
+            byte_count=2,
+            blob_path="blob",
+            response_id=response_ids[0],
+        )
+        duplicate = storage.submit_artifact(
+            provider="sec_edgar",
+            source_url="https://x/0",
+            sha256="a" * 64,
+            byte_count=2,
+            blob_path="blob",
+            response_id=response_ids[1],
+        )
+        assert not first.done()
+
+        storage.flush()
+        assert [future.result() for future in response_ids] == [1, 2, 3]
+        assert first.result() == 1
+        assert duplicate.result() is None
+
+        reader = sqlite3.connect(db_path)
+        assert reader.execute("SELECT response_id FROM artifacts").fetchall() == [(1,)]
+        reader.close()
+
+        assert storage.insert_response("sec_edgar", _captured("https://x/sync")) == 4
+    finally:
+        storage.close()
+
+    assert not (tmp_path / "db.sqlite3-wal").exists() or (
+        (tmp_path / "db.sqlite3-wal").stat().st_size == 0
+    )
+    reader = sqlite3.connect(db_path)
+    assert reader.execute("SELECT count(*) FROM responses").fetchone()[0] == 4
+    reader.close()
+
+
+def test_failed_row_is_isolated_from_its_batch(tmp_path: Path) -> None:
+    storage = SqliteStorage(tmp_path / "db.sqlite3", batch_size=100, flush_interval=60.0)
+    try:
+        kept = storage.submit_response("sec_edgar", _captured("https://x/1"))
+        broken = storage.submit_artifact(
+            provider="sec_edgar",
+            source_url="https://x/1",
+            sha256="b" * 64,
+            byte_count=2,
+            blob_path="blob",
+            response_id=999,  # violates the foreign key
+        )
+        storage.flush()
+        assert isinstance(broken.exception(), sqlite3.IntegrityError)
+        assert kept.result() == 1
+        assert storage.conn.execute("SELECT count(*) FROM artifacts").fetchone()[0] == 0
+    finally:
+        storage.close()
+
+
+def test_full_write_queue_blocks_producers(tmp_path: Path) -> None:
+    storage = SqliteStorage(
+        tmp_path / "db.sqlite3", batch_size=2, flush_interval=60.0, write_queue_max=2
+    )
+    submitted: list[int] = []
+
+    def produce() -> None:
+        for i in range(6):
+            storage.submit_response("sec_edgar", _captured(f"https://x/{i}"))
+            submitted.append(i)
+
+    try:
+        # The writer cannot commit while the lock is held, so the queue fills up.
+        with storage._lock:
+            producer = threading.Thread(target=produce)
+            producer.start()
+            producer.join(timeout=0.5)
+            assert producer.is_alive()
+            assert len(submitted) < 6
+        producer.join(timeout=5)
+        assert submitted == list(range(6))
+        storage.flush()
+        assert storage.conn.execute("SELECT COUNT(*) FROM responses").fetchone() == (6,)
+    finally:
+        storage.close()
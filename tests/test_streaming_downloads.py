@@ -0,0 +1,75 @@
+import hashlib
+from pathlib import Path
+
+import httpx
+import pytest
+
+from api_etl_pipeline.downloads import ArtifactTooLargeError
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+
+URL = "https://www.sec.gov/Archives/edgar/data/1/000000000124000001/big.htm"
+
+
+class _ChunkStream(httpx.SyncByteStream):
+    def __init__(self, chunks: list[bytes]) -> None:
+        self.chunks = chunks
+        self.consumed = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.consumed += 1
+            yield chunk
+
+
+def _client(tmp_path: Path, handler) -> HttpClient:
+    client = HttpClient(
+        live=True,
+        fixture_root=Path("tests/fixtures"),
+        rate_limiter=GlobalRateLimiter(),
+        sec_user_agent="ua",
+        nrc_subscription_key="key",
+        spool_dir=tmp_path / "spool",
+    )
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    client.max_artifact_bytes = 1000
+    client.chunk_size = 100
+    return client
+
+
+def test_streamed_body_is_hashed_and_moved_into_blob_store(tmp_path: Path) -> None:
+    chunks = [b"a" * 300, b"b" * 300, b"c" * 300]
+    client = _client(tmp_path, lambda request: httpx.Response(200, stream=_ChunkStream(chunks)))
+    captured = client.stream_get(URL, provider="sec_edgar")
+
+    expected = hashlib.sha256(b"".join(chunks)).hexdigest()
+    assert captured.body == b""
+    assert captured.sha256 == expected
+    assert captured.byte_count == 900
+
+    store = BlobStore(tmp_path / "blobs")
+    blob_path = store.put_file(expected, captured.body_path)
+    assert blob_path.read_bytes() == b"".join(chunks)
+    assert not captured.body_path.exists()
+
+
+def test_declared_content_length_over_cap_aborts_before_reading(tmp_path: Path) -> None:
+    stream = _ChunkStream([b"x" * 10])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, headers={"content-length": "5000"}, stream=stream)
+
+    client = _client(tmp_path, handler)
+    with pytest.raises(ArtifactTooLargeError):
+        client.stream_get(URL, provider="sec_edgar")
+    assert stream.consumed == 0
+
+
+def test_stream_over_cap_aborts_mid_download_and_cleans_spool(tmp_path: Path) -> None:
+    stream = _ChunkStream([b"x" * 600, b"y" * 600, b"z" * 600])
+    client = _client(tmp_path, lambda request: httpx.Response(200, stream=stream))
+    with pytest.raises(ArtifactTooLargeError):
+        client.stream_get(URL, provider="sec_edgar")
+    assert stream.consumed == 2
+    assert list((tmp_path / "spool").iterdir()) == []
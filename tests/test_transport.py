@@ -0,0 +1,80 @@
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.metrics import Metrics
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.transport import TransportProfiles
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        body = b'{"ok": true}' if self.path.endswith(".json") else b"%PDF-1.7\n" + b"x" * 4096
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        del format, args
+
+
+@pytest.fixture
+def server() -> Iterator[str]:
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def test_profiles_resolve_by_longest_host_suffix() -> None:
+    profiles = TransportProfiles({"data.sec.gov": {"api": {"max_connections": 8}}})
+    assert profiles.resolve("data.sec.gov", "api").max_connections == 8
+    assert profiles.resolve("data.sec.gov", "api").http2 is True
+    assert profiles.resolve("www.sec.gov", "api").max_connections == 4
+    assert profiles.resolve("www.nrc.gov", "bulk").max_connections == 8
+    assert profiles.resolve("example.org", "api").http2 is False
+    assert profiles.resolve("notsec.gov", "api").http2 is False
+    with pytest.raises(ValueError):
+        TransportProfiles({"sec.gov": {"api": {"pool_size": 2}}})
+
+
+def test_metadata_and_downloads_reuse_warm_connections_in_separate_pools(
+    server: str, tmp_path: Path
+) -> None:
+    metrics = Metrics()
+    with HttpClient(
+        live=True,
+        fixture_root=tmp_path,
+        rate_limiter=GlobalRateLimiter(default_max_rps=1000),
+        sec_user_agent=None,
+        nrc_subscription_key=None,
+        spool_dir=tmp_path / "spool",
+        metrics=metrics,
+    ) as client:
+        for _ in range(3):
+            assert client.get(f"{server}/meta.json", provider="test").status_code == 200
+        for name in ("a.pdf", "b.pdf"):
+            assert client.stream_get(f"{server}/{name}", provider="test").byte_count == 4105
+
+    requests = {
+        (entry["labels"]["pool"], entry["labels"]["connection"]): entry["value"]
+        for entry in metrics.snapshot()["counters"]["http_pool_requests_total"]
+    }
+    assert requests == {
+        ("api", "new"): 1,
+        ("api", "reused"): 2,
+        ("bulk", "new"): 1,
+        ("bulk", "reused"): 1,
+    }
+    assert "http_tls_handshakes_total" not in metrics.snapshot()["counters"]
@@ -0,0 +1,156 @@
+import gzip
+import hashlib
+import json
+import re
+import zlib
+from dataclasses import replace
+from pathlib import Path
+
+import httpx
+import pytest
+
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.run_capture import AttemptRecord, RunCapture, extract_packed
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+
+URL = "https://www.sec.gov/Archives/edgar/data/320193/000032019324000123/aapl-20240928.htm"
+DOCUMENT = b"".join(b"<tr><td>Revenue %d</td><td>391,035</td></tr>\n" % i for i in range(2000))
+WIRE = gzip.compress(DOCUMENT)
+
+
+class _Stream(httpx.SyncByteStream):
+    # A plain ``content=`` response is pre-read, which rules out ``iter_raw``.
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def __iter__(self):
+        yield self.body
+
+
+def _ranged_gzip_server(seen: list[str | None]):
+    # Ranges address the gzip representation, as they do on a real origin.
+    def handler(request: httpx.Request) -> httpx.Response:
+        requested = request.headers.get("range")
+        seen.append(requested)
+        start, end = map(int, re.fullmatch(r"bytes=(\d+)-(\d+)", requested or "").groups())
+        end = min(end, len(WIRE) - 1)
+        headers = {
+            "content-encoding": "gzip",
+            "etag": '"v1"',
+            "content-range": f"bytes {start}-{end}/{len(WIRE)}",
+        }
+        return httpx.Response(206, headers=headers, stream=_Stream(WIRE[start : end + 1]))
+
+    return handler
+
+
+def test_gzip_artifacts_are_stored_as_received_and_read_decoded(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("APP_KEEP_WIRE_ENCODING", "1")
+    seen: list[str | None] = []
+    client = HttpClient(
+        live=True,
+        fixture_root=Path("tests/fixtures"),
+        rate_limiter=GlobalRateLimiter(sec_max_rps=1000),
+        sec_user_agent="ua",
+        nrc_subscription_key=None,
+        spool_dir=tmp_path / "spool",
+        sleep=lambda seconds: None,
+    )
+    client._client = httpx.Client(transport=httpx.MockTransport(_ranged_gzip_server(seen)))
+    client.range_part_bytes = 1024
+
+    captured = client.stream_get(URL, provider="sec_edgar")
+    assert len(seen) > 2
+    assert captured.body_encoding == "gzip"
+    assert captured.body_path.read_bytes() == WIRE
+    assert captured.sha256 == hashlib.sha256(DOCUMENT).hexdigest()
+    assert captured.byte_count == len(DOCUMENT)
+
+    blobs = BlobStore(tmp_path / "blobs")
+    blob_path = blobs.put_file(captured.sha256, captured.body_path, encoding="gzip")
+    assert blob_path.name == f"{captured.sha256}.gz"
+    assert blob_path.stat().st_size == len(WIRE)
+    assert blobs.read_bytes(captured.sha256) == DOCUMENT
+    assert b"".join(blobs.iter_bytes(captured.sha256)) == DOCUMENT
+    # The same content arriving decoded later reuses the compressed blob.
+    plain = tmp_path / "plain.part"
+    plain.write_bytes(DOCUMENT)
+    assert blobs.put_file(captured.sha256, plain) == blob_path
+
+    storage = SqliteStorage(tmp_path / "db.sqlite3", body_store=blobs)
+    stored = replace(captured, body_path=blob_path)
+    response_id = storage.submit_response("sec_edgar", stored).result()
+    storage.insert_artifact(
+        provider="sec_edgar",
+        source_url=URL,
+        sha256=captured.sha256,
+        byte_count=captured.size,
+        blob_path=str(blob_path),
+        response_id=response_id,
+        content_encoding="gzip",
+    )
+    assert storage.read_body(response_id) == DOCUMENT
+    assert storage.conn.execute("SELECT content_encoding, bytes FROM artifacts").fetchone() == (
+        "gzip",
+        len(DOCUMENT),
+    )
+    storage.close()
+
+
+@pytest.mark.parametrize("capture_format", ["files", "packed"])
+def test_run_capture_keeps_wire_gzip_and_decodes_raw_views(
+    tmp_path: Path, capture_format: str
+) -> None:
+    wire = tmp_path / "spool.part"
+    wire.write_bytes(WIRE)
+    deflated = tmp_path / "deflate.part"
+    deflated.write_bytes(zlib.compress(DOCUMENT))
+    run = RunCapture(
+        tmp_path / "run",
+        provider="sec_edgar",
+        live=True,
+        limit=1,
+        pretty_max_bytes=2_000_000,
+        gzip_min_bytes=1024,
+        queue_max_bytes=1024,
+        format=capture_format,
+    )
+    for body_path, encoding in ((wire, "gzip"), (deflated, "deflate")):
+        run.capture_attempt(
+            AttemptRecord(
+                method="GET",
+                url=URL,
+                request_payload_json=None,
+                request_headers={},
+                status_code=200,
+                response_headers={"content-encoding": encoding},
+                body=b"",
+                attempt_number=1,
+                body_path=body_path,
+                sha256=hashlib.sha256(DOCUMENT).hexdigest(),
+                byte_count=len(DOCUMENT),
+                body_encoding=encoding,
+            )
+        )
+    run.close()
+
+    if capture_format == "files":
+        responses = tmp_path / "run" / "responses"
+    else:
+        extract_packed(tmp_path / "run", tmp_path / "out")
+        responses = tmp_path / "out" / "responses"
+    for stem in ("000001_get", "000002_get"):
+        assert (responses / f"{stem}.raw.bin").read_bytes() == DOCUMENT
+        meta = json.loads((responses / f"{stem}.meta.json").read_text())
+        assert meta["sha256"] == hashlib.sha256(DOCUMENT).hexdigest()
+        assert meta["byte_count"] == len(DOCUMENT)
+    assert meta["content_encoding"] == "deflate"
+    if capture_format == "files":
+        # The gzip body is the .gz view as received, not a recompression.
+        assert (responses / "000001_get.raw.bin.gz").read_bytes() == WIRE
+        assert gzip.decompress((responses / "000002_get.raw.bin.gz").read_bytes()) == DOCUMENT
+        assert list(responses.glob("*.zz")) == []
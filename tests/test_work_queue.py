@@ -0,0 +1,223 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from api_etl_pipeline.cli import app
+from api_etl_pipeline.connectors.sec_edgar import SecEdgarConnector
+from api_etl_pipeline.http_client import HttpClient
+from api_etl_pipeline.pipeline import PipelineRunner
+from api_etl_pipeline.rate_limiter import GlobalRateLimiter
+from api_etl_pipeline.storage.blob_store import BlobStore
+from api_etl_pipeline.storage.db import SqliteStorage
+from api_etl_pipeline.work_queue import QueueWorker, WorkQueue
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_leases_expire_heartbeats_renew_and_attempts_run_out(tmp_path: Path) -> None:
+    clock = _Clock()
+    queue = WorkQueue(tmp_path / "db.sqlite3", lease_seconds=60, max_attempts=2, clock=clock)
+    items = [{"cik10": f"{cik:010d}"} for cik in range(3)]
+    assert queue.enqueue("backfill", items) == 3
+    assert queue.enqueue("backfill", items) == 0
+    with pytest.raises(ValueError):
+        queue.enqueue("backfill", [{"when": object()}])
+
+    first = queue.claim("backfill", "w1", 2)
+    (second,) = queue.claim("backfill", "w2", 2)
+    assert [item.payload for item in first] == items[:2]
+    assert queue.claim("backfill", "w3", 2) == []
+
+    # w1 stalls; w2 keeps renewing. After the lease period only w1's items move.
+    clock.now += 45
+    assert queue.heartbeat("w2", [second.id]) == 1
+    clock.now += 30
+    reclaimed = queue.claim("backfill", "w3", 5)
+    assert [item.id for item in reclaimed] == [item.id for item in first]
+    assert {item.attempts for item in reclaimed} == {2}
+    queue.complete("w1", [item.id for item in first])  # w1 no longer owns them
+    assert queue.counts("backfill")["leased"] == 3
+
+    queue.complete("w2", [second.id])
+    queue.fail("w3", [reclaimed[0].id], "HTTPStatusError: 500")
+    queue.release("w3", [reclaimed[1].id])
+    assert queue.counts("backfill") == {"pending": 1, "leased": 0, "done": 1, "failed": 1}
+    (retried,) = queue.claim("backfill", "w4", 5)
+    assert retried.attempts == 2
+    queue.close()
+
+
+def test_workers_resume_a_queued_backfill(tmp_path: Path) -> None:
+    env = {
+        "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+        "APP_BLOB_DIR": str(tmp_path / "blobs"),
+        "APP_RUN_DIR": str(tmp_path / "runs"),
+    }
+    runner = CliRunner()
+    result = runner.invoke(app, ["queue", "enqueue", "--provider", "sec_edgar"], env=env)
+    assert result.exit_code == 0, result.output
+    assert "added=1 pending=1" in result.output
+    queue = WorkQueue(tmp_path / "db.sqlite3")
+    queue.enqueue("sec_edgar", [{"cik10": "0000789019"}, {"cik10": "0001018724"}])
+
+    # One batch, then stop as if interrupted; the next worker picks up the rest.
+    work = ["queue", "work", "--provider", "sec_edgar", "--batch-size", "1"]
+    result = runner.invoke(app, [*work, "--max-batches", "1"], env=env)
+    assert result.exit_code == 0, result.output
+    assert queue.counts("sec_edgar") == {"pending": 2, "leased": 0, "done": 1, "failed": 0}
+    result = runner.invoke(app, work, env=env)
+    assert result.exit_code == 0, result.output
+    assert queue.counts("sec_edgar") == {"pending": 0, "leased": 0, "done": 3, "failed": 0}
+    queue.close()
+
+    queue_items = sorted(
+        json.loads(path.read_text())["counts"]["queue_items"]
+        for path in (tmp_path / "runs").glob("*/run.json")
+    )
+    assert queue_items == [1, 2]
+
+
+def test_aps_queues_search_pages(tmp_path: Path) -> None:
+    env = {
+        "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+        "APP_BLOB_DIR": str(tmp_path / "blobs"),
+        "APP_RUN_DIR": str(tmp_path / "runs"),
+    }
+    runner = CliRunner()
+    result = runner.invoke(app, ["queue", "enqueue", "--provider", "nrc_adams_aps"], env=env)
+    assert result.exit_code == 0, result.output
+    assert "added=1 pending=1" in result.output
+    queue = WorkQueue(tmp_path / "db.sqlite3")
+    (item,) = queue.claim("nrc_adams_aps", "peek", 1)
+    assert item.payload == {"query": "reactor", "skip": 0, "take": 1000, "page": 1, "floor": None}
+    queue.release("peek", [item.id])
+
+    result = runner.invoke(app, ["queue", "work", "--provider", "nrc_adams_aps"], env=env)
+    assert result.exit_code == 0, result.output
+    assert "responses=2 artifacts=1" in result.output
+    assert queue.counts("nrc_adams_aps")["done"] == 1
+    queue.close()
+
+
+def test_failed_batches_are_reported_in_run_json(tmp_path: Path) -> None:
+    env = {
+        "APP_DB_PATH": str(tmp_path / "db.sqlite3"),
+        "APP_BLOB_DIR": str(tmp_path / "blobs"),
+        "APP_RUN_DIR": str(tmp_path / "runs"),
+        "APP_QUEUE_MAX_ATTEMPTS": "1",
+    }
+    queue = WorkQueue(tmp_path / "db.sqlite3")
+    page = {"skip": 0, "take": 1000, "page": 1, "floor": None}
+    queue.enqueue("nrc_adams_aps", [{"query": "reactor", **page}, {"query": "other", **page}])
+    queue.close()
+
+    result = CliRunner().invoke(
+        app, ["queue", "work", "--provider", "nrc_adams_aps", "--batch-size", "1"], env=env
+    )
+    assert result.exit_code == 1
+    assert "failed batch items=[2]" in result.output
+    (run_json,) = (tmp_path / "runs").glob("*/run.json")
+    run = json.loads(run_json.read_text())
+    assert run["status"] == "partial"
+    assert run["counts"]["queue_items"] == 1
+    assert run["counts"]["queue_items_failed"] == 1
+    assert run["failed_batches"] == [
+        {"item_ids": [2], "error": "ValueError: queued page belongs to query 'other'"}
+    ]
+
+
+class _DiscardCounter:
+    discarded = 0
+
+    def discard_pending(self) -> None:
+        self.discarded += 1
+
+
+class _FlakyRunner:
+    def __init__(self) -> None:
+        self.batches: list[list[dict]] = []
+
+    def run_plan(self, connector: object, plan: list[dict]) -> dict:
+        del connector
+        self.batches.append(plan)
+        if plan[0]["n"] == 0:
+            raise RuntimeError("boom")
+        return {"responses": len(plan), "parse_errors": [{"n": plan[0]["n"]}], "extra": 1}
+
+
+def test_failed_batch_does_not_stop_the_worker(tmp_path: Path) -> None:
+    queue = WorkQueue(tmp_path / "db.sqlite3", max_attempts=1)
+    queue.enqueue("q", [{"n": n} for n in range(3)])
+    runner = _FlakyRunner()
+
+    connector = _DiscardCounter()
+    totals = QueueWorker(queue, "q", "w1", batch_size=1).run(runner, connector)
+
+    assert [batch[0]["n"] for batch in runner.batches] == [0, 1, 2]
+    assert totals["items_done"] == 2
+    assert totals["responses"] == 2
+    assert totals["extra"] == 2
+    assert totals["parse_errors"] == [{"n": 1}, {"n": 2}]
+    assert [batch["error"] for batch in totals["failed_batches"]] == ["RuntimeError: boom"]
+    assert queue.counts("q") == {"pending": 0, "leased": 0, "done": 2, "failed": 1}
+    assert connector.discarded == 1
+    queue.close()
+
+
+class _BrokenCikConnector(SecEdgarConnector):
+    neighbour_started = threading.Event()
+
+    def fetch_metadata(self, item: dict, item_index: int):
+        # CIK 1 fails only once CIK 2 is in flight, so CIK 2 still downloads.
+        if item["cik10"] == "0000000001":
+            assert self.neighbour_started.wait(timeout=5)
+            raise RuntimeError("boom")
+        self.neighbour_started.set()
+        return super().fetch_metadata(item, item_index)
+
+
+def test_failed_batch_does_not_mark_its_filings_seen(tmp_path: Path) -> None:
+    fixtures = tmp_path / "fixtures" / "sec_edgar"
+    fixtures.mkdir(parents=True)
+    (fixtures / "artifact.htm").write_text("<html></html>")
+    recent = {
+        "accessionNumber": ["0000320193-24-000010"],
+        "acceptanceDateTime": ["2024-03-01T12:00:00.000Z"],
+        "form": ["8-K"],
+        "primaryDocument": ["a.htm"],
+    }
+    (fixtures / "submissions.json").write_text(json.dumps({"filings": {"recent": recent}}))
+    queue = WorkQueue(tmp_path / "db.sqlite3", max_attempts=1)
+    queue.enqueue("q", [{"cik10": f"{cik:010d}"} for cik in (1, 2, 3)])
+    storage = SqliteStorage(tmp_path / "db.sqlite3")
+    try:
+        with HttpClient(
+            live=False,
+            fixture_root=tmp_path / "fixtures",
+            rate_limiter=GlobalRateLimiter(),
+            sec_user_agent=None,
+            nrc_subscription_key=None,
+        ) as client:
+            runner = PipelineRunner(
+                storage=storage, blob_store=BlobStore(tmp_path / "blobs"), concurrency=2
+            )
+            connector = _BrokenCikConnector(client, storage=storage)
+            # CIK 2 is downloaded alongside CIK 1, but the batch fails before storing it.
+            totals = QueueWorker(queue, "q", "w1", batch_size=2).run(runner, connector)
+        scopes = storage.conn.execute("SELECT DISTINCT scope FROM sync_seen_items").fetchall()
+    finally:
+        storage.close()
+        queue.close()
+
+    assert totals["items_done"] == 1
+    assert len(totals["failed_batches"]) == 1
+    assert scopes == [("0000000003",)]